@@ -0,0 +1,347 @@
+"""
+Capture and input micro-benchmarks for the controllers, no game needed.
+
+    python benchmark_controllers.py
+    python benchmark_controllers.py --targets adb-raw adb-png --frames 300 --json bench/adb.json
+
+Targets (each runs only where its stand-in is available):
+  static         StaticImageController; harness overhead floor
+  adb-raw        ADBController, raw framebuffer, against a fake `adb` on PATH
+  adb-png        ADBController, `screencap -p`, same fake `adb`
+  adb-oneshot    ADBController input without the persistent shell
+  x11-shm        X11Controller, MIT-SHM capture, on a private Xvfb display
+  x11-xgetimage  X11Controller, plain XGetImage, same display
+  imagegrab      PIL ImageGrab on that display: the desktop path Steam,
+                 scrcpy and BlueStacks controllers use
+
+Per target: screenshot latency p50/p95/p99 (ms) and frames/s over
+--frames captures, and input round-trip (ms) of a non-organic click (the
+call returns once the tap/XTest event has been delivered). The JSON is
+meant for diffing between commits; it records the git revision.
+
+The fake `adb` answers instantly, so ADB numbers are the host-side cost
+(process spawns, pipes, PNG vs raw decode), not device time. On Linux the
+controllers need an X display just to import pyautogui; without Xvfb and
+$DISPLAY those targets report the import error.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+TARGETS = ("static", "adb-raw", "adb-png", "adb-oneshot", "x11-shm", "x11-xgetimage", "imagegrab")
+
+# Stands in for `adb`: serves canned frames and accepts input commands.
+# `adb -s X shell` with no command behaves like a shell reading stdin
+# (the persistent session); `input` is a no-op.
+_FAKE_ADB = """#!/bin/sh
+while [ "$1" = "-s" ]; do shift 2; done
+case "$1" in
+  devices) printf 'List of devices attached\\nbench\\tdevice\\n' ;;
+  exec-out)
+    if [ "$3" = "-p" ]; then cat "{png}"; else cat "{raw}"; fi ;;
+  shell)
+    shift
+    if [ $# -eq 0 ]; then
+      input() {{ :; }}
+      while IFS= read -r line; do eval "$line"; done
+    fi ;;
+esac
+"""
+
+
+def summarize(samples_s: Sequence[float]) -> Dict[str, float]:
+    """Latency samples (seconds) -> n, mean/p50/p95/p99/max in ms and calls/s."""
+    arr = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    if arr.size == 0:
+        return {"n": 0}
+    total_s = float(arr.sum()) / 1000.0
+    return {
+        "n": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "max_ms": round(float(arr.max()), 3),
+        "per_s": round(arr.size / total_s, 2) if total_s > 0 else None,
+    }
+
+
+def _time_calls(fn: Callable[[], Any], n: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    out: List[float] = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _test_frame(width: int, height: int) -> Image.Image:
+    """Busy synthetic screen so PNG sizes are realistic (not one flat colour)."""
+    rng = np.random.default_rng(7)
+    arr = np.full((height, width, 3), 70, dtype=np.uint8)
+    for y in range(0, height, 90):
+        arr[y + 8 : y + 80, 20 : width - 20] = rng.integers(90, 230, size=3)
+        arr[y + 20 : y + 40, 40 : 40 + int(rng.integers(1, max(2, width // 2)))] = 20
+    return Image.fromarray(arr)
+
+
+def write_fake_adb(workdir: Path, frame: Image.Image) -> Path:
+    """Write frame.png, frame.raw (16-byte header, RGBA_8888) and an `adb` script; -> its directory."""
+    png = workdir / "frame.png"
+    raw = workdir / "frame.raw"
+    frame.save(png, format="PNG")
+    rgba = np.asarray(frame.convert("RGBA"), dtype=np.uint8)
+    raw.write_bytes(struct.pack("<IIII", frame.width, frame.height, 1, 0) + rgba.tobytes())
+    script = workdir / "adb"
+    script.write_text(_FAKE_ADB.format(png=png, raw=raw))
+    script.chmod(0o755)
+    return workdir
+
+
+@contextmanager
+def _env_path(prefix: Path) -> Iterator[None]:
+    old = os.environ.get("PATH", "")
+    os.environ["PATH"] = f"{prefix}{os.pathsep}{old}"
+    try:
+        yield
+    finally:
+        os.environ["PATH"] = old
+
+
+@contextmanager
+def _xvfb(size: str) -> Iterator[Optional[str]]:
+    """Start a private Xvfb display; yields its name, or None when Xvfb is missing or fails."""
+    if shutil.which("Xvfb") is None:
+        yield None
+        return
+    for num in range(90, 110):
+        if not Path(f"/tmp/.X11-unix/X{num}").exists():
+            break
+    display = f":{num}"
+    proc = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", f"{size}x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 5.0
+        while not Path(f"/tmp/.X11-unix/X{num}").exists():
+            if proc.poll() is not None or time.monotonic() > deadline:
+                yield None
+                return
+            time.sleep(0.05)
+        yield display
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+def _capture(ctrl: Any) -> Image.Image:
+    img = ctrl.screenshot()
+    img.load()  # PNG captures decode lazily; count the decode
+    return img
+
+
+def _bench_controller(ctrl: Any, args: argparse.Namespace, *, click_at=(10, 10)) -> Dict[str, Any]:
+    img = _capture(ctrl)
+    result: Dict[str, Any] = {
+        "frame": [img.width, img.height],
+        "capture": summarize(_time_calls(lambda: _capture(ctrl), args.frames, args.warmup)),
+    }
+    if args.inputs > 0:
+        x, y = click_at
+        result["input"] = summarize(
+            _time_calls(
+                lambda: ctrl.click(x, y, use_organic_move=False, jitter=0, duration=0.0),
+                args.inputs,
+                min(args.warmup, 2),
+            )
+        )
+    return result
+
+
+def run_adb(target: str, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    from core.controllers.adb import ADBController
+
+    w, h = args.adb_size
+    write_fake_adb(workdir, _test_frame(w, h))
+    with _env_path(workdir):
+        ctrl = ADBController(
+            "bench",
+            screen_width=w,
+            screen_height=h,
+            auto_connect=False,
+            persistent_shell=target != "adb-oneshot",
+            capture_mode="png" if target == "adb-png" else "raw",
+        )
+        try:
+            return _bench_controller(ctrl, args)
+        finally:
+            ctrl.close()
+
+
+def run_desktop(target: str, args: argparse.Namespace, display: str) -> Dict[str, Any]:
+    from Xlib import X, display as xdisplay
+
+    # Something on screen with a title for X11Controller to find
+    dpy = xdisplay.Display(display)
+    screen = dpy.screen()
+    w, h = args.desktop_window
+    win = screen.root.create_window(
+        40, 40, w, h, 0, screen.root_depth, X.InputOutput, X.CopyFromParent,
+        background_pixel=screen.white_pixel, event_mask=X.ExposureMask,
+    )
+    win.set_wm_name("uma-bench")
+    win.map()
+    dpy.sync()
+    time.sleep(0.2)
+    try:
+        if target == "imagegrab":
+            from PIL import ImageGrab
+
+            bbox = (40, 40, 40 + w, 40 + h)
+            grab = lambda: ImageGrab.grab(bbox=bbox, xdisplay=display)  # noqa: E731
+            img = grab()
+            return {
+                "frame": [img.width, img.height],
+                "capture": summarize(_time_calls(grab, args.frames, args.warmup)),
+            }
+
+        from core.controllers.x11 import X11Controller
+
+        ctrl = X11Controller("uma-bench", display=display, use_shm=target == "x11-shm")
+        try:
+            return _bench_controller(ctrl, args, click_at=(60, 60))
+        finally:
+            ctrl.close()
+    finally:
+        win.destroy()
+        dpy.close()
+
+
+def run_static(args: argparse.Namespace) -> Dict[str, Any]:
+    from core.controllers.static_image import StaticImageController
+
+    ctrl = StaticImageController(_test_frame(*args.adb_size))
+    img = ctrl.screenshot()
+    return {
+        "frame": [img.width, img.height],
+        "capture": summarize(_time_calls(ctrl.screenshot, args.frames, args.warmup)),
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _size(text: str) -> tuple:
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    ap.add_argument("--frames", type=int, default=100, help="timed captures per target")
+    ap.add_argument("--inputs", type=int, default=30, help="timed clicks per target (0 = skip)")
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--adb-size", type=_size, default=(1080, 1920), help="fake device frame, WxH")
+    ap.add_argument("--desktop-window", type=_size, default=(800, 450), help="X11 window size, WxH")
+    ap.add_argument("--xvfb-screen", default="1280x720")
+    ap.add_argument("--pyautogui-pause", type=float, default=None,
+                    help="override pyautogui.PAUSE (default: leave the library default, as the bot does)")
+    ap.add_argument("--json", type=Path, default=None, help="write results here")
+    args = ap.parse_args(argv)
+
+    desktop = [t for t in args.targets if t in ("x11-shm", "x11-xgetimage", "imagegrab")]
+    results: Dict[str, Any] = {}
+    meta: Dict[str, Any] = {
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "frames": args.frames,
+        "inputs": args.inputs,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    # On Linux every controller imports pyautogui, which needs an X display; desktop
+    # targets always get a private one so the clicks never land on a real desktop
+    linux = sys.platform.startswith("linux")
+    need_xvfb = linux and (bool(desktop) or not os.environ.get("DISPLAY"))
+    with _xvfb(args.xvfb_screen) if need_xvfb else _null() as display:
+        if display:
+            # pyautogui binds to $DISPLAY on import; point it at the private server first
+            os.environ["DISPLAY"] = display
+        if display or os.environ.get("DISPLAY") or sys.platform == "win32":
+            import pyautogui
+
+            if args.pyautogui_pause is not None:
+                pyautogui.PAUSE = args.pyautogui_pause
+            meta["pyautogui_pause"] = pyautogui.PAUSE
+
+        for target in args.targets:
+            try:
+                if target == "static":
+                    results[target] = run_static(args)
+                elif target.startswith("adb"):
+                    if sys.platform == "win32":
+                        results[target] = {"skipped": "fake adb is a POSIX shell script"}
+                        continue
+                    with tempfile.TemporaryDirectory(prefix="uma-bench-") as tmp:
+                        results[target] = run_adb(target, args, Path(tmp))
+                elif display is None:
+                    results[target] = {"skipped": "Xvfb not available"}
+                else:
+                    results[target] = run_desktop(target, args, display)
+            except Exception as exc:  # keep the other targets going
+                results[target] = {"error": f"{type(exc).__name__}: {exc}"}
+            print(f"{target:14s} {_one_line(results[target])}", flush=True)
+
+    report = {"meta": meta, "results": results}
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2))
+    return report
+
+
+@contextmanager
+def _null() -> Iterator[None]:
+    yield None
+
+
+def _one_line(res: Dict[str, Any]) -> str:
+    if "capture" not in res:
+        return str(res)
+    cap = res["capture"]
+    line = f"capture p50 {cap['p50_ms']:.1f} ms  p95 {cap['p95_ms']:.1f}  p99 {cap['p99_ms']:.1f}  {cap['per_s']} fps"
+    if "input" in res:
+        line += f"  | input p50 {res['input']['p50_ms']:.1f} ms  p95 {res['input']['p95_ms']:.1f}"
+    return line
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from PIL import Image, ImageDraw
 
 from core.controllers.base import IController
 from core.perception.yolo.interface import IDetector
 from core.settings import Settings
+from core.utils.boxes import as_boxes, centers, iou_matrix
 from core.utils.logger import logger_uma
 from core.utils.yolo_objects import collect, find as det_find
 from core.utils.abort import abort_requested
@@ -45,20 +47,6 @@ def _ltr_sort(dets: List[Detection]) -> List[Detection]:
     return sorted(dets, key=lambda d: _center(d["xyxy"])[0])
 
 
-def _iou(a: XYXY, b: XYXY) -> float:
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
-    ix1, iy1 = max(ax1, bx1), max(ay1, by1)
-    ix2, iy2 = min(ax2, bx2), min(ay2, by2)
-    iw, ih = max(0.0, ix2 - ix1), max(0.0, iy2 - iy1)
-    inter = iw * ih
-    if inter <= 0.0:
-        return 0.0
-    area_a = max(1.0, (ax2 - ax1) * (ay2 - ay1))
-    area_b = max(1.0, (bx2 - bx1) * (by2 - by1))
-    return inter / (area_a + area_b - inter)
-
-
 # ---------------------------
 # Config
 # ---------------------------
@@ -176,21 +164,15 @@ class ClawGame:
     def _exclude_near_button(
         self, plushies: List[Detection], btn_xyxy: XYXY
     ) -> List[Detection]:
-        bx1, by1, bx2, by2 = btn_xyxy
-        bcx, bcy = (bx1 + bx2) * 0.5, (by1 + by2) * 0.5
-        out: List[Detection] = []
-        for d in plushies:
-            x1, y1, x2, y2 = d["xyxy"]
-            cx, cy = (x1 + x2) * 0.5, (y1 + y2) * 0.5
-            if _iou(d["xyxy"], btn_xyxy) > self.cfg.near_button_iou_thr:
-                continue
-            if (
-                abs(cx - bcx) < self.cfg.near_button_center_px
-                and abs(cy - bcy) < self.cfg.near_button_center_px
-            ):
-                continue
-            out.append(d)
-        return out
+        if not plushies:
+            return []
+        boxes = as_boxes(plushies)
+        btn = as_boxes([btn_xyxy])
+        overlapping = iou_matrix(boxes, btn, min_area=1.0)[:, 0] > self.cfg.near_button_iou_thr
+        near = np.all(
+            np.abs(centers(boxes) - centers(btn)) < self.cfg.near_button_center_px, axis=1
+        )
+        return [d for d, drop in zip(plushies, overlapping | near) if not drop]
 
     def _filter_viable(
         self, plushies: List[Detection], claw_xyxy: XYXY
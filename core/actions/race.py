@@ -32,7 +32,9 @@ from core.utils.geometry import crop_pil
 from core.utils.logger import logger_uma
 from core.utils.text import _normalize_ocr, fuzzy_ratio
 from core.utils.yolo_objects import collect, find, bottom_most, inside
-from core.utils.pointer import smart_scroll_small
+from core.utils.pointer import scroll_list_page, smart_scroll_small
+from core.utils.scroll_calibration import ListEndCheck
+from core.utils.screen_settle import settle_or_sleep
 from core.utils.abort import abort_requested, request_abort
 
 
@@ -431,10 +433,11 @@ class RaceFlow:
             return None
 
         seen_title_counts: Dict[str, int] = {}
+        list_end = ListEndCheck()
 
         for scroll_j in range(max_scrolls + 1):
-            # Wait screen to stabilize
-            time.sleep(1)
+            # Wait screen to stabilize (list open / scroll inertia)
+            settle_or_sleep(self.ctrl, 1.0, min_wait_s=0.2)
             game_img, dets = self._collect("race_pick")
             squares = find(dets, "race_square")
             if squares:
@@ -698,9 +701,16 @@ class RaceFlow:
                 moved_cursor = True
 
             # probe next batch
-            smart_scroll_small(self.ctrl, steps_pc=4, anchor_xy=anchor_xy)
-            did_scroll = True
-            time.sleep(0.35)
+            if Settings.CALIBRATED_SCROLL and squares:
+                shift = scroll_list_page(self.ctrl, [sq["xyxy"] for sq in squares])
+                did_scroll = True
+                if list_end.reached(shift):
+                    logger_uma.info("[race] Reached the end of the race list")
+                    break
+            else:
+                smart_scroll_small(self.ctrl, steps_pc=4, anchor_xy=anchor_xy)
+                did_scroll = True
+                time.sleep(0.35)
 
         if best_non_g1 is not None:
             # end-of-scroll fallback is always a click
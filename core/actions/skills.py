@@ -29,7 +29,9 @@ from core.perception.is_button_active import ActiveButtonClassifier
 from core.types import DetectionDict
 from core.utils.yolo_objects import inside, yolo_signature
 from core.utils.waiter import Waiter
-from core.utils.pointer import smart_scroll_small
+from core.utils.pointer import scroll_list_page, smart_scroll_small
+from core.utils.scroll_calibration import ListEndCheck
+from core.utils.screen_settle import settle_or_sleep
 
 
 class SkillsBuyStatus(Enum):
@@ -131,6 +133,7 @@ class SkillsFlow:
             purchases_made[t] = 0
 
         patience = 3
+        list_end = ListEndCheck()
         for i in range(max_scrolls):
             clicked, game_img, dets, cur_ocr_sig = self._scan_and_click_buys(
                 targets=skill_list,
@@ -168,7 +171,9 @@ class SkillsFlow:
             if i == 0 and not any_clicked:
                 self._focus_nudge(game_img, dets)
 
-            self._scroll_once(scroll_time_range)
+            if not self._scroll_once(scroll_time_range, dets, list_end=list_end):
+                logger_uma.info("[skills] Reached the end of the skills list.")
+                break
 
         if any_clicked:
             logger_uma.info("[skills] Confirming purchases...")
@@ -189,7 +194,7 @@ class SkillsFlow:
             )
 
         logger_uma.info("[skills] No matching skills found to buy.")
-        time.sleep(1.2)
+        settle_or_sleep(self.ctrl, 1.2)
         recovered = self._ensure_exit_to_lobby(
             tag_prefix="skills_flow_back_no_buys",
             prefer_back_only=True,
@@ -572,7 +577,7 @@ class SkillsFlow:
         ):
             logger_uma.warning("Confirm button not found")
             return False
-        time.sleep(waiting_popup)
+        settle_or_sleep(self.ctrl, waiting_popup, min_wait_s=0.2)
 
         # Learn
         if not self.waiter.click_when(
@@ -585,7 +590,7 @@ class SkillsFlow:
             logger_uma.warning("Confirm button not found")
             return False
 
-        time.sleep(waiting_popup * 2)
+        settle_or_sleep(self.ctrl, waiting_popup * 2, min_wait_s=0.3)
 
         # Close
         if not self.waiter.click_when(
@@ -598,7 +603,7 @@ class SkillsFlow:
         ):
             logger_uma.warning("Close button not found")
             return False
-        time.sleep(waiting_popup)
+        settle_or_sleep(self.ctrl, waiting_popup, min_wait_s=0.2)
 
         # Back
         if not self.waiter.click_when(
@@ -641,7 +646,7 @@ class SkillsFlow:
                     tag=f"{tag_prefix}_{texts[0].lower()}_{attempt}",
                 )
                 if clicked:
-                    time.sleep(0.6)
+                    settle_or_sleep(self.ctrl, 0.6)
                     if self._is_lobby_or_raceday_visible():
                         return True
 
@@ -685,14 +690,28 @@ class SkillsFlow:
         except Exception as e:
             logger_uma.debug("[skills] Focus nudge failed: %s", e)
 
-    def _scroll_once(self, scroll_time_range: Tuple[int, int]) -> None:
+    def _scroll_once(
+        self,
+        scroll_time_range: Tuple[int, int],
+        dets: Optional[List[DetectionDict]] = None,
+        *,
+        list_end: Optional[ListEndCheck] = None,
+    ) -> bool:
         """
         One scroll step (PC: wheel nudges; Android: drag with end-hold to kill inertia).
+        With CALIBRATED_SCROLL and visible skill rows, one measured page scroll instead.
+        Returns False once `list_end` (when given) says the list no longer moves.
         """
+        if Settings.CALIBRATED_SCROLL:
+            rows = [d["xyxy"] for d in (dets or []) if d.get("name") == "skills_square"]
+            if rows:
+                shift = scroll_list_page(self.ctrl, rows)
+                return list_end is None or not list_end.reached(shift)
+
         if isinstance(self.ctrl, ScrcpyController):
             xywh = self.ctrl._client_bbox_screen_xywh()
             if xywh is None:
-                return
+                return True
             x, y, w, h = xywh
             cx, cy = (x + w // 2), int(y + h * 0.60)
             self.ctrl.move_to(cx, cy)
@@ -728,7 +747,7 @@ class SkillsFlow:
         elif isinstance(self.ctrl, BlueStacksController):
             xywh = self.ctrl._client_bbox_screen_xywh()
             if not xywh:
-                return
+                return True
             x, y, w, h = xywh
             cx, cy = (x + w // 2), int(y + h * 0.60)
             self.ctrl.move_to(cx, cy)
@@ -746,3 +765,4 @@ class SkillsFlow:
                 self.ctrl.scroll(-1)
                 time.sleep(0.01)
         time.sleep(0.12)
+        return True
@@ -1,7 +1,6 @@
 
 from __future__ import annotations
 
-import time
 from typing import Dict, List, Optional, Tuple, Union
 import random
 
@@ -13,6 +12,7 @@ from core.settings import Settings
 from core.types import DetectionDict
 from core.utils.geometry import calculate_jitter
 from core.utils.logger import logger_uma
+from core.utils.screen_settle import settle_or_sleep
 from core.utils.skill_memory import SkillMemoryManager
 from typing import Any
 from dataclasses import dataclass, asdict
@@ -23,7 +23,8 @@ from core.utils.training_check_helpers import (
     raised_training_ltr_index,
     collect_supports_enriched,
     failure_pct,
-    reindex_left_to_right
+    reindex_left_to_right,
+    training_scan_rois,
 )
 from core.scenarios.registry import registry
 
@@ -49,6 +50,9 @@ def scan_training_screen(
           - refresh button geometry (LTR),
           - collect supports present in that capture (they belong to the raised tile),
           - extract failure%.
+    With YOLO_TRAINING_ROI, per-tile recaptures detect only inside the support
+    column and bottom panel, so a `last_parsed` from one of them holds only
+    those detections.
     Returns: (training_state, last_img, last_parsed)
     """
     # -------- detector params --------
@@ -64,7 +68,7 @@ def scan_training_screen(
         return 0.6
 
     # -------- 1) Initial capture, wait for button training animations --------
-    time.sleep(0.3)
+    settle_or_sleep(ctrl, 0.3, min_wait_s=0.05)
     cur_img, _, cur_parsed = yolo_engine.recognize(
         imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training"
     )
@@ -72,7 +76,7 @@ def scan_training_screen(
     btns = get_buttons_ltr(cur_parsed)
 
     if btns and len(btns) != 5:
-        time.sleep(0.5)
+        settle_or_sleep(ctrl, 0.5)
         # try again
         cur_img, _, cur_parsed = yolo_engine.recognize(
             imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training"
@@ -83,6 +87,30 @@ def scan_training_screen(
         logger_uma.warning("No training buttons detected.")
         return [], cur_img, cur_parsed
 
+    # Per-tile recaptures only need the support column and the bottom panel
+    rois = (
+        training_scan_rois(cur_parsed, *cur_img.size)
+        if Settings.YOLO_TRAINING_ROI
+        else None
+    )
+    roi_failed = False
+
+    def _recapture():
+        nonlocal rois, roi_failed
+        img, _, parsed = yolo_engine.recognize(
+            imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training", rois=rois
+        )
+        if rois is not None and len(get_buttons_ltr(parsed)) != len(scan):
+            # Layout moved off the anchors: full frames for the rest of the scan
+            logger_uma.debug("[training] ROI capture lost the buttons; using full frames")
+            rois, roi_failed = None, True
+            img, _, parsed = yolo_engine.recognize(
+                imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training"
+            )
+        elif rois is None and not roi_failed and Settings.YOLO_TRAINING_ROI:
+            rois = training_scan_rois(parsed, *img.size)
+        return img, parsed
+
     # Fixed LTR scaffold
     scan = [
         {
@@ -134,10 +162,8 @@ def scan_training_screen(
                     clicks=1,
                     jitter=calculate_jitter(tile["tile_xyxy"], percentage_offset=0.20),
                 )
-                time.sleep(_jitter_delay())
-                cur_img, _, cur_parsed = yolo_engine.recognize(
-                    imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training"
-                )
+                settle_or_sleep(ctrl, _jitter_delay())
+                cur_img, cur_parsed = _recapture()
                 # Refresh LTR geometry
                 btns_now = [d for d in cur_parsed if d["name"] == "training_button"]
                 btns_now.sort(key=lambda d: _center_x(d["xyxy"]))
@@ -217,12 +243,10 @@ def scan_training_screen(
             jitter=calculate_jitter(tile["tile_xyxy"], percentage_offset=0.20),
         )
 
-        time.sleep(_jitter_delay())
+        settle_or_sleep(ctrl, _jitter_delay())
 
         # Recapture once
-        cur_img, _, cur_parsed = yolo_engine.recognize(
-            imgsz=param_imgsz, conf=param_conf, iou=param_iou, tag="training"
-        )
+        cur_img, cur_parsed = _recapture()
 
         # Refresh geometry (LTR) to keep tile_xyxy up-to-date
         btns_now = get_buttons_ltr(cur_parsed)
@@ -325,15 +325,21 @@ class AgentUnityCup(AgentScenario):
                 iou=self.iou,
                 tag="screen",
                 agent=self.agent_name,
+                gate=self._screen_gate,
             )
 
-            screen, _ = classify_screen_unity_cup(
-                dets,
-                lobby_conf=0.5,
-                require_infirmary=True,
-                training_conf=0.50,
-                names_map=None,
-            )
+            if self._screen_cache is not None and self._screen_cache[0] is dets:
+                # Gate handed back the previous detections: same screen as last tick
+                screen = self._screen_cache[1]
+            else:
+                screen, _ = classify_screen_unity_cup(
+                    dets,
+                    lobby_conf=0.5,
+                    require_infirmary=True,
+                    training_conf=0.50,
+                    names_map=None,
+                )
+                self._screen_cache = (dets, screen)
 
             is_lobby_summer = screen == "LobbySummer"
             unknown_screen = screen.lower() == "unknown"
@@ -15,6 +15,8 @@ from core.controllers.base import IController
 from core.perception.ocr.interface import OCRInterface
 from core.perception.yolo.interface import IDetector
 from core.settings import Settings
+from core.types import DetectionDict
+from core.utils.frame_gate import FrameChangeGate
 from core.utils.logger import logger_uma
 from core.utils.skill_memory import SkillMemoryManager
 from core.utils.date_uma import date_index as uma_date_index
@@ -61,6 +63,11 @@ class AgentScenario(ABC):
         self.imgsz = Settings.YOLO_IMGSZ
         self.conf = Settings.YOLO_CONF
         self.iou = Settings.YOLO_IOU
+        # Main-loop ticks on a static screen reuse the last detections/classification
+        self._screen_gate: Optional[FrameChangeGate] = (
+            FrameChangeGate(max_age_s=Settings.FRAME_GATE_MAX_REUSE_S) if Settings.FRAME_GATE else None
+        )
+        self._screen_cache: Optional[Tuple[List[DetectionDict], str]] = None
         self.prioritize_g1 = bool(prioritize_g1)
         self._skip_training_race_once = False
         self.plan_races = dict(plan_races or {})
@@ -9,8 +9,11 @@ from typing import Optional, Tuple, Union
 
 from PIL import Image
 
+from core.controllers.adb_screencap import decode_raw_screencap
+from core.controllers.adb_shell import ADBShellSession
 from core.controllers.base import IController, RegionXYWH
 from core.types import XYXY
+from core.utils.logger import logger_uma
 
 
 class ADBController(IController):
@@ -23,11 +26,20 @@ class ADBController(IController):
         screen_width: Optional[int] = None,
         screen_height: Optional[int] = None,
         auto_connect: bool = True,
+        persistent_shell: bool = True,
+        capture_mode: str = "png",
     ) -> None:
         super().__init__(window_title="", capture_client_only=False)
         self.device = (device or "").strip() or None
         self._screen_width = screen_width
         self._screen_height = screen_height
+        # Taps/swipes go through one long-lived `adb shell` instead of a new adb process each
+        self._shell_session: Optional[ADBShellSession] = (
+            ADBShellSession(self.device) if persistent_shell else None
+        )
+        # "png": `screencap -p`; "raw" (opt-in): unencoded framebuffer, no PNG encode on
+        # device / decode on host, but ~8 MB a frame on the wire
+        self.capture_mode = "raw" if str(capture_mode).lower() == "raw" else "png"
 
         if auto_connect and self.device:
             self._auto_connect_device(self.device)
@@ -65,6 +77,20 @@ class ADBController(IController):
 
         return result
 
+    def _shell(self, *args: str, timeout: float = 10.0) -> None:
+        """Run an input command on the device, over the persistent shell when enabled."""
+        try:
+            if self._shell_session is None:
+                self._adb_command("shell", *args, timeout=timeout)
+            else:
+                self._shell_session.run_args(args, timeout=timeout)
+        finally:
+            self._note_input()
+
+    def close(self) -> None:
+        if self._shell_session is not None:
+            self._shell_session.close()
+
     def _auto_connect_device(self, device: str) -> None:
         try:
             listing = subprocess.run(
@@ -157,6 +183,18 @@ class ADBController(IController):
         prefix = self.device.split(":", 1)[0]
         return any(dev == self.device or dev.startswith(prefix) for dev in devices)
 
+    def _scroll_gesture(self, units: float, region: RegionXYWH) -> None:
+        # Same drag as the base, without the 35%-of-screen cap (scroll_by clamps itself)
+        _, _, w, h = region
+        half = abs(units) / 2.0
+        self.scroll(
+            (w / 2.0 - 1, h / 2.0 - half, w / 2.0 + 1, h / 2.0 + half),
+            default_down=units < 0,
+            min_px=1,
+            jitter=0,
+            max_pixels_ratio=None,
+        )
+
     def scroll(
         self,
         delta_or_xyxy: Union[int, XYXY],
@@ -212,8 +250,7 @@ class ADBController(IController):
             y1j = y_end + (random.randint(-jitter_val, jitter_val) if jitter_val else 0)
 
             duration_ms = int(random.uniform(*duration_range) * 1000)
-            self._adb_command(
-                "shell",
+            self._shell(
                 "input",
                 "swipe",
                 str(max(0, min(width - 1, int(xj)))),
@@ -228,8 +265,7 @@ class ADBController(IController):
             hold_ms = int(random.uniform(*end_hold_range) * 1000)
             if hold_ms > 0:
                 hold_timeout = (hold_ms / 1000.0) + 5.0  # Add 5s buffer
-                self._adb_command(
-                    "shell",
+                self._shell(
                     "input",
                     "swipe",
                     str(max(0, min(width - 1, int(xj)))),
@@ -247,11 +283,26 @@ class ADBController(IController):
     # ------------------------------------------------------------------
     # Capture & input overrides
     # ------------------------------------------------------------------
-    def screenshot(self, region: Optional[RegionXYWH] = None) -> Image.Image:
+    def _capture_frame(self) -> Image.Image:
+        if self.capture_mode == "raw":
+            result = self._adb_command("exec-out", "screencap", text=False)
+            try:
+                return Image.fromarray(decode_raw_screencap(result.stdout))
+            except ValueError as exc:
+                # Unknown pixel format or vendor quirk: PNG always works, stick to it
+                logger_uma.warning("[ADB] raw screencap unusable (%s); falling back to PNG", exc)
+                self.capture_mode = "png"
+
         result = self._adb_command("exec-out", "screencap", "-p", text=False)
         img = Image.open(io.BytesIO(result.stdout))
         if img.mode != "RGB":
             img = img.convert("RGB")
+        return img
+
+    def _capture(
+        self, region: Optional[RegionXYWH] = None
+    ) -> Tuple[Image.Image, Tuple[int, int], Tuple[int, int, int, int]]:
+        img = self._capture_frame()
 
         self._screen_width = img.width
         self._screen_height = img.height
@@ -259,13 +310,8 @@ class ADBController(IController):
         if region is not None:
             left, top, width, height = region
             img = img.crop((left, top, left + width, top + height))
-            self._last_origin = (left, top)
-            self._last_bbox = (left, top, width, height)
-        else:
-            self._last_origin = (0, 0)
-            self._last_bbox = (0, 0, img.width, img.height)
-
-        return img
+            return img, (left, top), (left, top, width, height)
+        return img, (0, 0), (0, 0, img.width, img.height)
 
     def move_to(self, x: int, y: int, duration: float = 0.15) -> None:  # pragma: no cover - no-op
         time.sleep(max(0.0, duration))
@@ -295,7 +341,7 @@ class ADBController(IController):
             time.sleep(random.uniform(0.03, 0.08))
 
         for _ in range(max(1, clicks)):
-            self._adb_command("shell", "input", "tap", str(tx), str(ty))
+            self._shell("input", "tap", str(tx), str(ty))
             if clicks > 1:
                 time.sleep(max(0.05, duration))
 
@@ -325,8 +371,7 @@ class ADBController(IController):
             ty = max(0, min(self._screen_height - 1, ty))
 
         duration_ms = int(max(0.05, seconds) * 1000)
-        self._adb_command(
-            "shell",
+        self._shell(
             "input",
             "swipe",
             str(tx),
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import struct
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Android PixelFormat ids that `screencap` (without -p) emits -> bytes per pixel
+PIXEL_FORMATS: Dict[int, Tuple[str, int]] = {
+    1: ("RGBA_8888", 4),
+    2: ("RGBX_8888", 4),
+    3: ("RGB_888", 3),
+    4: ("RGB_565", 2),
+    5: ("BGRA_8888", 4),
+}
+
+# width, height, format (+ colour space since Android 9)
+_HEADER_SIZES = (12, 16)
+
+
+def decode_raw_screencap(data: bytes) -> np.ndarray:
+    """
+    Decode the output of `adb exec-out screencap` (no `-p`) into an RGB uint8 array.
+
+    The device skips PNG encoding and the host skips PNG decoding, which is
+    the slowest part of each ADB capture. Raises ValueError on an unknown
+    pixel format or a size that does not match the header.
+    """
+    if len(data) < 12:
+        raise ValueError(f"raw screencap too short ({len(data)} bytes)")
+    width, height, fmt = struct.unpack_from("<III", data, 0)
+    if fmt not in PIXEL_FORMATS:
+        raise ValueError(f"unsupported screencap pixel format {fmt}")
+    _, bpp = PIXEL_FORMATS[fmt]
+    if width <= 0 or height <= 0:
+        raise ValueError(f"bad screencap size {width}x{height}")
+
+    header, stride = _layout(len(data), width, height, bpp)
+    rows = np.frombuffer(data, dtype=np.uint8, count=stride * height * bpp, offset=header)
+    px = rows.reshape(height, stride, bpp)[:, :width]
+
+    if fmt in (1, 2, 3):
+        return np.ascontiguousarray(px[..., :3])
+    if fmt == 5:
+        return np.ascontiguousarray(px[..., 2::-1])
+    # RGB_565, little endian
+    v = px.view("<u2")[..., 0].astype(np.uint32)
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[..., 0] = ((v >> 11) & 0x1F) * 255 // 31
+    rgb[..., 1] = ((v >> 5) & 0x3F) * 255 // 63
+    rgb[..., 2] = (v & 0x1F) * 255 // 31
+    return rgb
+
+
+def _layout(size: int, width: int, height: int, bpp: int) -> Tuple[int, int]:
+    """-> (header bytes, row stride in pixels). Some devices pad rows to an aligned stride."""
+    for header in _HEADER_SIZES:
+        if size - header == width * height * bpp:
+            return header, width
+    for header in _HEADER_SIZES:
+        body = size - header
+        if body > 0 and body % (height * bpp) == 0 and body // (height * bpp) >= width:
+            return header, body // (height * bpp)
+    raise ValueError(f"raw screencap size {size} does not match {width}x{height}x{bpp}")
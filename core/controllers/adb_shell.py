@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import itertools
+import queue
+import subprocess
+import threading
+from typing import List, Optional, Sequence
+
+from core.utils.logger import logger_uma
+
+_SENTINEL = "__UMA_DONE__"
+
+
+class ADBShellSession:
+    """
+    One long-lived `adb shell` process that runs commands streamed over stdin.
+
+    Each command is followed by `echo <sentinel> $?`; the output up to the
+    sentinel line is the command's output and the number after it its exit
+    status. Spawning `adb` per tap costs tens of milliseconds (far more on
+    Windows), this costs one pipe write and one line read.
+
+    If the shell has died (device reconnect, emulator restart, adb server
+    kill) the next call spawns a new one. A command is re-sent only when it
+    could not be written at all, so a tap is never delivered twice.
+    """
+
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        *,
+        adb_path: str = "adb",
+        timeout: float = 10.0,
+    ) -> None:
+        self.device = device
+        self.adb_path = adb_path
+        self.timeout = float(timeout)
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.spawns = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def run(self, command: str, *, timeout: Optional[float] = None) -> str:
+        """Run one shell command line and return its output; raise RuntimeError on failure."""
+        with self._lock:
+            token = f"{_SENTINEL}{next(self._seq)}"
+            payload = f"{command}; echo {token} $?\n".encode("utf-8")
+            try:
+                self._write(payload)
+            except (OSError, ValueError):
+                # Shell went away between calls: nothing was delivered, safe to resend
+                self._close_locked()
+                self._write(payload)
+            return self._read_until(token, command, timeout if timeout is not None else self.timeout)
+
+    def run_args(self, args: Sequence[str], *, timeout: Optional[float] = None) -> str:
+        return self.run(" ".join(str(a) for a in args), timeout=timeout)
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_locked()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _spawn(self) -> subprocess.Popen:
+        cmd: List[str] = [self.adb_path]
+        if self.device:
+            cmd.extend(["-s", self.device])
+        cmd.append("shell")
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+            )
+        except FileNotFoundError as exc:  # pragma: no cover - adb missing
+            raise RuntimeError(
+                "ADB executable not found. Install Android Platform Tools and ensure 'adb' is on PATH."
+            ) from exc
+
+        # Pipes have no portable non-blocking read (select() does not work on
+        # Windows pipes), so a daemon thread feeds lines into a queue.
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+
+        def _pump() -> None:
+            assert proc.stdout is not None
+            for raw in iter(proc.stdout.readline, b""):
+                lines.put(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+            lines.put(None)  # EOF
+
+        threading.Thread(target=_pump, name="adb-shell-reader", daemon=True).start()
+        self._lines = lines
+        self.spawns += 1
+        if self.spawns > 1:
+            logger_uma.info("[ADB] shell session reconnected (spawn #%d)", self.spawns)
+        return proc
+
+    def _write(self, payload: bytes) -> None:
+        if self._proc is None or self._proc.poll() is not None:
+            self._close_locked()
+            self._proc = self._spawn()
+        assert self._proc.stdin is not None
+        self._proc.stdin.write(payload)
+        self._proc.stdin.flush()
+
+    def _read_until(self, token: str, command: str, timeout: float) -> str:
+        out: List[str] = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                # State of the shell is unknown now; drop it so the next call starts clean
+                if self._proc is not None:
+                    self._proc.kill()
+                self._close_locked()
+                raise RuntimeError(f"ADB shell command timed out: {command}")
+            if line is None:
+                self._close_locked()
+                raise RuntimeError(f"ADB shell exited while running: {command}")
+            if line.startswith(token):
+                status = line[len(token):].strip()
+                break
+            out.append(line)
+
+        output = "\n".join(out)
+        if status not in ("", "0"):
+            raise RuntimeError(f"ADB shell command failed ({command}): exit {status} {output.strip()}")
+        return output
+
+    def _close_locked(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.poll() is None and proc.stdin is not None:
+                proc.stdin.write(b"exit\n")
+                proc.stdin.flush()
+        except (OSError, ValueError):
+            pass
+        try:
+            proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            try:
+                proc.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:  # pragma: no cover - defensive
+                pass
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                if stream is not None:
+                    stream.close()
+            except OSError:
+                pass
@@ -7,7 +7,6 @@ from typing import Optional, Tuple, Union
 
 import pyautogui
 import pygetwindow as gw
-from PIL import ImageGrab, Image
 
 # Requires pywin32
 import win32con
@@ -113,33 +112,6 @@ class ScrcpyController(IController):
 
     # --- IController API ---
 
-    def screenshot(self, region: Optional[RegionXYWH] = None) -> Image.Image:
-        """
-        If region is provided (absolute screen XYWH), capture that.
-        Else, capture the window client area if capture_client_only=True, otherwise full screen.
-        Keeps self._last_origin and self._last_bbox updated.
-        """
-        if region is not None:
-            left, top, width, height = region
-            bbox = (left, top, left + width, top + height)
-            self._last_origin = (left, top)
-            self._last_bbox = (left, top, width, height)
-            return ImageGrab.grab(bbox=bbox)
-
-        if self.capture_client_only:
-            xywh = self._client_bbox_screen_xywh()
-            if xywh:
-                left, top, width, height = xywh
-                self._last_origin = (left, top)
-                self._last_bbox = (left, top, width, height)
-                return ImageGrab.grab(bbox=(left, top, left + width, top + height))
-
-        # Fallback: full screen
-        scr = ImageGrab.grab()
-        self._last_origin = (0, 0)
-        self._last_bbox = (0, 0, scr.width, scr.height)
-        return scr
-
     def scroll(
         self,
         delta_or_xyxy: Union[int, XYXY],
@@ -206,5 +178,6 @@ class ScrcpyController(IController):
             self.move_to(xj, y1j, duration=random.uniform(*duration_range))
             time.sleep(random.uniform(*end_hold_range))  # <<< hold here
             pyautogui.mouseUp(xj, y1j)
+            self._note_input()
 
             time.sleep(random.uniform(*pause_range))
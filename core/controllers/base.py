@@ -7,8 +7,11 @@ import time
 import pyautogui
 from PIL import ImageGrab, Image
 
+from core.controllers.frame_grabber import FrameGrabber
 from core.types import XYXY, RegionXYWH
 from core.utils.geometry import calculate_jitter
+from core.utils.scroll_calibration import ScrollCalibration, measure_vertical_shift
+from core.utils.screen_settle import wait_for_settle
 
 
 class IController(ABC):
@@ -24,6 +27,11 @@ class IController(ABC):
     Everything else is generic and implemented here.
     """
 
+    # Starting guess for content pixels per unit of `scroll()` delta (drag px);
+    # scroll_by() refines it from measurements.
+    SCROLL_PX_PER_UNIT: float = 1.0
+    SCROLL_INTEGER_UNITS: bool = True
+
     def __init__(self, window_title: str, capture_client_only: bool = True) -> None:
         self.window_title = window_title
         self.capture_client_only = capture_client_only
@@ -32,6 +40,12 @@ class IController(ABC):
             0,
         )  # (left, top) of last capture in SCREEN coords
         self._last_bbox: Tuple[int, int, int, int] = (0, 0, 0, 0)  # (L, T, W, H)
+        # Optional background capture (see start_frame_grabber)
+        self._grabber: Optional[FrameGrabber] = None
+        self._last_input_ts: float = 0.0  # monotonic time of the last click/scroll/key
+        self._scroll_cal = ScrollCalibration(
+            self.SCROLL_PX_PER_UNIT, integer_units=self.SCROLL_INTEGER_UNITS
+        )
 
     # ---- Abstracts that depend on platform/window system ----
     @abstractmethod
@@ -67,36 +81,164 @@ class IController(ABC):
         """Scrolling function"""
         ...
 
-    # ---- Generic capture & geometry ----
-    def screenshot(self, region: Optional[RegionXYWH] = None) -> Image.Image:
+    def _scroll_gesture(self, units: float, region: RegionXYWH) -> None:
         """
-        Capture a screenshot.
+        One scroll of `units` (see `scroll`) with the pointer inside `region`.
+        Must be called right after capturing `region`: the box is in its local coords.
+        """
+        _, _, w, h = region
+        half = abs(units) / 2.0
+        self.scroll(
+            (w / 2.0 - 1, h / 2.0 - half, w / 2.0 + 1, h / 2.0 + half),
+            default_down=units < 0,
+            min_px=1,
+            jitter=0,  # calibrated drag: no random endpoint offset
+        )
 
-        - If `region` is provided, it MUST be absolute SCREEN coords (L, T, W, H).
-        - Else if `capture_client_only=True`, capture the client area.
-        - Else capture full screen.
+    def scroll_by(
+        self,
+        pixels: float,
+        *,
+        region: Optional[RegionXYWH] = None,
+        settle_timeout_s: float = 1.0,
+    ) -> Optional[float]:
+        """
+        Scroll the list inside `region` (SCREEN coords; default: the capture
+        area) by about `pixels` of content, negative = down like `scroll`.
 
-        Updates internal origin/bbox accordingly.
+        Issues a single gesture sized from what previous calls measured, then
+        measures the actual shift by phase correlation of the region before and
+        after. Returns that shift (about 0 at the end of the list), or None when
+        it could not be measured. Keep |pixels| under half the region height;
+        larger requests are clamped.
+        """
+        if region is None:
+            region = self._client_bbox_screen_xywh()
+            if region is None:
+                return None
+        before = self.screenshot(region=region)
+        limit = 0.45 * before.height
+        pixels = max(-limit, min(limit, float(pixels)))
+        cal = self._scroll_cal
+        units = cal.units_for(pixels)
+        self._scroll_gesture(units, region)
+        wait_for_settle(self, region=region, timeout_s=settle_timeout_s, min_wait_s=0.05)
+        after = self.screenshot(region=region)
+        try:
+            dy, response = measure_vertical_shift(before, after, expected=units * cal.gain)
+        except ValueError:
+            return None
+        cal.observe(units, dy, response)
+        if response < cal.min_response:
+            return None
+        return dy
+
+    @property
+    def scroll_gain(self) -> float:
+        """Current estimate of content pixels per `scroll()` unit."""
+        return self._scroll_cal.gain
+
+    # ---- Generic capture & geometry ----
+    def _capture(
+        self, region: Optional[RegionXYWH] = None
+    ) -> Tuple[Image.Image, Tuple[int, int], Tuple[int, int, int, int]]:
+        """
+        Grab a frame -> (image, origin, bbox) in SCREEN coords, without touching
+        the last-capture state (the background grabber calls it off-thread).
         """
         if region is not None:
             L, T, W, H = region
-            self._last_origin = (L, T)
-            self._last_bbox = (L, T, W, H)
-            return ImageGrab.grab(bbox=(L, T, L + W, T + H))
+            return ImageGrab.grab(bbox=(L, T, L + W, T + H)), (L, T), (L, T, W, H)
 
         if self.capture_client_only:
             xywh = self._client_bbox_screen_xywh()
             if xywh:
                 L, T, W, H = xywh
-                self._last_origin = (L, T)
-                self._last_bbox = (L, T, W, H)
-                return ImageGrab.grab(bbox=(L, T, L + W, T + H))
+                return ImageGrab.grab(bbox=(L, T, L + W, T + H)), (L, T), (L, T, W, H)
 
         # Fallback: full screen
         scr = ImageGrab.grab()
-        self._last_origin = (0, 0)
-        self._last_bbox = (0, 0, scr.width, scr.height)
-        return scr
+        return scr, (0, 0), (0, 0, scr.width, scr.height)
+
+    def screenshot(self, region: Optional[RegionXYWH] = None) -> Image.Image:
+        """
+        Capture a screenshot.
+
+        - If `region` is provided, it MUST be absolute SCREEN coords (L, T, W, H).
+        - Else if `capture_client_only=True`, capture the client area.
+        - Else capture full screen.
+
+        Updates internal origin/bbox accordingly.
+        """
+        img, self._last_origin, self._last_bbox = self._capture(region)
+        return img
+
+    # ---- Background frame grabber ----
+    def _grab_default_frame(
+        self,
+    ) -> Tuple[Image.Image, Tuple[int, int], Tuple[int, int, int, int]]:
+        """What a detector captures when no region is given (Steam overrides: left half)."""
+        return self._capture()
+
+    def start_frame_grabber(self, *, capacity: int = 4, interval_s: float = 0.05) -> None:
+        """Keep capturing in the background so detectors can read frames without waiting on a grab."""
+        if self._grabber is not None and self._grabber.running:
+            return
+        self._grabber = FrameGrabber(
+            self._grab_default_frame,
+            capacity=capacity,
+            interval_s=interval_s,
+            name=f"{type(self).__name__}-grabber",
+        )
+        self._grabber.start()
+
+    def stop_frame_grabber(self) -> None:
+        grabber, self._grabber = self._grabber, None
+        if grabber is not None:
+            grabber.stop()
+
+    def close(self) -> None:
+        """Release held resources (ADB shell, X displays). No-op by default."""
+
+    @property
+    def frame_grabber(self) -> Optional[FrameGrabber]:
+        return self._grabber
+
+    @property
+    def last_input_ts(self) -> float:
+        return self._last_input_ts
+
+    def _note_input(self) -> None:
+        """Frames whose grab started before this moment no longer show the screen."""
+        self._last_input_ts = time.monotonic()
+
+    def _use_frame(self, frame) -> Image.Image:
+        self._last_origin = frame.origin
+        self._last_bbox = frame.bbox
+        return frame.image
+
+    def latest_frame(self, max_age: Optional[float] = None, *, wait: float = 0.0) -> Optional[Image.Image]:
+        """
+        Newest background frame captured after the last input and at most
+        `max_age` seconds old. With `wait` > 0, wait that long for one if the
+        buffer has nothing usable. None when the grabber is off or nothing
+        qualifies: callers then fall back to `screenshot()`.
+        """
+        grabber = self._grabber
+        if grabber is None or not grabber.running:
+            return None
+        frame = grabber.latest(max_age, not_before=self._last_input_ts)
+        if frame is None and wait > 0:
+            frame = grabber.after(max(self._last_input_ts, time.monotonic() - (max_age or 0.0)), timeout=wait)
+        return self._use_frame(frame) if frame is not None else None
+
+    def frame_after(self, ts: float, timeout: float = 1.0) -> Optional[Image.Image]:
+        """First background frame whose capture started after `ts` (time.monotonic())."""
+        grabber = self._grabber
+        if grabber is None or not grabber.running:
+            return None
+        frame = grabber.after(ts, timeout=timeout)
+        return self._use_frame(frame) if frame is not None else None
 
     def resolution(self) -> Tuple[int, int]:
         sz = pyautogui.size()
@@ -133,6 +275,7 @@ class IController(ABC):
     # ---- Pointer primitives (screen coords) ----
     def move_to(self, x: int, y: int, duration: float = 0.15) -> None:
         pyautogui.moveTo(int(x), int(y), duration=duration)
+        self._note_input()
 
     def click(
         self,
@@ -157,6 +300,7 @@ class IController(ABC):
         else:
             self.move_to(tx, ty, duration=duration)
             pyautogui.click(tx, ty, clicks=clicks)
+        self._note_input()
 
     def click_xyxy_center(
         self,
@@ -217,9 +361,11 @@ class IController(ABC):
         else:
             self.move_to(tx, ty, duration=0.0)
         pyautogui.mouseDown(x=tx, y=ty, button=button)
+        self._note_input()
 
     def mouse_up(self, x: int, y: int, *, button: str = "left") -> None:
         pyautogui.mouseUp(x=int(x), y=int(y), button=button)
+        self._note_input()
 
     def hold(self, x: int, y: int, seconds: float, *, jitter: int = 2) -> None:
         self.mouse_down(x, y, jitter=jitter)
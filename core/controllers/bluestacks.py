@@ -273,30 +273,22 @@ class BlueStacksController(IController):
     # -------------------------
     # Capture
     # -------------------------
-    def screenshot(self, region=None):
+    def _capture(self, region=None):
         """
         Capture the current BlueStacks client area (respecting content insets),
-        store the last-capture origin/size for downstream coordinate transforms,
-        and return a PIL.Image in RGB.
+        or `region` (SCREEN coords) -> (RGB PIL.Image, origin, bbox).
         """
-        x, y, w, h = self._client_bbox_screen_xywh()
+        if region is not None:
+            x, y, w, h = region
+        else:
+            x, y, w, h = self._client_bbox_screen_xywh()
         if w <= 0 or h <= 0:
             # Nothing to capture
-            return None
+            return None, self._last_origin, self._last_bbox
 
         # Grab window client bbox (screen coords)
         img = ImageGrab.grab(bbox=(x, y, x + w, y + h))
-
-        # Update origin & size so local_to_screen() and click helpers remain correct
-        try:
-            # Preferred: base class helper if present
-            self._set_last_capture_origin((x, y), (w, h))  # type: ignore[attr-defined]
-        except Exception:
-            # Fallback: set common fields used by base.local_to_screen
-            setattr(self, "_last_origin", (x, y))
-            setattr(self, "_last_size", (w, h))
-
-        return img
+        return img, (x, y), (x, y, w, h)
 
     # -------------------------
     # Scroll
@@ -367,5 +359,6 @@ class BlueStacksController(IController):
             self.move_to(xj, y1j, duration=random.uniform(*duration_range))
             time.sleep(random.uniform(*end_hold_range))  # <<< hold here
             pyautogui.mouseUp(xj, y1j)
+            self._note_input()
 
             time.sleep(random.uniform(*pause_range))
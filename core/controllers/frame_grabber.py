@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from PIL import Image
+
+from core.utils.logger import logger_uma
+
+
+@dataclass(frozen=True)
+class GrabbedFrame:
+    image: Image.Image
+    ts: float  # time.monotonic() when the grab *started*; anything done after ts is not in it
+    origin: Tuple[int, int]
+    bbox: Tuple[int, int, int, int]
+    seq: int
+
+
+class FrameGrabber:
+    """
+    Background capture loop feeding a small ring buffer of recent frames.
+
+    `capture` returns (image, origin, bbox) and runs only on the grabber
+    thread. Readers never block on the capture itself: `latest()` returns
+    what is already buffered and `after(ts)` waits for the next frame whose
+    grab started after `ts`.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Tuple[Image.Image, Tuple[int, int], Tuple[int, int, int, int]]],
+        *,
+        capacity: int = 4,
+        interval_s: float = 0.05,
+        name: str = "frame-grabber",
+    ) -> None:
+        self._capture = capture
+        self.capacity = max(1, int(capacity))
+        self.interval_s = max(0.0, float(interval_s))
+        self.name = name
+        self._frames: Deque[GrabbedFrame] = deque(maxlen=self.capacity)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._stats: Dict[str, float] = {"frames": 0, "errors": 0, "capture_s_total": 0.0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=timeout)
+        with self._cond:
+            self._frames.clear()
+
+    # ------------------------------------------------------------------
+    # Readers
+    # ------------------------------------------------------------------
+    def latest(self, max_age: Optional[float] = None, *, not_before: float = 0.0) -> Optional[GrabbedFrame]:
+        """Newest buffered frame, or None if there is none younger than max_age / started after not_before."""
+        with self._cond:
+            frame = self._frames[-1] if self._frames else None
+        if frame is None or frame.ts <= not_before:
+            return None
+        if max_age is not None and time.monotonic() - frame.ts > max_age:
+            return None
+        return frame
+
+    def after(self, ts: float, timeout: float = 1.0) -> Optional[GrabbedFrame]:
+        """First frame whose grab started after `ts`, waiting up to `timeout` for it."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            while True:
+                for frame in self._frames:
+                    if frame.ts > ts:
+                        return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return None
+                self._cond.wait(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = dict(self._stats)
+            out["buffered"] = len(self._frames)
+        frames = out["frames"] or 1
+        out["avg_capture_s"] = round(out.pop("capture_s_total") / frames, 4)
+        out["running"] = self.running
+        return out
+
+    # ------------------------------------------------------------------
+    # Capture thread
+    # ------------------------------------------------------------------
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            try:
+                image, origin, bbox = self._capture()
+            except Exception as exc:
+                with self._cond:
+                    self._stats["errors"] += 1
+                logger_uma.debug("[%s] capture failed: %s", self.name, exc)
+                self._stop.wait(max(self.interval_s, 0.25))
+                continue
+            t1 = time.monotonic()
+            with self._cond:
+                self._seq += 1
+                self._frames.append(GrabbedFrame(image, t0, tuple(origin), tuple(bbox), self._seq))  # type: ignore[arg-type]
+                self._stats["frames"] += 1
+                self._stats["capture_s_total"] += t1 - t0
+                self._cond.notify_all()
+            if self.interval_s:
+                self._stop.wait(max(0.0, self.interval_s - (t1 - t0)))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+from core.controllers.base import RegionXYWH
+from core.controllers.session import RecordedSession, ReplayCursor, load_session
+from core.controllers.static_image import StaticImageController
+
+
+class ReplayController(StaticImageController):
+    """
+    Serves a recorded session (see core.controllers.session) back to an agent.
+
+    Each screenshot returns the next recorded frame; each click/scroll/hold
+    advances to the frames recorded after the matching action. Nothing
+    sleeps or touches the real mouse, so a flow replays as fast as perception
+    runs. Raises ReplayFinished once the agent outruns the recording.
+    """
+
+    def __init__(self, session: Union[str, Path, RecordedSession], *, max_idle_snaps: int = 50) -> None:
+        self.session = session if isinstance(session, RecordedSession) else load_session(session)
+        self.cursor = ReplayCursor(self.session.events, max_idle_snaps=max_idle_snaps)
+        first = next(f for seg, _ in self.cursor.segments for f in seg)
+        super().__init__(self.session.frame(first["frame"]))
+        self._apply_geometry(first)
+
+    def _apply_geometry(self, ev: Dict[str, Any]) -> None:
+        self._last_origin = tuple(ev.get("origin") or (0, 0))  # type: ignore[assignment]
+        self._last_bbox = tuple(ev.get("bbox") or (0, 0, self._img.width, self._img.height))  # type: ignore[assignment]
+
+    # ---- capture ----
+    def screenshot(self, region: Optional[RegionXYWH] = None) -> Image.Image:
+        ev = self.cursor.next_frame()
+        self._img = self.session.frame(ev["frame"])
+        self._apply_geometry(ev)
+        if region is None:
+            return self._img
+        # Region is in screen coords; recorded frame starts at the recorded origin
+        ox, oy = self._last_origin
+        left, top, width, height = region
+        self._last_origin = (left, top)
+        self._last_bbox = (left, top, width, height)
+        return self._img.crop((left - ox, top - oy, left - ox + width, top - oy + height))
+
+    def resolution(self) -> Tuple[int, int]:
+        return self._img.width, self._img.height
+
+    # ---- input: advance the recording, no real input, no sleeps ----
+    def _act(self, kind: str) -> None:
+        self.cursor.on_action(kind)
+        self._note_input()
+
+    def move_to(self, x: int, y: int, duration: float = 0.15) -> None:
+        return None
+
+    def click(self, x: int, y: int, **kwargs: Any) -> None:  # type: ignore[override]
+        self._act("click")
+
+    def mouse_down(self, x: int, y: int, **kwargs: Any) -> None:  # type: ignore[override]
+        self._act("mouse_down")
+
+    def mouse_up(self, x: int, y: int, **kwargs: Any) -> None:  # type: ignore[override]
+        self._act("mouse_up")
+
+    def hold(self, x: int, y: int, seconds: float, **kwargs: Any) -> None:  # type: ignore[override]
+        self._act("hold")
+
+    def scroll(self, delta_or_xyxy, **kwargs: Any) -> bool:  # type: ignore[override]
+        self._act("scroll")
+        return True
+
+    def close(self) -> None:
+        self.session.close()
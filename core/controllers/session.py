@@ -0,0 +1,278 @@
+# core/controllers/session.py
+"""
+Record what a controller saw and did, and walk it back for replay.
+
+A session is one zip file:
+  - session.json  : {"version", "events": [...]} in capture order
+  - frames/<sha1>.png : each distinct frame once (static screens dedupe to one file)
+
+Events are {"t": seconds since start, "kind": "frame", "frame": sha1,
+"origin": [x, y], "bbox": [x, y, w, h]} or {"t", "kind": <action>,
+"args": [...], "kwargs": {...}} for click / scroll / hold / mouse_down /
+mouse_up.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from core.utils.logger import logger_uma
+
+SESSION_VERSION = 1
+MANIFEST_NAME = "session.json"
+ACTION_METHODS = ("click", "scroll", "hold", "mouse_down", "mouse_up")
+
+
+def _plain(value: Any) -> Any:
+    """JSON-safe copy of action arguments (tuples, numpy scalars, ...)."""
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (str, bool)) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return value.item()  # numpy scalar
+    except AttributeError:
+        return repr(value)
+
+
+class SessionRecorder:
+    """
+    Hooks a live controller and writes everything it captures and does.
+
+    `attach()` wraps the instance's own `screenshot` and action methods
+    (instance attributes shadow the class), so isinstance checks such as
+    `isinstance(ctrl, SteamController)` keep working.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_STORED)
+        self._events: List[Dict[str, Any]] = []
+        self._frames: set = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._t0 = time.monotonic()
+        self._ctrl: Any = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Hooking
+    # ------------------------------------------------------------------
+    def attach(self, ctrl: Any) -> "SessionRecorder":
+        self._ctrl = ctrl
+        original_screenshot = ctrl.screenshot
+
+        def screenshot(*args: Any, **kwargs: Any) -> Image.Image:
+            img = original_screenshot(*args, **kwargs)
+            self.record_frame(img, ctrl.capture_origin(), ctrl.capture_bbox())
+            return img
+
+        ctrl.screenshot = screenshot
+        original_use_frame = getattr(ctrl, "_use_frame", None)
+        if original_use_frame is not None:
+            # Background-grabber frames the agent actually consumed
+            def use_frame(frame: Any) -> Image.Image:
+                img = original_use_frame(frame)
+                self.record_frame(img, frame.origin, frame.bbox)
+                return img
+
+            ctrl._use_frame = use_frame
+        for name in ACTION_METHODS:
+            original = getattr(ctrl, name, None)
+            if original is not None:
+                setattr(ctrl, name, self._wrap_action(name, original))
+        return self
+
+    def detach(self) -> None:
+        ctrl, self._ctrl = self._ctrl, None
+        if ctrl is None:
+            return
+        for name in ("screenshot", "_use_frame") + ACTION_METHODS:
+            ctrl.__dict__.pop(name, None)
+
+    def _wrap_action(self, name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+        def action(*args: Any, **kwargs: Any) -> Any:
+            # hold() -> mouse_down()/mouse_up(), ADB mouse_down() -> click(): record the outer call only
+            depth = getattr(self._local, "depth", 0)
+            self._local.depth = depth + 1
+            try:
+                if depth == 0:
+                    self.record_action(name, args, kwargs)
+                return original(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+
+        return action
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def record_frame(self, img: Image.Image, origin: Tuple[int, int], bbox: Tuple[int, int, int, int]) -> str:
+        rgb = img if img.mode == "RGB" else img.convert("RGB")
+        digest = hashlib.sha1(rgb.tobytes()).hexdigest()
+        with self._lock:
+            if self._closed:
+                return digest
+            if digest not in self._frames:
+                buf = io.BytesIO()
+                rgb.save(buf, format="PNG", compress_level=1)
+                self._zip.writestr(f"frames/{digest}.png", buf.getvalue())
+                self._frames.add(digest)
+            self._events.append(
+                {
+                    "t": round(time.monotonic() - self._t0, 4),
+                    "kind": "frame",
+                    "frame": digest,
+                    "origin": _plain(origin),
+                    "bbox": _plain(bbox),
+                }
+            )
+        return digest
+
+    def record_action(self, kind: str, args: Any = (), kwargs: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._events.append(
+                {
+                    "t": round(time.monotonic() - self._t0, 4),
+                    "kind": kind,
+                    "args": _plain(list(args)),
+                    "kwargs": _plain(kwargs or {}),
+                }
+            )
+
+    def close(self) -> None:
+        self.detach()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            manifest = {"version": SESSION_VERSION, "events": self._events}
+            self._zip.writestr(MANIFEST_NAME, json.dumps(manifest, separators=(",", ":")))
+            self._zip.close()
+        logger_uma.info(
+            "[session] recorded %d events, %d distinct frames -> %s",
+            len(self._events),
+            len(self._frames),
+            self.path,
+        )
+
+
+@dataclass
+class RecordedSession:
+    path: Path
+    events: List[Dict[str, Any]]
+    _zip: zipfile.ZipFile
+    _cache: "OrderedDict[str, Image.Image]" = field(default_factory=OrderedDict)
+    cache_size: int = 64
+
+    def frame(self, digest: str) -> Image.Image:
+        img = self._cache.get(digest)
+        if img is not None:
+            self._cache.move_to_end(digest)
+            return img
+        with self._zip.open(f"frames/{digest}.png") as fh:
+            img = Image.open(fh).convert("RGB")
+        self._cache[digest] = img
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return img
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+def load_session(path: Union[str, Path]) -> RecordedSession:
+    zf = zipfile.ZipFile(path, "r")
+    manifest = json.loads(zf.read(MANIFEST_NAME))
+    if manifest.get("version") != SESSION_VERSION:
+        zf.close()
+        raise ValueError(f"unsupported session version {manifest.get('version')!r} in {path}")
+    return RecordedSession(Path(path), list(manifest["events"]), zf)
+
+
+class ReplayFinished(BaseException):
+    """
+    The agent asked for more than the recording contains.
+
+    BaseException so the flows' broad `except Exception` guards cannot swallow it.
+    """
+
+
+class ReplayCursor:
+    """
+    Walks a recording driven by the replaying agent's own actions.
+
+    The event list is cut into segments at each recorded action. Screenshots
+    step through the current segment's frames (repeating the last one); an
+    action moves to the next segment, whatever the wall clock says.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], *, max_idle_snaps: int = 50) -> None:
+        self.segments: List[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]] = []
+        frames: List[Dict[str, Any]] = []
+        for ev in events:
+            if ev.get("kind") == "frame":
+                frames.append(ev)
+            else:
+                self.segments.append((frames, ev))
+                frames = []
+        self.segments.append((frames, None))
+        if not any(seg for seg, _ in self.segments):
+            raise ValueError("session has no frames")
+        self.max_idle_snaps = max(1, int(max_idle_snaps))
+        self._seg = 0
+        self._pos = 0
+        self._idle = 0
+        self._last: Optional[Dict[str, Any]] = None
+        self.stats: Dict[str, int] = {"frames": 0, "actions": 0, "mismatches": 0}
+
+    @property
+    def on_last_segment(self) -> bool:
+        return self._seg >= len(self.segments) - 1
+
+    def next_frame(self) -> Dict[str, Any]:
+        frames, _ = self.segments[self._seg]
+        if self._pos < len(frames):
+            ev = frames[self._pos]
+            self._pos += 1
+        else:
+            if self.on_last_segment:
+                self._idle += 1
+                if self._idle > self.max_idle_snaps:
+                    raise ReplayFinished("recording exhausted")
+            ev = frames[-1] if frames else self._last
+            if ev is None:
+                ev = next(f for seg, _ in self.segments for f in seg)
+        self._last = ev
+        self.stats["frames"] += 1
+        return ev
+
+    def on_action(self, kind: str) -> None:
+        if self.on_last_segment:
+            raise ReplayFinished(f"agent did '{kind}' after the recording ended")
+        _, recorded = self.segments[self._seg]
+        self.stats["actions"] += 1
+        if recorded is not None and recorded.get("kind") != kind:
+            self.stats["mismatches"] += 1
+            logger_uma.debug(
+                "[replay] action diverged: recorded %s, agent did %s", recorded.get("kind"), kind
+            )
+        self._seg += 1
+        self._pos = 0
@@ -8,9 +8,8 @@ from core.controllers.base import IController
 
 class StaticImageController(IController):
     def __init__(self, pil_img: Image.Image):
+        super().__init__(window_title="JupyterStaticImage", capture_client_only=True)
         self._img = pil_img.convert("RGB")
-        self.window_title = "JupyterStaticImage"
-        self.capture_client_only = True
         self._last_origin = (0, 0)
         self._last_bbox = (0, 0, self._img.width, self._img.height)
 
@@ -20,6 +19,9 @@ class StaticImageController(IController):
     def screenshot(self, region=None) -> Image.Image:
         return self._img
 
+    def _capture(self, region=None):
+        return self._img, self._last_origin, self._last_bbox
+
     def _client_bbox_screen_xywh(self):
         logger_uma.debug("Clicked")
 
@@ -20,6 +20,9 @@ class SteamController(IController):
       Keeps track of the last capture origin so you can translate local coords -> screen coords.
     """
 
+    # Wheel ticks, not drag pixels: scroll_by() learns the real ratio
+    SCROLL_PX_PER_UNIT = 30.0
+
     def __init__(
         self, window_title: str = "Umamusume", capture_client_only: bool = True
     ):
@@ -129,8 +132,15 @@ class SteamController(IController):
             if duration_range:
                 time.sleep(max(0.0, float(duration_range[0])))
 
+        self._note_input()
         return True
 
+    def _scroll_gesture(self, units: float, region: RegionXYWH) -> None:
+        # The wheel scrolls whatever is under the cursor
+        L, T, W, H = region
+        self.move_to(L + W // 2, T + H // 2, duration=0.08)
+        self.scroll(int(units))
+
     # convenience: left half bbox in screen coords
     def left_half_bbox(self) -> Optional[RegionXYWH]:
         xywh = self._client_bbox_screen_xywh()
@@ -139,6 +149,10 @@ class SteamController(IController):
         L, T, W, H = xywh
         return (L, T, W // 2, H)
 
+    def _grab_default_frame(self):
+        # Detectors look at the left half only (see YOLO engines' recognize)
+        return self._capture(self.left_half_bbox())
+
     # convenience: capture left half (also updates last_origin)
     def screenshot_left_half(self):
         xywh = self.left_half_bbox()
@@ -0,0 +1,238 @@
+# core/controllers/x11.py
+from __future__ import annotations
+
+import random
+import time
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pyautogui
+from PIL import Image
+from Xlib import X, display as xdisplay
+from Xlib.error import XError
+from Xlib.protocol import event
+
+from core.controllers.base import IController, RegionXYWH
+from core.controllers.x11_shm import X11ShmCapture
+from core.types import XYXY
+
+
+class X11Controller(IController):
+    """
+    Controller for an emulator/mirror window on a Linux X server (Waydroid,
+    scrcpy, Genymotion, ... under X or XWayland).
+
+    - Window lookup by title (_NET_WM_NAME, then WM_NAME): exact match first, then substring.
+    - Capture through MIT-SHM (`X11ShmCapture`) instead of `ImageGrab.grab`.
+    - Input through pyautogui (XTest), scrolling by mouse drag like scrcpy.
+
+    Opt-in: main.py uses it in scrcpy mode on Linux only with X11_CAPTURE=1.
+    """
+
+    def __init__(
+        self,
+        window_title: str,
+        capture_client_only: bool = True,
+        *,
+        display: Optional[str] = None,
+        use_shm: bool = True,
+    ) -> None:
+        super().__init__(window_title=window_title, capture_client_only=capture_client_only)
+        self._display = xdisplay.Display(display)
+        self._root = self._display.screen().root
+        self._net_wm_name = self._display.intern_atom("_NET_WM_NAME")
+        self._net_active = self._display.intern_atom("_NET_ACTIVE_WINDOW")
+        self._utf8 = self._display.intern_atom("UTF8_STRING")
+        self._shm = X11ShmCapture(display, use_shm=use_shm)
+        self._window = None
+
+    # --- window discovery ---
+
+    def _title_of(self, win) -> str:
+        try:
+            prop = win.get_full_property(self._net_wm_name, self._utf8)
+            if prop and prop.value:
+                value = prop.value
+                return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+            name = win.get_wm_name()
+            return name.decode("latin-1") if isinstance(name, bytes) else (name or "")
+        except XError:
+            return ""
+
+    def _iter_windows(self, win=None):
+        win = win or self._root
+        try:
+            children = win.query_tree().children
+        except XError:
+            return
+        for child in children:
+            yield child
+            yield from self._iter_windows(child)
+
+    def _find_window(self):
+        if self._window is not None and self._is_viewable(self._window):
+            return self._window
+        target = self.window_title.strip()
+        sub = None
+        for win in self._iter_windows():
+            title = self._title_of(win).strip()
+            if not title or not self._is_viewable(win):
+                continue
+            if title == target:
+                self._window = win
+                return win
+            if sub is None and target.lower() in title.lower():
+                sub = win
+        self._window = sub
+        return sub
+
+    @staticmethod
+    def _is_viewable(win) -> bool:
+        try:
+            return win.get_attributes().map_state == X.IsViewable
+        except XError:
+            return False
+
+    def _get_hwnd(self) -> Optional[int]:
+        win = self._find_window()
+        return int(win.id) if win is not None else None
+
+    # --- focusing ---
+
+    def focus(self) -> bool:
+        win = self._find_window()
+        if win is None:
+            return False
+        try:
+            # EWMH activation request; window managers honour this over set_input_focus
+            ev = event.ClientMessage(
+                window=win,
+                client_type=self._net_active,
+                data=(32, [1, X.CurrentTime, 0, 0, 0]),
+            )
+            self._root.send_event(
+                ev, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask
+            )
+            win.raise_window()
+            self._display.flush()
+            time.sleep(0.10)
+        except XError:
+            pass
+        return True
+
+    # --- geometry helpers ---
+
+    def _client_bbox_screen_xywh(self) -> Optional[RegionXYWH]:
+        win = self._find_window()
+        if win is None:
+            return None
+        try:
+            geo = win.get_geometry()
+            pos = win.translate_coords(self._root, 0, 0)
+        except XError:
+            self._window = None
+            return None
+        # translate_coords(root -> win) gives the root origin in window coords
+        left, top = -pos.x, -pos.y
+        if geo.width <= 0 or geo.height <= 0:
+            return None
+        return (left, top, geo.width, geo.height)
+
+    # --- capture ---
+
+    def _target_region(self, region: Optional[RegionXYWH]) -> RegionXYWH:
+        if region is not None:
+            return region
+        if self.capture_client_only:
+            xywh = self._client_bbox_screen_xywh()
+            if xywh:
+                return xywh
+        sw, sh = self._shm.screen_size
+        return (0, 0, sw, sh)
+
+    def _grab_bgra(
+        self, region: Optional[RegionXYWH]
+    ) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int, int, int]]:
+        left, top, width, height = self._target_region(region)
+        bgra = self._shm.grab(left, top, width, height)
+        return bgra, (left, top), (left, top, bgra.shape[1], bgra.shape[0])
+
+    @staticmethod
+    def _to_pil(bgra: np.ndarray) -> Image.Image:
+        h, w = bgra.shape[:2]
+        return Image.frombuffer("RGB", (w, h), bgra.tobytes(), "raw", "BGRX", 0, 1)
+
+    def _capture(
+        self, region: Optional[RegionXYWH] = None
+    ) -> Tuple[Image.Image, Tuple[int, int], Tuple[int, int, int, int]]:
+        bgra, origin, bbox = self._grab_bgra(region)
+        return self._to_pil(bgra), origin, bbox
+
+    def screenshot_bgr(self, region: Optional[RegionXYWH] = None) -> np.ndarray:
+        """Capture as an (H, W, 3) BGR array, skipping PIL entirely."""
+        bgra, self._last_origin, self._last_bbox = self._grab_bgra(region)
+        return bgra[..., :3]
+
+    def close(self) -> None:
+        self._shm.close()
+        self._display.close()
+
+    # --- input ---
+
+    def scroll(
+        self,
+        delta_or_xyxy: Union[int, XYXY],
+        *,
+        steps: int = 1,
+        default_down: bool = True,
+        invert: bool = False,
+        min_px: int = 30,
+        jitter: int = 6,
+        duration_range: Tuple[float, float] = (0.16, 0.26),
+        pause_range: Tuple[float, float] = (0.03, 0.07),
+        end_hold_range: Tuple[float, float] = (0.05, 0.12),
+    ) -> bool:
+        """Drag-based scroll, same conventions as ScrcpyController.scroll."""
+        xywh = self._client_bbox_screen_xywh()
+        if not xywh:
+            return False
+        L, T, W, H = xywh
+
+        use_xyxy = isinstance(delta_or_xyxy, (tuple, list)) and len(delta_or_xyxy) == 4
+        if use_xyxy:
+            x1, y1, x2, y2 = map(float, delta_or_xyxy)  # type: ignore[arg-type]
+            cx, cy = self.center_from_xyxy((x1, y1, x2, y2))
+            px = max(min_px, int(abs(y2 - y1)))
+            down = default_down
+        else:
+            cx, cy = L + W // 2, T + H // 2
+            delta = int(delta_or_xyxy)  # type: ignore[arg-type]
+            down = delta < 0
+            px = max(min_px, abs(delta))
+
+        if invert:
+            down = not down
+
+        def _clamp_y(y: int) -> int:
+            return max(T + 10, min(T + H - 10, y))
+
+        for _ in range(max(1, int(steps))):
+            half = px // 2
+            y0 = _clamp_y(cy + half if down else cy - half)
+            y1 = _clamp_y(cy - half if down else cy + half)
+
+            j = int(jitter)
+            xj = cx + (random.randint(-j, j) if j else 0)
+            y0j = y0 + (random.randint(-j, j) if j else 0)
+            y1j = y1 + (random.randint(-j, j) if j else 0)
+
+            self.move_to(xj, y0j, duration=random.uniform(0.05, 0.10))
+            pyautogui.mouseDown(xj, y0j)
+            self.move_to(xj, y1j, duration=random.uniform(*duration_range))
+            time.sleep(random.uniform(*end_hold_range))
+            pyautogui.mouseUp(xj, y1j)
+            self._note_input()
+
+            time.sleep(random.uniform(*pause_range))
+
+        return True
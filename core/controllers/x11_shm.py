@@ -0,0 +1,256 @@
+# core/controllers/x11_shm.py
+"""
+Screen capture on X11 through the MIT-SHM extension (ctypes, no extra deps).
+
+The X server copies pixels straight into a shared memory segment that we
+map as a numpy array, so a grab costs a few milliseconds instead of the
+PNG/PIL round trip of `ImageGrab.grab`. Falls back to plain `XGetImage`
+when SHM is unavailable (remote display, container without IPC).
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.utils.logger import logger_uma
+
+_ZPIXMAP = 2
+_ALL_PLANES = ctypes.c_ulong(-1).value
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+
+class _XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(_XErrorEvent))
+_last_x_error: list = []
+
+
+@_ERROR_HANDLER
+def _on_x_error(_display, event) -> int:
+    # Xlib's default handler exits the process on BadMatch etc.; record instead
+    _last_x_error.append(int(event.contents.error_code))
+    return 0
+
+
+def _load(name: str) -> ctypes.CDLL:
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise RuntimeError(f"lib{name} not found; X11 capture needs libX11 and libXext")
+    return ctypes.CDLL(path)
+
+
+class X11ShmCapture:
+    """Grab rectangles of the X root window as BGRA numpy arrays."""
+
+    def __init__(self, display: Optional[str] = None, *, use_shm: bool = True) -> None:
+        self._x11 = _load("X11")
+        self._xext = _load("Xext")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare()
+
+        self._dpy = self._x11.XOpenDisplay(display.encode() if display else None)
+        if not self._dpy:
+            raise RuntimeError(f"cannot open X display {display or '(default)'}")
+        self._x11.XSetErrorHandler(_on_x_error)
+        screen = self._x11.XDefaultScreen(self._dpy)
+        self._root = self._x11.XDefaultRootWindow(self._dpy)
+        self._visual = self._x11.XDefaultVisual(self._dpy, screen)
+        self._depth = self._x11.XDefaultDepth(self._dpy, screen)
+        self.screen_size: Tuple[int, int] = (
+            self._x11.XDisplayWidth(self._dpy, screen),
+            self._x11.XDisplayHeight(self._dpy, screen),
+        )
+        self.use_shm = bool(use_shm) and bool(self._xext.XShmQueryExtension(self._dpy))
+        self._lock = threading.Lock()
+        self._shm_image: Optional[ctypes.POINTER(_XImage)] = None  # type: ignore[valid-type]
+        self._shm_info: Optional[_XShmSegmentInfo] = None
+        self._shm_size: Tuple[int, int] = (0, 0)
+
+    def _declare(self) -> None:
+        x11, xext, libc = self._x11, self._xext, self._libc
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSetErrorHandler.argtypes = [_ERROR_HANDLER]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XGetImage.restype = ctypes.POINTER(_XImage)
+        x11.XGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_int,
+        ]
+        x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+        ]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+            ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+        ]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+    def grab(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """-> (H, W, 4) uint8 BGRA copy of the given root-window rectangle (clamped to the screen)."""
+        sw, sh = self.screen_size
+        left, top = max(0, int(left)), max(0, int(top))
+        width = max(1, min(int(width), sw - left))
+        height = max(1, min(int(height), sh - top))
+        with self._lock:
+            if self.use_shm:
+                try:
+                    return self._grab_shm(left, top, width, height)
+                except RuntimeError as exc:
+                    logger_uma.warning("[x11] XShm capture failed (%s); using XGetImage", exc)
+                    self._release_shm()
+                    self.use_shm = False
+            return self._grab_plain(left, top, width, height)
+
+    def _grab_shm(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        if self._shm_image is None or self._shm_size != (width, height):
+            self._release_shm()
+            self._create_shm(width, height)
+        image = self._shm_image
+        assert image is not None
+        del _last_x_error[:]
+        ok = self._xext.XShmGetImage(self._dpy, self._root, image, left, top, _ALL_PLANES)
+        self._x11.XSync(self._dpy, 0)
+        if not ok or _last_x_error:
+            raise RuntimeError(f"XShmGetImage error {_last_x_error[:1]}")
+        return self._to_array(image.contents)
+
+    def _grab_plain(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        del _last_x_error[:]
+        image = self._x11.XGetImage(
+            self._dpy, self._root, left, top, width, height, _ALL_PLANES, _ZPIXMAP
+        )
+        self._x11.XSync(self._dpy, 0)
+        if not image:
+            raise RuntimeError(f"XGetImage failed {_last_x_error[:1]}")
+        try:
+            return self._to_array(image.contents)
+        finally:
+            self._x11.XDestroyImage(image)
+
+    @staticmethod
+    def _to_array(img: _XImage) -> np.ndarray:
+        if img.bits_per_pixel != 32:
+            raise RuntimeError(f"unsupported X visual ({img.bits_per_pixel} bpp)")
+        size = img.bytes_per_line * img.height
+        buf = (ctypes.c_ubyte * size).from_address(img.data)
+        rows = np.ctypeslib.as_array(buf).reshape(img.height, img.bytes_per_line)
+        return rows[:, : img.width * 4].reshape(img.height, img.width, 4).copy()
+
+    # ------------------------------------------------------------------
+    # Shared memory segment
+    # ------------------------------------------------------------------
+    def _create_shm(self, width: int, height: int) -> None:
+        info = _XShmSegmentInfo()
+        image = self._xext.XShmCreateImage(
+            self._dpy, self._visual, self._depth, _ZPIXMAP, None, ctypes.byref(info), width, height
+        )
+        if not image:
+            raise RuntimeError("XShmCreateImage failed")
+        size = image.contents.bytes_per_line * height
+        info.shmid = self._libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            self._x11.XDestroyImage(image)
+            raise RuntimeError(f"shmget failed (errno {ctypes.get_errno()})")
+        addr = self._libc.shmat(info.shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(info.shmid, _IPC_RMID, None)
+            self._x11.XDestroyImage(image)
+            raise RuntimeError(f"shmat failed (errno {ctypes.get_errno()})")
+        info.shmaddr = addr
+        info.readOnly = 0
+        image.contents.data = addr
+        del _last_x_error[:]
+        self._xext.XShmAttach(self._dpy, ctypes.byref(info))
+        self._x11.XSync(self._dpy, 0)
+        # Segment disappears once both sides detach, even if we crash
+        self._libc.shmctl(info.shmid, _IPC_RMID, None)
+        self._shm_image, self._shm_info, self._shm_size = image, info, (width, height)
+        if _last_x_error:
+            self._release_shm()
+            raise RuntimeError(f"XShmAttach error {_last_x_error[:1]}")
+
+    def _release_shm(self) -> None:
+        image, info = self._shm_image, self._shm_info
+        self._shm_image, self._shm_info, self._shm_size = None, None, (0, 0)
+        if info is not None:
+            self._xext.XShmDetach(self._dpy, ctypes.byref(info))
+            self._x11.XSync(self._dpy, 0)
+            self._libc.shmdt(info.shmaddr)
+        if image is not None:
+            image.contents.data = None  # memory belongs to the segment, not malloc
+            self._x11.XDestroyImage(image)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._dpy:
+                self._release_shm()
+                self._x11.XCloseDisplay(self._dpy)
+                self._dpy = None
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import base64
-import io
+import hashlib
+import json
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import requests
 from PIL import Image
 
 from core.settings import Settings
+from core.utils.frame_codec import FrameTransport
 from core.utils.logger import logger_uma
 
 
@@ -36,14 +37,6 @@ def _ensure_bgr_array(img: Any) -> np.ndarray:
     return arr
 
 
-def _encode_bgr_to_base64_png(bgr: np.ndarray) -> str:
-    rgb = bgr[:, :, ::-1]
-    image = Image.fromarray(rgb)
-    buf = io.BytesIO()
-    image.save(buf, format="PNG")
-    return base64.b64encode(buf.getvalue()).decode("ascii")
-
-
 @dataclass
 class RemoteTemplateDescriptor:
     id: str
@@ -64,6 +57,26 @@ class RemoteTemplateMatch:
     path: str = ""
 
 
+# Server answers this when a referenced template bank is unknown or stale
+BANK_MISS_STATUS = 409
+# Set on every response by servers that support template banks
+HEADER_BANKS_SUPPORT = "X-Uma-Template-Banks"
+
+
+def template_bank_digest(templates: Sequence[Dict[str, Any]]) -> str:
+    """
+    Content digest of a template bank as sent on the wire. Client and server both
+    hash the canonical JSON, so a client can reference a bank it has never
+    uploaded from this process (e.g. after a bot restart).
+    """
+    canonical = json.dumps(list(templates), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def template_bank_id(digest: str) -> str:
+    return digest[:16]
+
+
 _DEFAULT_OPTIONS: Dict[str, float] = {
     "tm_weight": 0.7,
     "hash_weight": 0.2,
@@ -88,16 +101,26 @@ class RemoteTemplateMatcherBase:
         timeout: Optional[float] = None,
         session: Optional[requests.Session] = None,
         options: Optional[Dict[str, float]] = None,
+        frame_codec: Optional[str] = None,
+        use_banks: Optional[bool] = None,
     ) -> None:
         self.base_url = (base_url or Settings.EXTERNAL_PROCESSOR_URL).rstrip("/")
         self.timeout = timeout if timeout is not None else Settings.TEMPLATE_MATCH_TIMEOUT
         self.session = session or requests.Session()
+        self._transport = FrameTransport(
+            self.session, codec=frame_codec or Settings.REMOTE_FRAME_CODEC
+        )
         self.min_confidence = float(min_confidence)
         merged = dict(_DEFAULT_OPTIONS)
         if options:
             merged.update({k: float(v) for k, v in options.items()})
         self._options = merged
         self.mode = self.MODE
+        # Upload the template set once and reference it by id; None = not probed yet
+        self._banks_ok: Optional[bool] = (
+            None if (Settings.REMOTE_TEMPLATE_BANKS if use_banks is None else use_banks) else False
+        )
+        self._bank: Optional[Tuple[str, str]] = None  # (bank_id, digest) for the current specs
         self._templates: List[RemoteTemplateDescriptor] = []
         self.set_templates(templates)
 
@@ -125,6 +148,7 @@ class RemoteTemplateMatcherBase:
             )
 
         self._templates = entries
+        self._bank = None
 
     @property
     def templates(self) -> List[RemoteTemplateDescriptor]:
@@ -149,39 +173,12 @@ class RemoteTemplateMatcherBase:
         if not selected:
             return []
 
-        payload = {
-            "mode": self.mode,
-            "agent": Settings.ACTIVE_AGENT_NAME,
-            "region": {
-                "img": _encode_bgr_to_base64_png(region_bgr),
-                "meta": {"shape": list(region_bgr.shape[:2])},
-            },
-            "templates": [
-                {
-                    "id": tmpl.id,
-                    "path": None,  # Don't send client paths to remote
-                    "metadata": tmpl.metadata,
-                    "hash_hex": tmpl.hash_hex,
-                    "img": tmpl.img,
-                    "name": tmpl.metadata.get("name"),
-                    "public_path": tmpl.metadata.get("public_path"),
-                    "size": tmpl.metadata.get("size"),
-                }
-                for tmpl in selected
-            ],
-            "options": self._options,
-        }
-
-        try:
-            response = self.session.post(
-                f"{self.base_url}/template-match",
-                json=payload,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-        except Exception as exc:
-            logger_uma.debug(f"[remote_template] Request failed: {exc}. payload templates={payload.get('templates', [])}")
+        data = None
+        if self._banks_ok is not False:
+            data = self._match_with_bank(region_bgr, candidates)
+        if data is None and self._banks_ok is False:
+            data = self._match_inline(region_bgr, selected)
+        if data is None:
             return []
 
         matches = data.get("matches", []) or []
@@ -216,6 +213,107 @@ class RemoteTemplateMatcherBase:
             return None
         return top
 
+    # ---------- wire ----------
+    @staticmethod
+    def _spec(tmpl: RemoteTemplateDescriptor) -> Dict[str, Any]:
+        return {
+            "id": tmpl.id,
+            "path": None,  # Don't send client paths to remote
+            "metadata": tmpl.metadata,
+            "hash_hex": tmpl.hash_hex,
+            "img": tmpl.img,
+            "name": tmpl.metadata.get("name"),
+            "public_path": tmpl.metadata.get("public_path"),
+            "size": tmpl.metadata.get("size"),
+        }
+
+    def _base_payload(self, region_bgr: np.ndarray) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "agent": Settings.ACTIVE_AGENT_NAME,
+            "region": {
+                "meta": {"shape": list(region_bgr.shape[:2])},
+            },
+            "options": self._options,
+        }
+
+    def _post_match(self, payload: Dict[str, Any], region_bgr: np.ndarray) -> requests.Response:
+        return self._transport.post(
+            f"{self.base_url}/template-match",
+            payload,
+            [region_bgr],
+            image_key="region.img",
+            timeout=self.timeout,
+        )
+
+    def _match_inline(
+        self, region_bgr: np.ndarray, selected: List[RemoteTemplateDescriptor]
+    ) -> Optional[Dict[str, Any]]:
+        payload = self._base_payload(region_bgr)
+        payload["templates"] = [self._spec(tmpl) for tmpl in selected]
+        try:
+            response = self._post_match(payload, region_bgr)
+            response.raise_for_status()
+            return response.json()
+        except Exception as exc:
+            logger_uma.debug(f"[remote_template] Request failed: {exc}. payload templates={payload.get('templates', [])}")
+            return None
+
+    def _match_with_bank(
+        self, region_bgr: np.ndarray, candidates: Optional[Sequence[str]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Match against the server-side bank; uploads it on a miss. Returns None on
+        failure; `_banks_ok` is False afterwards if the server has no bank support.
+        """
+        if self._bank is None:
+            digest = template_bank_digest([self._spec(t) for t in self._templates])
+            self._bank = (template_bank_id(digest), digest)
+        bank_id, digest = self._bank
+        payload = self._base_payload(region_bgr)
+        payload.update(
+            {
+                "bank_id": bank_id,
+                "bank_digest": digest,
+                "candidates": [str(c) for c in candidates if c] if candidates else None,
+            }
+        )
+        try:
+            response = self._post_match(payload, region_bgr)
+            if response.status_code == BANK_MISS_STATUS:
+                if not self._upload_bank():
+                    return None
+                response = self._post_match(payload, region_bgr)
+            if not response.headers.get(HEADER_BANKS_SUPPORT):
+                # Server predates template banks (it insists on inline templates)
+                self._banks_ok = False
+                return None
+            response.raise_for_status()
+            self._banks_ok = True
+            return response.json()
+        except Exception as exc:
+            logger_uma.debug(f"[remote_template] Bank request failed: {exc}. bank={bank_id}")
+            return None
+
+    def _upload_bank(self) -> bool:
+        specs = [self._spec(t) for t in self._templates]
+        try:
+            response = self.session.post(
+                f"{self.base_url}/template-banks",
+                json={"mode": self.mode, "templates": specs},
+                timeout=self.timeout,
+            )
+            if response.status_code in (404, 405):
+                self._banks_ok = False
+                return False
+            response.raise_for_status()
+            data = response.json()
+        except Exception as exc:
+            logger_uma.debug(f"[remote_template] Bank upload failed: {exc}")
+            return False
+        self._bank = (str(data.get("bank_id")), str(data.get("digest")))
+        return True
+
     def _select_templates(
         self, candidates: Optional[Sequence[str]]
     ) -> List[RemoteTemplateDescriptor]:
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import base64
 from typing import Any, Dict, List, Optional, Tuple
 
 import cv2
@@ -8,6 +7,8 @@ import numpy as np
 import requests
 from PIL import Image
 
+from core.settings import Settings
+from core.utils.frame_codec import FrameTransport
 from core.utils.img import to_bgr
 from core.utils.logger import logger_uma
 
@@ -27,14 +28,6 @@ def _prepare_bgr3(img: Any) -> np.ndarray:
     return bgr
 
 
-def _encode_image_to_base64(img: Any, fmt: str = ".png") -> str:
-    bgr = _prepare_bgr3(img)
-    ok, buf = cv2.imencode(fmt, bgr)
-    if not ok:
-        raise ValueError("Failed to encode image for spirit classification")
-    return base64.b64encode(buf.tobytes()).decode("ascii")
-
-
 class RemoteUnityCupSpiritClassifier:
     def __init__(
         self,
@@ -42,16 +35,22 @@ class RemoteUnityCupSpiritClassifier:
         *,
         timeout: float = 30.0,
         session: Optional[requests.Session] = None,
+        frame_codec: Optional[str] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.session = session or requests.Session()
+        self._transport = FrameTransport(
+            self.session, codec=frame_codec or Settings.REMOTE_FRAME_CODEC
+        )
         self._classes: List[str] = []
         self._img_size: Optional[Tuple[int, int]] = None
 
-    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _post(self, payload: Dict[str, Any], img: Any) -> Dict[str, Any]:
         url = f"{self.base_url}/classify/spirit"
-        response = self.session.post(url, json=payload, timeout=self.timeout)
+        response = self._transport.post(
+            url, payload, [_prepare_bgr3(img)], timeout=self.timeout
+        )
         try:
             response.raise_for_status()
         except Exception:
@@ -74,8 +73,7 @@ class RemoteUnityCupSpiritClassifier:
         return data
 
     def _classify(self, img: Any, threshold: float) -> Dict[str, Any]:
-        img64 = _encode_image_to_base64(img)
-        return self._post({"img": img64, "threshold": float(threshold)})
+        return self._post({"threshold": float(threshold)}, img)
 
     def predict(self, img: Any) -> Dict[str, Any]:
         return self._classify(img, threshold=0.0)
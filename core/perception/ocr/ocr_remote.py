@@ -1,14 +1,14 @@
 # core/perception/ocr/ocr_remote.py
 from __future__ import annotations
 
-import base64
-import hashlib
 from typing import Any, Dict, List, Optional
 
 import cv2
 import numpy as np
 import requests
 from core.perception.ocr.interface import OCRInterface
+from core.settings import Settings
+from core.utils.frame_codec import FrameTransport, frame_sha256
 from core.utils.img import to_bgr  # if you prefer, you can inline conversion here
 from core.utils.logger import logger_uma
 from PIL import Image
@@ -30,17 +30,9 @@ def _prepare_bgr3(img: Any) -> np.ndarray:
     return bgr
 
 
-def _encode_image_to_base64(img: Any, *, fmt: str = ".png") -> str:
-    bgr = _prepare_bgr3(img)
-    ok, buf = cv2.imencode(fmt, bgr)
-    if not ok:
-        raise ValueError("Failed to encode image")
-    return base64.b64encode(buf.tobytes()).decode("ascii")
-
-
 def _local_checksum(img: Any) -> str:
-    bgr = _prepare_bgr3(img)
-    return hashlib.sha256(bgr.tobytes()).hexdigest()[:12]
+    # Prefix of the digest FrameTransport sends for checksum-first uploads
+    return frame_sha256(_prepare_bgr3(img))[:12]
 
 
 class RemoteOCREngine(OCRInterface):
@@ -55,14 +47,28 @@ class RemoteOCREngine(OCRInterface):
         *,
         timeout: float = 30.0,
         session: Optional[requests.Session] = None,
+        frame_codec: Optional[str] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.session = session or requests.Session()
+        self._transport = FrameTransport(
+            self.session,
+            codec=frame_codec or Settings.REMOTE_FRAME_CODEC,
+            conditional=Settings.REMOTE_CONDITIONAL_UPLOAD,
+        )
 
-    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _post(
+        self, payload: Dict[str, Any], imgs: List[Any], *, batch: bool = False
+    ) -> Dict[str, Any]:
         url = f"{self.base_url}/ocr"
-        r = self.session.post(url, json=payload, timeout=self.timeout)
+        r = self._transport.post(
+            url,
+            payload,
+            [_prepare_bgr3(im) for im in imgs],
+            image_key="imgs" if batch else "img",
+            timeout=self.timeout,
+        )
         try:
             r.raise_for_status()
         except Exception:
@@ -77,39 +83,41 @@ class RemoteOCREngine(OCRInterface):
 
     # ---- Methods ----
     def raw(self, img: Any) -> Dict[str, Any]:
-        img64 = _encode_image_to_base64(img)
-        return self._post({"mode": "raw", "img": img64})["data"]
+        return self._post({"mode": "raw"}, [img])["data"]
 
     def text(self, img: Any, joiner: str = " ", min_conf: float = 0.2) -> str:
-        img64 = _encode_image_to_base64(img)
         return self._post(
             {
                 "mode": "text",
-                "img": img64,
                 "joiner": joiner,
                 "min_conf": float(min_conf),
-            }
+            },
+            [img],
         )["data"]
 
     def digits(self, img: Any) -> int:
-        img64 = _encode_image_to_base64(img)
-        return int(self._post({"mode": "digits", "img": img64})["data"])
+        return int(self._post({"mode": "digits"}, [img])["data"])
 
     def batch_text(
         self, imgs: List[Any], *, joiner: str = " ", min_conf: float = 0.2
     ) -> List[str]:
-        imgs64 = [_encode_image_to_base64(im) for im in imgs]
+        if not imgs:
+            return []
         return list(
             self._post(
                 {
                     "mode": "batch_text",
-                    "imgs": imgs64,
                     "joiner": joiner,
                     "min_conf": float(min_conf),
-                }
+                },
+                imgs,
+                batch=True,
             )["data"]
         )
 
     def batch_digits(self, imgs: List[Any]) -> List[str]:
-        imgs64 = [_encode_image_to_base64(im) for im in imgs]
-        return list(self._post({"mode": "batch_digits", "imgs": imgs64})["data"])
+        if not imgs:
+            return []
+        return list(
+            self._post({"mode": "batch_digits"}, imgs, batch=True)["data"]
+        )
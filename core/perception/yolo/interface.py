@@ -1,9 +1,29 @@
 # core/perception/yolo/interface.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 from PIL import Image
 from core.controllers.base import IController, RegionXYWH
 from core.types import DetectionDict
+from core.utils.frame_gate import FrameChangeGate
+
+
+def per_item(value: Any, n: int, default: Any) -> List[Any]:
+    """Broadcast a scalar (or None) to n items; validate per-item sequences."""
+    if isinstance(value, (list, tuple)):
+        if len(value) != n:
+            raise ValueError(f"Expected {n} per-frame values, got {len(value)}")
+        return [default if v is None else v for v in value]
+    return [default if value is None else value] * n
 
 
 @runtime_checkable
@@ -22,8 +42,29 @@ class IDetector(Protocol):
         imgsz: Optional[int] = None,
         conf: Optional[float] = None,
         iou: Optional[float] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
-        """Run detection on a BGR image and return (meta, dets)."""
+        """
+        Run detection on a BGR image and return (meta, dets).
+        With `rois` (xyxy, pixels or 0..1 fractions of the image), only those
+        crops are searched, each at its `roi_imgsz` (default: the scale of a
+        full pass at `imgsz`); boxes are in full-image coordinates.
+        """
+        raise NotImplementedError
+
+    def detect_bgr_batch(
+        self,
+        bgrs: Sequence[Any],
+        *,
+        imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
+        conf: Union[Optional[float], Sequence[Optional[float]]] = None,
+        iou: Union[Optional[float], Sequence[Optional[float]]] = None,
+    ) -> List[Tuple[Dict[str, Any], List[DetectionDict]]]:
+        """
+        Run detection on several BGR images in as few forward passes as possible.
+        Params may be scalars or per-image sequences. Returns [(meta, dets)] in input order.
+        """
         raise NotImplementedError
 
     def detect_pil(
@@ -33,6 +74,8 @@ class IDetector(Protocol):
         imgsz: Optional[int] = None,
         conf: Optional[float] = None,
         iou: Optional[float] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
         """Run detection on a PIL image and return (meta, dets)."""
         raise NotImplementedError
@@ -46,9 +89,15 @@ class IDetector(Protocol):
         iou: Optional[float] = None,
         tag: str = "general",
         agent: Optional[str] = None,
+        gate: Optional[FrameChangeGate] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Image.Image, Dict[str, Any], List[DetectionDict]]:
         """
         Capture via controller and run detection.
+        With `gate`, detections from the previous call are returned again while
+        the screen is unchanged (keep `rois` the same across calls sharing a gate).
+        `rois` / `roi_imgsz` as in `detect_bgr`, relative to the captured image.
         Returns (captured_image, meta, dets).
         """
         raise NotImplementedError
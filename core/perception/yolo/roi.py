@@ -0,0 +1,127 @@
+# core/perception/yolo/roi.py
+"""
+Region-of-interest detection: run the detector on crops of a frame and map
+the boxes back to full-frame coordinates.
+
+A ROI is an xyxy box, in pixels or, when every value is within 0..1, in
+fractions of the frame. By default each crop gets the imgsz that keeps the
+full-frame scale (objects look the same size to the model as in a full
+pass), so the saving is the area left out.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.types import DetectionDict
+from core.utils.boxes import as_boxes, greedy_suppress, iou_matrix, overlap_of_smaller
+
+RoiXYXY = Tuple[float, float, float, float]
+PixelXYXY = Tuple[int, int, int, int]
+
+# Same-class boxes from different crops overlapping this much (of the smaller
+# box) are one object cut by a crop border
+CROSS_ROI_OVERLAP = 0.6
+
+
+def roi_to_pixels(roi: Sequence[float], width: int, height: int) -> PixelXYXY:
+    x1, y1, x2, y2 = (float(v) for v in roi)
+    if max(abs(x1), abs(y1), abs(x2), abs(y2)) <= 1.0:
+        x1, x2 = x1 * width, x2 * width
+        y1, y2 = y1 * height, y2 * height
+    px1 = max(0, min(width, int(math.floor(min(x1, x2)))))
+    py1 = max(0, min(height, int(math.floor(min(y1, y2)))))
+    px2 = max(0, min(width, int(math.ceil(max(x1, x2)))))
+    py2 = max(0, min(height, int(math.ceil(max(y1, y2)))))
+    if px2 - px1 < 2 or py2 - py1 < 2:
+        raise ValueError(f"ROI {tuple(roi)} is empty on a {width}x{height} frame")
+    return px1, py1, px2, py2
+
+
+def roi_imgsz_for(
+    box: PixelXYXY, width: int, height: int, imgsz: int, *, stride: int = 32
+) -> int:
+    """imgsz for a crop that keeps the scale a full-frame pass at `imgsz` would use."""
+    long_side = max(box[2] - box[0], box[3] - box[1])
+    size = int(imgsz) * long_side / max(width, height, 1)
+    return int(min(int(imgsz), max(stride, math.ceil(size / stride) * stride)))
+
+
+def merge_roi_dets(
+    per_roi: Sequence[Sequence[DetectionDict]],
+    boxes: Sequence[PixelXYXY],
+    *,
+    iou: float,
+) -> List[DetectionDict]:
+    """
+    Shift each crop's detections by its origin and merge them. Where crops
+    overlap, the same object can come back twice (or cut in two by a crop
+    border): same-class boxes from different crops with IoU > `iou`, or mostly
+    inside one another, keep only the most confident. `idx` is renumbered.
+    """
+    shifted: List[Tuple[int, DetectionDict]] = []
+    for r, (dets, box) in enumerate(zip(per_roi, boxes)):
+        ox, oy = box[0], box[1]
+        for d in dets:
+            x1, y1, x2, y2 = d["xyxy"]
+            shifted.append(
+                (r, {**d, "xyxy": (float(x1 + ox), float(y1 + oy), float(x2 + ox), float(y2 + oy))})
+            )
+
+    if not shifted:
+        return []
+    rois = np.asarray([r for r, _ in shifted])
+    dets = [d for _, d in shifted]
+    xyxy = as_boxes(dets)
+    names = np.asarray([str(d["name"]) for d in dets])
+    # within one crop the detector's own NMS already ran
+    same = (names[:, None] == names[None, :]) & (rois[:, None] != rois[None, :])
+    over = (iou_matrix(xyxy, xyxy) > iou) | (overlap_of_smaller(xyxy, xyxy) >= CROSS_ROI_OVERLAP)
+    kept = greedy_suppress(np.asarray([float(d["conf"]) for d in dets]), over & same)
+
+    out = [dets[i] for i in kept]
+    for i, d in enumerate(out):
+        d["idx"] = i
+    return out
+
+
+def detect_rois(
+    detector: Any,
+    bgr: np.ndarray,
+    rois: Sequence[Sequence[float]],
+    *,
+    imgsz: int,
+    roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
+    conf: float,
+    iou: float,
+    **kwargs: Any,
+) -> Tuple[Dict[str, Any], List[DetectionDict]]:
+    """
+    Detect only inside `rois` of `bgr` with one `detector.detect_bgr_batch`
+    call. `roi_imgsz` (scalar or per ROI; None = keep the full-frame scale).
+    Extra kwargs (tag, agent) go to the batch call.
+    """
+    h, w = bgr.shape[:2]
+    boxes = [roi_to_pixels(r, w, h) for r in rois]
+    if isinstance(roi_imgsz, (list, tuple)):
+        if len(roi_imgsz) != len(boxes):
+            raise ValueError(f"Expected {len(boxes)} per-ROI imgsz values, got {len(roi_imgsz)}")
+        sizes_in = list(roi_imgsz)
+    else:
+        sizes_in = [roi_imgsz] * len(boxes)
+    sizes = [
+        int(s) if s is not None else roi_imgsz_for(b, w, h, imgsz)
+        for s, b in zip(sizes_in, boxes)
+    ]
+    crops = [np.ascontiguousarray(bgr[y1:y2, x1:x2]) for x1, y1, x2, y2 in boxes]
+    results = detector.detect_bgr_batch(crops, imgsz=sizes, conf=conf, iou=iou, **kwargs)
+    dets = merge_roi_dets([d for _, d in results], boxes, iou=iou)
+
+    meta: Dict[str, Any] = dict(results[0][0]) if results else {}
+    meta.pop("batch_size", None)
+    meta.update(
+        {"imgsz": imgsz, "conf": conf, "iou": iou, "rois": boxes, "roi_imgsz": sizes}
+    )
+    return meta, dets
@@ -1,16 +1,20 @@
 # core/perception/yolo/yolo_local.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 import numpy as np
 from PIL import Image
-from ultralytics.models import YOLO
 
-from core.perception.yolo.interface import IDetector
+from core.perception.yolo.interface import IDetector, per_item
+from core.perception.yolo.roi import detect_rois
+from core.perception.yolo.yolo_onnx import OnnxYOLODetector, onnx_weights_for
 from core.controllers.base import IController, RegionXYWH
 from core.controllers.steam import SteamController
 from core.settings import Settings
 from core.types import DetectionDict
+from core.utils.boxes import dets_from_arrays, name_index
+from core.utils.frame_gate import FrameChangeGate, FrameResultCache, frame_fingerprint_bgr
 from core.utils.img import pil_to_bgr
 from core.utils.logger import logger_uma
 
@@ -19,6 +23,14 @@ class LocalYOLOEngine(IDetector):
     """
     Ultralytics-backed detector. Keeps API parity with the interface and mirrors
     your previous helpers, but encapsulated in a class.
+
+    backend="onnx" (or `.onnx` weights) runs the exported model on onnxruntime's
+    CPU provider instead, with no torch at runtime; `self.model` is then None.
+
+    With YOLO_DETECTION_CACHE, `detect_bgr` on a frame that looks the same as
+    one detected within YOLO_CACHE_TTL_S (same size/imgsz/conf/iou/rois, and
+    no controller input since) returns the stored detections; meta then
+    carries "cached": True.
     """
 
     def __init__(
@@ -27,10 +39,37 @@ class LocalYOLOEngine(IDetector):
         *,
         weights: Optional[str] = None,
         use_gpu: Optional[bool] = None,
+        backend: Optional[str] = None,
     ):
         self.ctrl = ctrl
         self.weights_path = str(weights or Settings.YOLO_WEIGHTS_URA)
         self.use_gpu = Settings.USE_GPU if use_gpu is None else bool(use_gpu)
+        if self.weights_path.lower().endswith(".onnx"):
+            backend = "onnx"
+        self.backend = (backend or Settings.YOLO_BACKEND).strip().lower()
+
+        self.model = None
+        self._onnx: Optional[OnnxYOLODetector] = None
+        self._cache: Optional[FrameResultCache] = (
+            FrameResultCache(
+                max_entries=Settings.YOLO_CACHE_SIZE,
+                ttl_s=Settings.YOLO_CACHE_TTL_S,
+                bits_tol=Settings.YOLO_CACHE_HAMMING,
+            )
+            if Settings.YOLO_DETECTION_CACHE
+            else None
+        )
+        if self.backend == "onnx":
+            self.weights_path = str(
+                onnx_weights_for(self.weights_path, int8=Settings.YOLO_ONNX_INT8)
+            )
+            logger_uma.info(f"Loading YOLO ONNX model from: {self.weights_path}")
+            self._onnx = OnnxYOLODetector(
+                self.weights_path, threads=Settings.YOLO_ONNX_THREADS
+            )
+            return
+
+        from ultralytics.models import YOLO
 
         logger_uma.info(f"Loading YOLO weights from: {self.weights_path}")
         self.model = YOLO(self.weights_path)
@@ -47,28 +86,32 @@ class LocalYOLOEngine(IDetector):
         if boxes is None or len(boxes) == 0:
             return []
 
-        names = (
-            res.names
-            if isinstance(res.names, dict)
-            else {i: n for i, n in enumerate(res.names)}
+        return dets_from_arrays(
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy(),
+            name_index(res.names),
+            conf_min=conf_min,
         )
-        xyxy = boxes.xyxy.cpu().numpy()
-        cls = boxes.cls.cpu().numpy().astype(int)
-        conf = boxes.conf.cpu().numpy()
-
-        out: List[DetectionDict] = []
-        for i in range(len(cls)):
-            if conf[i] < conf_min:
-                continue
-            out.append(
-                {
-                    "idx": i,
-                    "name": names.get(int(cls[i]), str(cls[i])),
-                    "conf": float(conf[i]),
-                    "xyxy": tuple(map(float, xyxy[i])),
-                }
-            )
-        return out
+
+    def _predict(
+        self, bgrs: Sequence[np.ndarray], *, imgsz: int, conf: float, iou: float
+    ) -> List[Tuple[Dict[int, str], List[DetectionDict]]]:
+        """One backend call for a list of frames -> [(names, dets)] aligned with `bgrs`."""
+        if self._onnx is not None:
+            names = self._onnx.names
+            return [
+                (names, dets)
+                for dets in self._onnx.detect(bgrs, imgsz=imgsz, conf=conf, iou=iou)
+            ]
+        res_list = self.model.predict(
+            source=list(bgrs),
+            imgsz=imgsz,
+            conf=conf,
+            iou=iou,
+            verbose=False,
+        )
+        return [(r.names, self._extract_dets(r, conf_min=conf)) for r in res_list]
 
     @staticmethod
     def _maybe_store_debug(
@@ -120,18 +163,53 @@ class LocalYOLOEngine(IDetector):
         original_pil_img=None,
         tag="general",
         agent: Optional[str] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
+        """
+        With `rois` (xyxy, pixels or 0..1 fractions), detect only inside those
+        crops, each at `roi_imgsz` (default: the full-frame scale), and return
+        boxes in full-frame coordinates.
+        """
         imgsz = imgsz if imgsz is not None else Settings.YOLO_IMGSZ
         conf = conf if conf is not None else Settings.YOLO_CONF
         iou = iou if iou is not None else Settings.YOLO_IOU
 
-        res_list = self.model.predict(
-            source=bgr, imgsz=imgsz, conf=conf, iou=iou, verbose=False
-        )
-        result = res_list[0]
-        dets = self._extract_dets(result, conf_min=conf)
+        fp = cache_key = None
+        meta: Optional[Dict[str, Any]] = None
+        if self._cache is not None:
+            # Same-looking frame with the same query seen recently: skip inference
+            seen_at = time.monotonic()
+            fp = frame_fingerprint_bgr(bgr)
+            cache_key = (
+                self.weights_path,
+                tuple(bgr.shape[:2]),
+                int(imgsz),
+                float(conf),
+                float(iou),
+                tuple(tuple(float(v) for v in r) for r in rois) if rois else None,
+                tuple(roi_imgsz) if isinstance(roi_imgsz, (list, tuple)) else roi_imgsz,
+            )
+            input_ts = self.ctrl.last_input_ts if self.ctrl is not None else 0.0
+            hit = self._cache.get(fp, cache_key, input_ts=input_ts)
+            if hit is not None:
+                meta = {**hit[0], "cached": True}
+                dets = [dict(d) for d in hit[1]]
+
+        if meta is None:
+            if rois:
+                meta, dets = detect_rois(
+                    self, bgr, rois, imgsz=imgsz, roi_imgsz=roi_imgsz, conf=conf, iou=iou
+                )
+            else:
+                names, dets = self._predict([bgr], imgsz=imgsz, conf=conf, iou=iou)[0]
+                meta = {"names": names, "imgsz": imgsz, "conf": conf, "iou": iou}
+            if self._cache is not None:
+                # Stamped before inference, so an input made meanwhile invalidates it
+                self._cache.put(fp, cache_key, (meta, [dict(d) for d in dets]), seen_at=seen_at)
 
-        if original_pil_img is not None:
+        # A cache hit is a frame we already sampled; storing it again only duplicates it
+        if original_pil_img is not None and not meta.get("cached"):
             self._maybe_store_debug(
                 original_pil_img,
                 dets,
@@ -140,9 +218,65 @@ class LocalYOLOEngine(IDetector):
                 agent=agent,
             )
 
-        meta = {"names": result.names, "imgsz": imgsz, "conf": conf, "iou": iou}
         return meta, dets
 
+    def detect_bgr_batch(
+        self,
+        bgrs: Sequence[np.ndarray],
+        *,
+        imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
+        conf: Union[Optional[float], Sequence[Optional[float]]] = None,
+        iou: Union[Optional[float], Sequence[Optional[float]]] = None,
+        original_pil_imgs: Optional[Sequence[Optional[Image.Image]]] = None,
+        tag="general",
+        agent: Optional[str] = None,
+    ) -> List[Tuple[Dict[str, Any], List[DetectionDict]]]:
+        """
+        Detect on several frames, one backend call per (imgsz, iou) group.
+        imgsz/conf/iou may be scalars or per-frame sequences. Frames sharing a group
+        are predicted at the group's lowest conf and then filtered per frame, which
+        matches per-frame calls (NMS never lets a lower-conf box suppress a higher one).
+        Returns [(meta, dets)] aligned with `bgrs`.
+        """
+        n = len(bgrs)
+        sizes = per_item(imgsz, n, Settings.YOLO_IMGSZ)
+        confs = per_item(conf, n, Settings.YOLO_CONF)
+        ious = per_item(iou, n, Settings.YOLO_IOU)
+
+        groups: Dict[Tuple[int, float], List[int]] = {}
+        for i in range(n):
+            groups.setdefault((int(sizes[i]), float(ious[i])), []).append(i)
+
+        out: List[Optional[Tuple[Dict[str, Any], List[DetectionDict]]]] = [None] * n
+        for (g_imgsz, g_iou), idxs in groups.items():
+            g_conf = min(float(confs[i]) for i in idxs)
+            results = self._predict(
+                [bgrs[i] for i in idxs], imgsz=g_imgsz, conf=g_conf, iou=g_iou
+            )
+            for i, (names, g_dets) in zip(idxs, results):
+                dets = [d for d in g_dets if d["conf"] >= float(confs[i])]
+                # Number like a call at this frame's own conf would
+                for k, d in enumerate(dets):
+                    d["idx"] = k
+                pil_img = original_pil_imgs[i] if original_pil_imgs else None
+                if pil_img is not None:
+                    self._maybe_store_debug(
+                        pil_img,
+                        dets,
+                        tag=tag,
+                        thr=Settings.STORE_FOR_TRAINING_THRESHOLD,
+                        agent=agent,
+                    )
+                meta = {
+                    "names": names,
+                    "imgsz": g_imgsz,
+                    "conf": float(confs[i]),
+                    "iou": g_iou,
+                    "batch_size": len(idxs),
+                }
+                out[i] = (meta, dets)
+        return [r for r in out if r is not None]
+
     def detect_pil(
         self,
         pil_img: Image.Image,
@@ -152,6 +286,8 @@ class LocalYOLOEngine(IDetector):
         iou: Optional[float] = None,
         tag="general",
         agent: Optional[str] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
         bgr = pil_to_bgr(pil_img)
 
@@ -163,6 +299,8 @@ class LocalYOLOEngine(IDetector):
             original_pil_img=pil_img,
             tag=tag,
             agent=agent,
+            rois=rois,
+            roi_imgsz=roi_imgsz,
         )
         return meta, dets
 
@@ -175,16 +313,37 @@ class LocalYOLOEngine(IDetector):
         iou: Optional[float] = None,
         tag: str = "general",
         agent: Optional[str] = None,
+        gate: Optional[FrameChangeGate] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Image.Image, Dict[str, Any], List[DetectionDict]]:
         if self.ctrl is None:
             raise RuntimeError(
                 "LocalYOLOEngine.recognize() requires a controller injected in the constructor."
             )
 
-        if isinstance(self.ctrl, SteamController):
-            img = self.ctrl.screenshot_left_half()
-        else:
-            img = self.ctrl.screenshot(region=region)
+        img = None
+        if region is None:
+            # Background grabber (if running) already has a frame from after the last input
+            img = self.ctrl.latest_frame(
+                max_age=Settings.FRAME_GRABBER_MAX_AGE_S, wait=Settings.FRAME_GRABBER_WAIT_S
+            )
+        if img is None:
+            if isinstance(self.ctrl, SteamController):
+                img = self.ctrl.screenshot_left_half()
+            else:
+                img = self.ctrl.screenshot(region=region)
+
+        if gate is not None:
+            # Screen unchanged since the last full pass: hand back its detections
+            hit = gate.lookup(img, input_ts=self.ctrl.last_input_ts)
+            if hit is not None:
+                meta, dets = hit
+                return img, meta, dets
 
-        meta, dets = self.detect_pil(img, imgsz=imgsz, conf=conf, iou=iou, agent=agent)
+        meta, dets = self.detect_pil(
+            img, imgsz=imgsz, conf=conf, iou=iou, agent=agent, rois=rois, roi_imgsz=roi_imgsz
+        )
+        if gate is not None:
+            gate.update((meta, dets))
         return img, meta, dets
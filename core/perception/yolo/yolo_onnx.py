@@ -0,0 +1,248 @@
+# core/perception/yolo/yolo_onnx.py
+"""
+YOLO detection through onnxruntime (CPU), without torch/ultralytics.
+
+Pre- and postprocessing follow Ultralytics' predict path so the boxes match
+the `.pt` model: letterbox (gray 114 padding, minimal stride padding when the
+exported graph has dynamic spatial axes), best-class confidence filter,
+class-aware NMS, max 300 detections, boxes scaled back and clipped to the
+source frame.
+
+Export the weights with `python scripts/export_yolo_onnx.py`; INT8 variants
+come from `python scripts/quantize_yolo_onnx.py`.
+"""
+from __future__ import annotations
+
+import ast
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from core.types import DetectionDict
+from core.utils.boxes import dets_from_arrays
+from core.utils.logger import logger_uma
+
+PAD_VALUE = 114
+MAX_DET = 300
+MAX_NMS = 30000
+MAX_WH = 7680  # class offset for class-aware NMS, as in Ultralytics
+
+
+def letterbox(
+    bgr: np.ndarray,
+    new_shape: Tuple[int, int],
+    *,
+    auto: bool = False,
+    stride: int = 32,
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize keeping aspect ratio and pad to `new_shape` (h, w).
+    With `auto`, pad only up to the next multiple of `stride` (rectangular input).
+    -> (image, scale, (pad_left, pad_top)).
+    """
+    h0, w0 = bgr.shape[:2]
+    nh, nw = new_shape
+    r = min(nh / h0, nw / w0)
+    unpad_w, unpad_h = int(round(w0 * r)), int(round(h0 * r))
+    dw, dh = nw - unpad_w, nh - unpad_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw /= 2
+    dh /= 2
+    if (w0, h0) != (unpad_w, unpad_h):
+        bgr = cv2.resize(bgr, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    out = cv2.copyMakeBorder(
+        bgr, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3
+    )
+    return out, r, (float(left), float(top))
+
+
+def nms_xyxy(boxes: np.ndarray, scores: np.ndarray, iou_thr: float) -> np.ndarray:
+    """Greedy NMS; -> indices kept, highest score first."""
+    order = np.argsort(-scores, kind="stable")
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    keep: List[int] = []
+    while order.size:
+        i = int(order[0])
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        ih = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = iw * ih
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_thr]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess(
+    pred: np.ndarray,
+    *,
+    conf: float,
+    iou: float,
+    scale: float,
+    pad: Tuple[float, float],
+    orig_shape: Tuple[int, int],
+    max_det: int = MAX_DET,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    One image's raw head output (4 + nc, N) -> (xyxy (K, 4) in source pixels,
+    conf (K,), cls (K,)) sorted by confidence.
+    """
+    pred = pred.T  # (N, 4 + nc)
+    cls_scores = pred[:, 4:]
+    cls = cls_scores.argmax(axis=1)
+    scores = cls_scores[np.arange(cls.size), cls]
+    keep = scores > conf
+    if not keep.any():
+        empty = np.zeros((0,), dtype=np.float32)
+        return np.zeros((0, 4), dtype=np.float32), empty, np.zeros((0,), dtype=np.int64)
+    xywh, scores, cls = pred[keep, :4], scores[keep], cls[keep]
+    if scores.size > MAX_NMS:
+        top = np.argsort(-scores, kind="stable")[:MAX_NMS]
+        xywh, scores, cls = xywh[top], scores[top], cls[top]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+    kept = nms_xyxy(boxes + (cls[:, None] * MAX_WH), scores, iou)[:max_det]
+    boxes, scores, cls = boxes[kept], scores[kept], cls[kept]
+
+    px, py = pad
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - px) / scale
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - py) / scale
+    h0, w0 = orig_shape
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w0)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h0)
+    return boxes, scores, cls
+
+
+def onnx_weights_for(weights: str | Path, *, int8: bool = False) -> Path:
+    """
+    `models/uma_ura.pt` -> `models/uma_ura.onnx` (an `.onnx` path is kept).
+    With `int8`, prefer the quantized `models/uma_ura.int8.onnx` when it exists.
+    """
+    path = Path(weights)
+    if path.suffix.lower() == ".onnx":
+        return path
+    if int8:
+        quantized = path.with_suffix(".int8.onnx")
+        if quantized.is_file():
+            return quantized
+    return path.with_suffix(".onnx")
+
+
+def _parse_names(raw: Optional[str]) -> Dict[int, str]:
+    if not raw:
+        return {}
+    try:
+        names = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return {}
+    if isinstance(names, dict):
+        return {int(k): str(v) for k, v in names.items()}
+    return {i: str(n) for i, n in enumerate(names)}
+
+
+class OnnxYOLODetector:
+    """onnxruntime session + Ultralytics-compatible pre/postprocessing."""
+
+    def __init__(self, path: str | Path, *, threads: int = 0) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "YOLO_BACKEND=onnx needs onnxruntime (pip install onnxruntime)"
+            ) from exc
+
+        self.path = str(path)
+        if not os.path.isfile(self.path):
+            raise FileNotFoundError(
+                f"ONNX model not found: {self.path} (run scripts/export_yolo_onnx.py)"
+            )
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = int(threads)
+        self._bind(
+            ort.InferenceSession(
+                self.path, sess_options=opts, providers=["CPUExecutionProvider"]
+            )
+        )
+        logger_uma.info(
+            "[yolo-onnx] loaded %s (%d classes, input %s, batch %s)",
+            os.path.basename(self.path),
+            len(self.names),
+            self.fixed_shape or "dynamic",
+            self.max_batch or "dynamic",
+        )
+
+    def _bind(self, session) -> None:
+        self.session = session
+        inp = session.get_inputs()[0]
+        self.input_name = inp.name
+        b, _, h, w = inp.shape
+        # Symbolic axes (exported with dynamic=True) take any stride-aligned size
+        self.fixed_shape: Optional[Tuple[int, int]] = (
+            (int(h), int(w)) if isinstance(h, int) and isinstance(w, int) else None
+        )
+        # A --static export fixes the batch too (to 1): larger batches are split
+        self.max_batch: Optional[int] = int(b) if isinstance(b, int) and b > 0 else None
+        meta = session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = _parse_names(meta.get("names"))
+        self.stride = int(meta.get("stride", 32) or 32)
+
+    def _input_shape(self, imgsz: int) -> Tuple[Tuple[int, int], bool]:
+        if self.fixed_shape is not None:
+            return self.fixed_shape, False
+        size = int(np.ceil(int(imgsz) / self.stride) * self.stride)
+        return (size, size), True
+
+    def detect(
+        self,
+        bgrs: Sequence[np.ndarray],
+        *,
+        imgsz: int,
+        conf: float,
+        iou: float,
+    ) -> List[List[DetectionDict]]:
+        """-> per-frame detections in the same dict shape as LocalYOLOEngine."""
+        shape, auto = self._input_shape(imgsz)
+        prepared = [letterbox(bgr, shape, auto=auto, stride=self.stride) for bgr in bgrs]
+
+        # Rectangular letterboxes of differently shaped frames cannot share a batch
+        out: List[Optional[List[DetectionDict]]] = [None] * len(bgrs)
+        by_shape: Dict[Tuple[int, int], List[int]] = {}
+        for i, (img, _, _) in enumerate(prepared):
+            by_shape.setdefault(img.shape[:2], []).append(i)
+        step = self.max_batch or max(1, len(bgrs))
+        chunks = [
+            idxs[k : k + step] for idxs in by_shape.values() for k in range(0, len(idxs), step)
+        ]
+        for idxs in chunks:
+            batch = np.stack([prepared[i][0] for i in idxs])
+            # BGR HWC uint8 -> RGB CHW float 0..1
+            blob = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32)
+            blob /= 255.0
+            if self.max_batch and len(idxs) < self.max_batch:
+                # Fixed batch axis: fill the rest with blank frames, ignore their output
+                fill = np.zeros((self.max_batch - len(idxs),) + blob.shape[1:], np.float32)
+                blob = np.concatenate([blob, fill])
+            preds = self.session.run(None, {self.input_name: blob})[0]
+            for j, i in enumerate(idxs):
+                _, scale, pad = prepared[i]
+                boxes, scores, cls = postprocess(
+                    preds[j],
+                    conf=conf,
+                    iou=iou,
+                    scale=scale,
+                    pad=pad,
+                    orig_shape=bgrs[i].shape[:2],
+                )
+                out[i] = dets_from_arrays(boxes, scores, cls, self.names)
+        return [dets or [] for dets in out]
@@ -1,25 +1,27 @@
 # core/perception/yolo/yolo_remote.py
 from __future__ import annotations
 
-import base64
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 import cv2
 import numpy as np
 from PIL import Image
 import requests
 
-from core.perception.yolo.interface import IDetector
+from core.perception.yolo.interface import IDetector, per_item
+from core.perception.yolo.roi import detect_rois
 from core.controllers.base import IController, RegionXYWH
 from core.controllers.steam import SteamController
 from core.settings import Settings
 from core.types import DetectionDict
+from core.utils.frame_codec import FrameTransport
+from core.utils.frame_gate import FrameChangeGate
 from core.utils.img import pil_to_bgr, to_bgr
 from core.utils.logger import logger_uma
 
 
-def _encode_image_to_base64(img: Any, *, fmt: str = ".png") -> str:
+def _prepare_bgr3(img: Any) -> np.ndarray:
     """
-    Encode to base64 as a true 3-channel BGR PNG.
+    Normalize to a true 3-channel BGR array.
     - If PIL.Image: convert RGB->BGR.
     - If ndarray: assume it's already BGR (do NOT swap again).
     - Normalize grayscale/BGRA to BGR.
@@ -36,11 +38,7 @@ def _encode_image_to_base64(img: Any, *, fmt: str = ".png") -> str:
         bgr = cv2.cvtColor(bgr, cv2.COLOR_GRAY2BGR)
     elif bgr.shape[2] == 4:
         bgr = cv2.cvtColor(bgr, cv2.COLOR_BGRA2BGR)
-
-    ok, buf = cv2.imencode(fmt, bgr)
-    if not ok:
-        raise ValueError("Failed to encode image")
-    return base64.b64encode(buf.tobytes()).decode("ascii")
+    return bgr
 
 
 class RemoteYOLOEngine(IDetector):
@@ -57,6 +55,7 @@ class RemoteYOLOEngine(IDetector):
         timeout: float = 30.0,
         session: Optional[requests.Session] = None,
         weights: str | None = None,
+        frame_codec: Optional[str] = None,
     ):
         self.ctrl = ctrl
         self.base_url = base_url.rstrip("/")
@@ -64,10 +63,17 @@ class RemoteYOLOEngine(IDetector):
         self.session = session or requests.Session()
         # Ensure JSON-serializable type (avoid WindowsPath issues)
         self.weights = str(weights) if weights is not None else None
+        self._transport = FrameTransport(
+            self.session,
+            codec=frame_codec or Settings.REMOTE_FRAME_CODEC,
+            conditional=Settings.REMOTE_CONDITIONAL_UPLOAD,
+        )
+        # Flipped off when the server predates /yolo/batch
+        self._batch_supported = True
 
-    def _post(self, payload: Dict[str, any]) -> Dict[str, any]:
-        r = self.session.post(
-            f"{self.base_url}/yolo", json=payload, timeout=self.timeout
+    def _post(self, payload: Dict[str, Any], bgr: np.ndarray) -> Dict[str, Any]:
+        r = self._transport.post(
+            f"{self.base_url}/yolo", payload, [bgr], timeout=self.timeout
         )
         r.raise_for_status()
         return r.json()
@@ -82,22 +88,37 @@ class RemoteYOLOEngine(IDetector):
         iou: Optional[float] = None,
         tag: str = "general",
         agent: Optional[str] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
         imgsz = imgsz if imgsz is not None else Settings.YOLO_IMGSZ
         conf = conf if conf is not None else Settings.YOLO_CONF
         iou = iou if iou is not None else Settings.YOLO_IOU
 
-        img64 = _encode_image_to_base64(bgr)
+        if rois:
+            # Crops go up as one /yolo/batch request; boxes come back in frame coordinates
+            return detect_rois(
+                self,
+                _prepare_bgr3(bgr),
+                rois,
+                imgsz=imgsz,
+                roi_imgsz=roi_imgsz,
+                conf=conf,
+                iou=iou,
+                tag=tag,
+                agent=agent,
+            )
+
         data = self._post(
             {
-                "img": img64,
                 "imgsz": imgsz,
                 "conf": conf,
                 "iou": iou,
                 "weights_path": self.weights,
                 "tag": tag,
                 "agent": agent,
-            }
+            },
+            _prepare_bgr3(bgr),
         )
         meta = data.get(
             "meta", {"backend": "remote", "imgsz": imgsz, "conf": conf, "iou": iou}
@@ -109,6 +130,66 @@ class RemoteYOLOEngine(IDetector):
             meta.setdefault("agent", agent)
         return meta, dets
 
+    def detect_bgr_batch(
+        self,
+        bgrs: Sequence[np.ndarray],
+        *,
+        imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
+        conf: Union[Optional[float], Sequence[Optional[float]]] = None,
+        iou: Union[Optional[float], Sequence[Optional[float]]] = None,
+        tag: str = "general",
+        agent: Optional[str] = None,
+    ) -> List[Tuple[Dict[str, Any], List[DetectionDict]]]:
+        n = len(bgrs)
+        if n == 0:
+            return []
+        sizes = per_item(imgsz, n, Settings.YOLO_IMGSZ)
+        confs = per_item(conf, n, Settings.YOLO_CONF)
+        ious = per_item(iou, n, Settings.YOLO_IOU)
+
+        if not self._batch_supported:
+            return [
+                self.detect_bgr(
+                    bgrs[i], imgsz=sizes[i], conf=confs[i], iou=ious[i], tag=tag, agent=agent
+                )
+                for i in range(n)
+            ]
+
+        items = [
+            {
+                "imgsz": sizes[i],
+                "conf": confs[i],
+                "iou": ious[i],
+                "weights_path": self.weights,
+                "tag": tag,
+                "agent": agent,
+            }
+            for i in range(n)
+        ]
+        r = self._transport.post(
+            f"{self.base_url}/yolo/batch",
+            {"items": items},
+            [_prepare_bgr3(b) for b in bgrs],
+            image_key="imgs",
+            timeout=self.timeout,
+        )
+        if r.status_code in (404, 405):
+            logger_uma.info("[yolo_remote] server has no /yolo/batch; using per-frame calls")
+            self._batch_supported = False
+            return self.detect_bgr_batch(
+                bgrs, imgsz=sizes, conf=confs, iou=ious, tag=tag, agent=agent
+            )
+        r.raise_for_status()
+        out: List[Tuple[Dict[str, Any], List[DetectionDict]]] = []
+        for res in r.json().get("results", []):
+            meta = res.get("meta", {"backend": "remote"})
+            if tag:
+                meta.setdefault("tag", tag)
+            if agent:
+                meta.setdefault("agent", agent)
+            out.append((meta, res.get("dets", [])))
+        return out
+
     def detect_pil(
         self,
         pil_img: Image.Image,
@@ -118,6 +199,8 @@ class RemoteYOLOEngine(IDetector):
         iou: Optional[float] = None,
         tag: str = "general",
         agent: Optional[str] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ) -> Tuple[Dict[str, Any], List[DetectionDict]]:
         bgr = pil_to_bgr(pil_img)
         return self.detect_bgr(
@@ -127,6 +210,8 @@ class RemoteYOLOEngine(IDetector):
             iou=iou,
             tag=tag,
             agent=agent,
+            rois=rois,
+            roi_imgsz=roi_imgsz,
         )
 
     @staticmethod
@@ -177,16 +262,33 @@ class RemoteYOLOEngine(IDetector):
         iou: Optional[float] = None,
         tag: str = "general",
         agent: Optional[str] = None,
+        gate: Optional[FrameChangeGate] = None,
+        rois: Optional[Sequence[Sequence[float]]] = None,
+        roi_imgsz: Union[Optional[int], Sequence[Optional[int]]] = None,
     ):
         if self.ctrl is None:
             raise RuntimeError(
                 "RemoteYOLOEngine.recognize() requires a controller injected in the constructor."
             )
 
-        if isinstance(self.ctrl, SteamController):
-            img = self.ctrl.screenshot_left_half()
-        else:
-            img = self.ctrl.screenshot(region=region)
+        img = None
+        if region is None:
+            # Background grabber (if running) already has a frame from after the last input
+            img = self.ctrl.latest_frame(
+                max_age=Settings.FRAME_GRABBER_MAX_AGE_S, wait=Settings.FRAME_GRABBER_WAIT_S
+            )
+        if img is None:
+            if isinstance(self.ctrl, SteamController):
+                img = self.ctrl.screenshot_left_half()
+            else:
+                img = self.ctrl.screenshot(region=region)
+
+        if gate is not None:
+            # Screen unchanged since the last full pass: hand back its detections
+            hit = gate.lookup(img, input_ts=self.ctrl.last_input_ts)
+            if hit is not None:
+                meta, dets = hit
+                return img, meta, dets
 
         meta, dets = self.detect_pil(
             img,
@@ -195,7 +297,11 @@ class RemoteYOLOEngine(IDetector):
             iou=iou,
             tag=tag,
             agent=agent,
+            rois=rois,
+            roi_imgsz=roi_imgsz,
         )
+        if gate is not None:
+            gate.update((meta, dets))
 
         if not Settings.USE_EXTERNAL_PROCESSOR:
             # otherwise it is already saved in external processor
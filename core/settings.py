@@ -141,11 +141,67 @@ class Settings:
     MODE: str = _env("MODE", "steam") or "steam"
     USE_ADB: bool = _env_bool("USE_ADB", False)
     ADB_DEVICE: Optional[str] = _env("ADB_DEVICE", "localhost:5555")
+    # Send taps/swipes through one long-lived `adb shell` instead of spawning adb per action
+    ADB_PERSISTENT_SHELL: bool = _env_bool("ADB_PERSISTENT_SHELL", True)
+    # "png" uses `screencap -p`. Set ADB_CAPTURE_MODE=raw on local emulators/USB 3 to pull the
+    # unencoded framebuffer instead (~8 MB a frame, so slower over TCP/remote adb)
+    ADB_CAPTURE_MODE: str = (_env("ADB_CAPTURE_MODE", "png") or "png").lower()
+    # Linux, scrcpy mode: drive the window through X11Controller (XShm capture) instead of ScrcpyController
+    X11_CAPTURE: bool = _env_bool("X11_CAPTURE", False)
+
+    # Capture continuously on a background thread so detectors read buffered frames
+    FRAME_GRABBER: bool = _env_bool("FRAME_GRABBER", False)
+    # Ring buffer size (frames)
+    FRAME_GRABBER_BUFFER: int = _env_int("FRAME_GRABBER_BUFFER", default=4)
+    # Target period between background grabs (seconds)
+    FRAME_GRABBER_INTERVAL_S: float = _env_float("FRAME_GRABBER_INTERVAL_S", default=0.05)
+    # Oldest buffered frame a detector will accept (seconds)
+    FRAME_GRABBER_MAX_AGE_S: float = _env_float("FRAME_GRABBER_MAX_AGE_S", default=0.25)
+    # How long to wait for a fresh frame before capturing synchronously (seconds)
+    FRAME_GRABBER_WAIT_S: float = _env_float("FRAME_GRABBER_WAIT_S", default=0.5)
+
+    # Skip the main-loop YOLO pass while the screen is visibly unchanged
+    FRAME_GATE: bool = _env_bool("FRAME_GATE", True)
+    # Re-run detection at least this often even on a static screen (seconds)
+    FRAME_GATE_MAX_REUSE_S: float = _env_float("FRAME_GATE_MAX_REUSE_S", default=2.0)
+
+    # Waiter polls: reuse detections on an unchanged screen, back off while static, confirm weak hits (opt-in)
+    WAITER_ADAPTIVE_POLL: bool = _env_bool("WAITER_ADAPTIVE_POLL", False)
+
+    # Replace fixed post-click/scroll sleeps with "wait until the screen stops moving" (opt-in)
+    SCREEN_SETTLE: bool = _env_bool("SCREEN_SETTLE", False)
+    # Consecutive unchanged frames that count as settled
+    SCREEN_SETTLE_FRAMES: int = _env_int("SCREEN_SETTLE_FRAMES", default=2)
+    # Pause between settle samples (seconds)
+    SCREEN_SETTLE_INTERVAL_S: float = _env_float("SCREEN_SETTLE_INTERVAL_S", default=0.05)
+
+    # Race/skills lists: page with measured scroll_by() instead of small fixed scroll steps (opt-in)
+    CALIBRATED_SCROLL: bool = _env_bool("CALIBRATED_SCROLL", False)
+
+    # Record every frame and action of a bot run for replay_session.py
+    RECORD_SESSION: bool = _env_bool("RECORD_SESSION", False)
+    SESSION_DIR: Path = Path(_env("SESSION_DIR") or (DEBUG_DIR / "sessions"))
 
     # --------- Detection (YOLO) ---------
     YOLO_IMGSZ: int = _env_int("YOLO_IMGSZ", default=832)
     YOLO_CONF: float = _env_float("YOLO_CONF", default=0.60)  # should be 0.7 in general, but we are a little conservative here...
     YOLO_IOU: float = _env_float("YOLO_IOU", default=0.45)
+    # "ultralytics" (torch, .pt weights) or "onnx" (onnxruntime CPU, sibling .onnx from scripts/export_yolo_onnx.py)
+    YOLO_BACKEND: str = (_env("YOLO_BACKEND", "ultralytics") or "ultralytics").strip().lower()
+    # onnxruntime intra-op threads for the onnx backend (0 = onnxruntime default)
+    YOLO_ONNX_THREADS: int = _env_int("YOLO_ONNX_THREADS", default=0)
+    # onnx backend: load the INT8 model (<weights>.int8.onnx from scripts/quantize_yolo_onnx.py) when present
+    YOLO_ONNX_INT8: bool = _env_bool("YOLO_ONNX_INT8", False)
+    # Training scan: after the first full pass, detect only in the support column and bottom panel (opt-in)
+    YOLO_TRAINING_ROI: bool = _env_bool("YOLO_TRAINING_ROI", False)
+    # Local YOLO: serve repeated detections of a visually identical frame from a cache (opt-in)
+    YOLO_DETECTION_CACHE: bool = _env_bool("YOLO_DETECTION_CACHE", False)
+    # Cached frames kept (LRU)
+    YOLO_CACHE_SIZE: int = _env_int("YOLO_CACHE_SIZE", default=32)
+    # Oldest cached detections served (seconds)
+    YOLO_CACHE_TTL_S: float = _env_float("YOLO_CACHE_TTL_S", default=2.0)
+    # Hash bits allowed to differ per block of the frame fingerprint
+    YOLO_CACHE_HAMMING: int = _env_int("YOLO_CACHE_HAMMING", default=1)
     UNITY_CUP_GOLDEN_CONF: float = _env_float("UNITY_CUP_GOLDEN_CONF", default=0.61)
     UNITY_CUP_GOLDEN_RELAXED_CONF: float = _env_float(
         "UNITY_CUP_GOLDEN_RELAXED_CONF", default=0.35
@@ -181,6 +237,38 @@ class Settings:
     USE_EXTERNAL_PROCESSOR = False
     EXTERNAL_PROCESSOR_URL = "http://127.0.0.1:8001"
     TEMPLATE_MATCH_TIMEOUT: float = _env_float("TEMPLATE_MATCH_TIMEOUT", default=300.0)
+    # Wire codec for frames sent to the external processor: raw | png | jpeg | json (legacy base64)
+    REMOTE_FRAME_CODEC: str = (_env("REMOTE_FRAME_CODEC", "png") or "png").strip().lower()
+    # Remote template matching uploads each template set once and references it by id
+    REMOTE_TEMPLATE_BANKS: bool = _env_bool("REMOTE_TEMPLATE_BANKS", default=True)
+    # Remote OCR/YOLO send only a checksum for frames the server already has
+    REMOTE_CONDITIONAL_UPLOAD: bool = _env_bool("REMOTE_CONDITIONAL_UPLOAD", default=True)
+    # Inference server micro-batching: flush at N queued requests or after the wait window
+    INFERENCE_BATCH_MAX_SIZE: int = _env_int("INFERENCE_BATCH_MAX_SIZE", default=8)
+    INFERENCE_BATCH_MAX_WAIT_MS: float = _env_float("INFERENCE_BATCH_MAX_WAIT_MS", default=15.0)
+    # Inference server result cache keyed by frame digest + model + params (0 disables)
+    INFERENCE_RESULT_CACHE_SIZE: int = _env_int("INFERENCE_RESULT_CACHE_SIZE", default=1024)
+    INFERENCE_RESULT_CACHE_TTL_S: float = _env_float("INFERENCE_RESULT_CACHE_TTL_S", default=30.0)
+    # Inference server worker pools: threads per pool and queued requests before answering 429
+    INFERENCE_YOLO_WORKERS: int = _env_int("INFERENCE_YOLO_WORKERS", default=1)
+    INFERENCE_OCR_WORKERS: int = _env_int("INFERENCE_OCR_WORKERS", default=1)
+    INFERENCE_TEMPLATE_WORKERS: int = _env_int("INFERENCE_TEMPLATE_WORKERS", default=2)
+    INFERENCE_QUEUE_MAX: int = _env_int("INFERENCE_QUEUE_MAX", default=32)
+    INFERENCE_RETRY_AFTER_S: float = _env_float("INFERENCE_RETRY_AFTER_S", default=1.0)
+    # Inference server YOLO models load on first use; LRU-evicted past the budget/count (0 = no limit)
+    INFERENCE_YOLO_MEMORY_BUDGET_MB: float = _env_float("INFERENCE_YOLO_MEMORY_BUDGET_MB", default=0.0)
+    INFERENCE_YOLO_MAX_MODELS: int = _env_int("INFERENCE_YOLO_MAX_MODELS", default=0)
+    # Comma-separated agent names or weight paths loaded at startup and never evicted
+    INFERENCE_YOLO_PRELOAD: str = _env("INFERENCE_YOLO_PRELOAD", "ura") or ""
+    # Prepared template features persisted across inference server restarts
+    INFERENCE_TEMPLATE_STORE: bool = _env_bool("INFERENCE_TEMPLATE_STORE", default=True)
+    INFERENCE_TEMPLATE_STORE_DIR: Path = Path(
+        _env("INFERENCE_TEMPLATE_STORE_DIR") or (ROOT_DIR / ".cache" / "template_features")
+    )
+    # Template banks registered by remote clients, kept most-recently-used first
+    INFERENCE_TEMPLATE_BANKS_MAX: int = _env_int("INFERENCE_TEMPLATE_BANKS_MAX", default=64)
+    # Recently uploaded frames kept for checksum-only requests (0 disables)
+    INFERENCE_FRAME_STORE_MB: float = _env_float("INFERENCE_FRAME_STORE_MB", default=256.0)
 
     REFERENCE_STATS = {
         "SPD": 1150,
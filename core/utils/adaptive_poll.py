@@ -0,0 +1,78 @@
+# core/utils/adaptive_poll.py
+"""
+Polling helpers for Waiter: back off while the screen is static, poll fast
+again as soon as it changes, and only trust a weak detection once it shows
+up in two polls in a row.
+"""
+from __future__ import annotations
+
+import random
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from core.types import DetectionDict
+from core.utils.boxes import as_boxes, iou_matrix
+
+
+class PollBackoff:
+    """
+    Delay before the next poll.
+
+    Starts at `min_s`; every poll that saw an unchanged frame multiplies the
+    delay by `factor` (capped at `max_s`), a changed frame resets it. Each
+    delay gets +/- `jitter` (fraction) so polls do not phase-lock with the
+    game's own animation cadence.
+    """
+
+    def __init__(
+        self,
+        min_s: float,
+        max_s: float,
+        *,
+        factor: float = 2.0,
+        jitter: float = 0.2,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.min_s = max(0.0, float(min_s))
+        self.max_s = max(self.min_s, float(max_s))
+        self.factor = max(1.0, float(factor))
+        self.jitter = min(max(0.0, float(jitter)), 1.0)
+        self._rng = rng or random.Random()
+        self._cur = self.min_s
+
+    def next_delay(self, changed: bool) -> float:
+        if changed:
+            self._cur = self.min_s
+        else:
+            self._cur = min(self.max_s, max(self._cur, 1e-3) * self.factor)
+        if not self.jitter:
+            return self._cur
+        return max(0.0, self._cur * self._rng.uniform(1.0 - self.jitter, 1.0 + self.jitter))
+
+    def reset(self) -> None:
+        self._cur = self.min_s
+
+
+def confirmed_candidates(
+    cand: Sequence[DetectionDict],
+    prev: Optional[Sequence[DetectionDict]],
+    *,
+    confident_conf: float,
+    iou_min: float = 0.6,
+) -> List[DetectionDict]:
+    """
+    Candidates safe to act on now: confident ones (conf >= `confident_conf`)
+    right away, the rest only if the previous poll saw the same class at
+    about the same place (IoU >= `iou_min`).
+    """
+    prev = list(prev or ())
+    seen = np.zeros(len(cand), dtype=bool)
+    if cand and prev:
+        same_name = np.array(
+            [[p.get("name") == d.get("name") for p in prev] for d in cand], dtype=bool
+        )
+        seen = ((iou_matrix(as_boxes(cand), as_boxes(prev)) >= iou_min) & same_name).any(axis=1)
+    return [
+        d for d, s in zip(cand, seen) if s or float(d.get("conf", 0.0)) >= confident_conf
+    ]
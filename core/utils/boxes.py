@@ -0,0 +1,197 @@
+# core/utils/boxes.py
+"""
+Vectorized box geometry for detections: (N, 4) float arrays of xyxy boxes.
+
+Pairwise IoU / containment matrices, greedy NMS (optionally class-aware and
+with the "one center inside the other" rule the support scan uses) and row
+grouping, as array ops instead of nested Python loops over dicts.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from core.types import DetectionDict
+
+
+def as_boxes(items: Any) -> np.ndarray:
+    """Detections (dicts with "xyxy"), xyxy sequences or an array -> (N, 4) float64."""
+    if isinstance(items, np.ndarray):
+        return items.reshape(-1, 4).astype(np.float64, copy=False)
+    rows = [it["xyxy"] if isinstance(it, Mapping) else it for it in items]
+    if not rows:
+        return np.zeros((0, 4), dtype=np.float64)
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def areas(boxes: np.ndarray, *, min_area: float = 0.0) -> np.ndarray:
+    """Box areas (negative extents count as 0), floored at `min_area`."""
+    w = np.clip(boxes[:, 2] - boxes[:, 0], 0.0, None)
+    h = np.clip(boxes[:, 3] - boxes[:, 1], 0.0, None)
+    return np.maximum(w * h, min_area)
+
+
+def centers(boxes: np.ndarray) -> np.ndarray:
+    """(N, 2) box centers."""
+    return np.stack(
+        [(boxes[:, 0] + boxes[:, 2]) * 0.5, (boxes[:, 1] + boxes[:, 3]) * 0.5], axis=1
+    )
+
+
+def intersections(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, M) intersection areas."""
+    iw = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    ih = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    return np.clip(iw, 0.0, None) * np.clip(ih, 0.0, None)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray, *, min_area: float = 0.0) -> np.ndarray:
+    """
+    (N, M) IoU. `min_area` floors each box area (claw uses 1 px so degenerate
+    boxes never divide by zero); an empty union gives 0.
+    """
+    inter = intersections(a, b)
+    union = areas(a, min_area=min_area)[:, None] + areas(b, min_area=min_area)[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(union > 0, inter / union, 0.0)
+    return np.where(inter > 0, out, 0.0)
+
+
+def overlap_of_smaller(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, M) intersection over the smaller of the two areas (1.0 = one inside the other)."""
+    inter = intersections(a, b)
+    smaller = np.minimum(areas(a)[:, None], areas(b)[None, :])
+    return inter / np.maximum(smaller, 1e-9)
+
+
+def points_in_boxes(points: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """(P, N) bool: point p lies inside box n, borders included."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    x, y = points[:, 0:1], points[:, 1:2]
+    return (
+        (boxes[None, :, 0] <= x)
+        & (x <= boxes[None, :, 2])
+        & (boxes[None, :, 1] <= y)
+        & (y <= boxes[None, :, 3])
+    )
+
+
+def greedy_suppress(scores: np.ndarray, over: np.ndarray) -> np.ndarray:
+    """
+    Visit boxes by score (descending, ties in input order) and keep each one
+    no kept box suppresses; `over[i, j]` means i suppresses j. -> kept indices.
+    """
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep: List[int] = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(int(i))
+        suppressed |= over[i]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_thr: float,
+    *,
+    classes: Optional[np.ndarray] = None,
+    inclusive: bool = False,
+    center_overlap: bool = False,
+) -> np.ndarray:
+    """
+    Greedy NMS -> kept indices, highest score first (ties keep input order).
+
+    A box is suppressed by a kept one when IoU > `iou_thr` (>= with
+    `inclusive`), or, with `center_overlap`, when either box's center lies
+    inside the other. With `classes`, only boxes of the same class compete.
+    """
+    n = len(boxes)
+    if n == 0:
+        return np.zeros((0,), dtype=np.int64)
+    ious = iou_matrix(boxes, boxes)
+    over = ious >= iou_thr if inclusive else ious > iou_thr
+    if center_overlap:
+        inside = points_in_boxes(centers(boxes), boxes)  # [p, n]: center of p in box n
+        over |= inside | inside.T
+    if classes is not None:
+        cls = np.asarray(classes)
+        over &= cls[:, None] == cls[None, :]
+
+    return greedy_suppress(scores, over)
+
+
+def nms_dets(
+    dets: Sequence[DetectionDict],
+    iou_thr: float,
+    *,
+    class_aware: bool = False,
+    inclusive: bool = False,
+    center_overlap: bool = False,
+) -> List[DetectionDict]:
+    """`nms` over detection dicts (missing conf counts as 0; dets without a box are dropped)."""
+    dets = [d for d in dets if d.get("xyxy")]
+    if not dets:
+        return []
+    keep = nms(
+        as_boxes(dets),
+        np.asarray([float(d.get("conf", 0.0)) for d in dets]),
+        iou_thr,
+        classes=np.asarray([str(d.get("name")) for d in dets]) if class_aware else None,
+        inclusive=inclusive,
+        center_overlap=center_overlap,
+    )
+    return [dets[i] for i in keep]
+
+
+def sort_top_to_bottom(dets: Sequence[DetectionDict]) -> List[DetectionDict]:
+    """Stable sort by box top (y1)."""
+    if not dets:
+        return []
+    order = np.argsort(as_boxes(dets)[:, 1], kind="stable")
+    return [dets[i] for i in order]
+
+
+def group_by_rows(
+    rows: Sequence[DetectionDict], items: Sequence[DetectionDict]
+) -> List[List[DetectionDict]]:
+    """For each row, the items whose center lies inside it (borders included), in item order."""
+    if not rows:
+        return []
+    if not items:
+        return [[] for _ in rows]
+    inside = points_in_boxes(centers(as_boxes(items)), as_boxes(rows))  # (items, rows)
+    return [[items[i] for i in np.flatnonzero(inside[:, r])] for r in range(len(rows))]
+
+
+def dets_from_arrays(
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    names: Mapping[int, str],
+    *,
+    conf_min: float = 0.0,
+) -> List[DetectionDict]:
+    """
+    Detector output arrays -> detection dicts, dropping conf < `conf_min`.
+    `idx` is the row in the input arrays.
+    """
+    conf = np.asarray(conf).reshape(-1)
+    keep = np.flatnonzero(conf >= conf_min)
+    if keep.size == 0:
+        return []
+    boxes = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)[keep].tolist()
+    confs = conf[keep].astype(np.float64).tolist()
+    classes = np.asarray(cls).reshape(-1)[keep].astype(int).tolist()
+    out: List[DetectionDict] = []
+    for i, box, c, k in zip(keep.tolist(), boxes, confs, classes):
+        out.append({"idx": i, "name": names.get(k, str(k)), "conf": c, "xyxy": tuple(box)})
+    return out
+
+
+def name_index(names: Any) -> Dict[int, str]:
+    """Ultralytics `result.names` (dict or list) -> {class id: name}."""
+    return names if isinstance(names, dict) else {i: n for i, n in enumerate(names)}
@@ -5,6 +5,7 @@ import io
 import json
 import fnmatch
 import os
+from collections import OrderedDict
 from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Set
@@ -314,6 +315,12 @@ except Exception:  # OpenCV may be unavailable in some environments
 
 _tmpl_cache: Dict[str, Any] = {}
 _template_b64_cache: Dict[str, str] = {}
+# Remote matchers keyed by the record pool they cover; each one is a single
+# server-side template bank, so repeat queries only send the portrait.
+_remote_pool_matchers: "OrderedDict[Tuple[str, ...], _RemoteTMB]" = OrderedDict()
+_REMOTE_POOL_MATCHERS_MAX = 32
+# Largest pool banked as a whole; bigger (e.g. unhinted) pools bank only the CV candidates
+_REMOTE_POOL_BANK_MAX = _CV_TEMPLATE_MAX
 
 ImageEntry = Tuple[Optional[str], Optional[int], Tuple[str, ...]]
 
@@ -590,6 +597,40 @@ def _template_spec_for_remote(
     return payload
 
 
+def _remote_matcher_for_pool(pool: Sequence[EventRecord]) -> Optional[_RemoteTMB]:
+    key = tuple(rec.key for rec in pool)
+    matcher = _remote_pool_matchers.get(key)
+    if matcher is not None:
+        _remote_pool_matchers.move_to_end(key)
+        return matcher
+
+    templates: List[Dict[str, Any]] = []
+    for rec in pool:
+        # Send all variants for this record
+        variant_paths = list(rec.image_variants) if rec.image_variants else None
+        spec = _template_spec_for_remote(rec, variant_paths)
+        if spec:  # Only include templates with valid image data
+            templates.append(spec)
+    if not templates:
+        return None
+
+    matcher = _RemoteTMB(templates, min_confidence=0.0, options=_TM_OPTIONS)
+    matcher.mode = "generic"
+    _remote_pool_matchers[key] = matcher
+    while len(_remote_pool_matchers) > _REMOTE_POOL_MATCHERS_MAX:
+        _remote_pool_matchers.popitem(last=False)
+    return matcher
+
+
+def _remote_bank_records(
+    pool: Sequence[EventRecord], candidates: Sequence[EventRecord]
+) -> Sequence[EventRecord]:
+    """Records to bank for a query: the whole pool if small, else just the CV candidates."""
+    if len(pool) <= _REMOTE_POOL_BANK_MAX:
+        return pool
+    return candidates
+
+
 def _title_similarity(q_title_norm: str, rec: EventRecord) -> float:
     if not q_title_norm:
         return 0.0
@@ -1666,16 +1707,16 @@ def retrieve_best(
         and q.portrait_image is not None
     ):
         try:
-            templates: List[Dict[str, Any]] = []
-            for rec in cv_candidate_records:
-                # Send all variants for this record
-                variant_paths = list(rec.image_variants) if rec.image_variants else None
-                spec = _template_spec_for_remote(rec, variant_paths)
-                if spec:  # Only include templates with valid image data
-                    templates.append(spec)
+            # Bank a small hint-filtered pool once and select CV candidates within it;
+            # a large pool (no hints) would serialize the catalog, so bank the candidates.
+            remote = _remote_matcher_for_pool(
+                _remote_bank_records(pool, cv_candidate_records)
+            )
+            template_ids = {t.id for t in remote.templates} if remote is not None else set()
+            candidate_ids = [rec.key for rec in cv_candidate_records if rec.key in template_ids]
 
             # Only call remote if we have valid templates with images
-            if templates:
+            if remote is not None and candidate_ids:
                 logger_uma.debug(
                     "[event_processor] OCR Title: %s, Type Hint: %s, Name Hint: %s, Rarity Hint: %s, Attribute Hint: %s, Chain Step Hint: %s, Preferred Trainee Name: %s",
                     q.ocr_title,
@@ -1687,9 +1728,7 @@ def retrieve_best(
                     q.preferred_trainee_name,
                 )
 
-                remote = _RemoteTMB(templates, min_confidence=0.0, options=_TM_OPTIONS)
-                remote.mode = "generic"
-                matches = remote.match(q.portrait_image)
+                matches = remote.match(q.portrait_image, candidates=candidate_ids)
                 for match in matches:
                     remote_cv[str(match.name)] = float(match.score)
                 logger_uma.debug(
@@ -0,0 +1,437 @@
+# core/utils/frame_codec.py
+"""
+Binary frame transport shared by the remote perception clients and
+`server/main_inference.py`.
+
+A binary request is an `application/octet-stream` body laid out as:
+
+    [JSON params][frame 0][frame 1]...
+
+with the layout described by headers:
+
+    X-Uma-Params-Length : byte length of the JSON params prefix
+    X-Frame-Format      : 'bgr' | 'rgba' (raw pixels) or 'png' | 'jpeg' (encoded)
+    X-Frame-Shapes      : 'h,w,c;h,w,c' (one entry per frame)
+    X-Frame-Lengths     : 'n0,n1' byte length of each frame
+
+This skips the base64 (+33%) + JSON string + PIL decode round trip that the
+legacy `{"img": "<b64 png>"}` payloads pay on every call.
+
+Checksum-first uploads: a client may replace the pixel data with
+`X-Frame-Refs: <sha256>,...` for frames it uploaded before (tagged with
+`X-Frame-Digests`). The server answers from its recent-frame store, or with
+428 + `X-Frame-Missing` when it no longer holds them and the client re-uploads.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# OpenCV is optional for remote-only clients; PIL covers the encoded formats without it.
+try:  # pragma: no cover - exercised indirectly
+    import cv2 as _cv2
+except ImportError:  # pragma: no cover - fallback path for remote clients without OpenCV
+    _cv2 = None  # type: ignore[assignment]
+import numpy as np
+import requests
+from PIL import Image
+
+FRAME_CONTENT_TYPE = "application/octet-stream"
+
+HEADER_PARAMS_LENGTH = "X-Uma-Params-Length"
+HEADER_FORMAT = "X-Frame-Format"
+HEADER_SHAPES = "X-Frame-Shapes"
+HEADER_LENGTHS = "X-Frame-Lengths"
+# Set by servers that understand binary bodies, on every response (errors included)
+HEADER_SERVER_SUPPORT = "X-Uma-Frames"
+HEADER_FRAME_REFS = "X-Frame-Refs"
+HEADER_FRAME_DIGESTS = "X-Frame-Digests"
+HEADER_FRAME_MISSING = "X-Frame-Missing"
+# Set by servers that keep recently uploaded frames and accept X-Frame-Refs
+HEADER_REFS_SUPPORT = "X-Uma-Frame-Refs"
+# Server no longer holds a referenced frame: send the pixels
+NEED_BODY_STATUS = 428
+
+# Client-side codec name -> wire format
+FRAME_CODECS: Dict[str, str] = {
+    "raw": "bgr",
+    "png": "png",
+    "jpeg": "jpeg",
+}
+RAW_FORMATS = {"bgr": 3, "rgba": 4}
+ENCODED_FORMATS = {"png", "jpeg"}
+# Decoded pixels differ from the client's, so digests never match (no refs)
+LOSSY_FORMATS = {"jpeg"}
+
+# Status codes an older JSON-only server answers with when it receives a binary body.
+BINARY_UNSUPPORTED_STATUS = {400, 415, 422}
+# Server worker pool full (429) or shutting down (503); both carry Retry-After.
+BUSY_STATUS = {429, 503}
+
+_PNG_LEVEL = 1
+_JPEG_QUALITY = 90
+
+
+def ensure_bgr3(img: np.ndarray) -> np.ndarray:
+    """Normalize GRAY/BGRA arrays to contiguous 3-channel uint8 BGR."""
+    if img.ndim == 2:
+        img = np.stack([img, img, img], axis=-1)
+    elif img.shape[2] == 4:
+        img = img[:, :, :3]
+    if img.dtype != np.uint8:
+        img = img.astype(np.uint8)
+    return np.ascontiguousarray(img)
+
+
+def frame_sha256(img: np.ndarray) -> str:
+    """SHA256 of the BGR pixel bytes (same as the server's frame digest for lossless codecs)."""
+    return hashlib.sha256(ensure_bgr3(img).data).hexdigest()
+
+
+def _imencode(bgr: np.ndarray, fmt: str) -> bytes:
+    if _cv2 is not None:
+        if fmt == "png":
+            ok, buf = _cv2.imencode(".png", bgr, [int(_cv2.IMWRITE_PNG_COMPRESSION), _PNG_LEVEL])
+        else:
+            ok, buf = _cv2.imencode(".jpg", bgr, [int(_cv2.IMWRITE_JPEG_QUALITY), _JPEG_QUALITY])
+        if not ok:
+            raise ValueError("Failed to encode frame")
+        return buf.tobytes()
+    out = io.BytesIO()
+    pil = Image.fromarray(bgr[:, :, ::-1])
+    if fmt == "png":
+        pil.save(out, format="PNG", compress_level=_PNG_LEVEL)
+    else:
+        pil.save(out, format="JPEG", quality=_JPEG_QUALITY)
+    return out.getvalue()
+
+
+def _imdecode(buf: bytes) -> Optional[np.ndarray]:
+    if _cv2 is not None:
+        return _cv2.imdecode(np.frombuffer(buf, dtype=np.uint8), _cv2.IMREAD_COLOR)
+    try:
+        with Image.open(io.BytesIO(buf)) as pil:
+            return np.ascontiguousarray(np.array(pil.convert("RGB"))[:, :, ::-1])
+    except Exception:
+        return None
+
+
+def encode_frame(bgr: np.ndarray, codec: str) -> bytes:
+    """Encode a BGR frame for the wire using one of FRAME_CODECS."""
+    fmt = FRAME_CODECS.get(codec)
+    if fmt is None:
+        raise ValueError(f"Unsupported frame codec: {codec}")
+    bgr = ensure_bgr3(bgr)
+    if fmt == "bgr":
+        return bgr.tobytes()
+    return _imencode(bgr, fmt)
+
+
+def decode_frame(buf: bytes, fmt: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Decode one wire frame back to a 3-channel BGR uint8 array."""
+    if fmt in RAW_FORMATS:
+        channels = RAW_FORMATS[fmt]
+        if len(shape) != 3 or shape[2] != channels:
+            raise ValueError(f"Shape {shape} does not match format '{fmt}'")
+        expected = int(shape[0]) * int(shape[1]) * channels
+        if len(buf) != expected:
+            raise ValueError(f"Frame has {len(buf)} bytes, expected {expected}")
+        arr = np.frombuffer(buf, dtype=np.uint8).reshape(shape)
+        if fmt == "rgba":
+            return np.ascontiguousarray(arr[:, :, 2::-1])
+        # frombuffer is read-only; OpenCV/Ultralytics consumers expect a writable array
+        return arr.copy()
+    if fmt in ENCODED_FORMATS:
+        arr = _imdecode(buf)
+        if arr is None:
+            raise ValueError(f"Could not decode '{fmt}' frame")
+        return arr
+    raise ValueError(f"Unsupported frame format: {fmt}")
+
+
+def pack_frames(
+    params: Mapping[str, Any],
+    imgs: Sequence[np.ndarray],
+    *,
+    codec: str = "png",
+    digests: Optional[Sequence[str]] = None,
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Build (body, headers) for a binary request carrying `params` and `imgs`.
+    `digests` (one per frame) asks the server to remember the frames for later refs.
+    """
+    fmt = FRAME_CODECS.get(codec)
+    if fmt is None:
+        raise ValueError(f"Unsupported frame codec: {codec}")
+    head = json.dumps(dict(params), separators=(",", ":")).encode("utf-8")
+    shapes: List[str] = []
+    chunks: List[bytes] = [head]
+    lengths: List[str] = []
+    for img in imgs:
+        bgr = ensure_bgr3(img)
+        data = encode_frame(bgr, codec)
+        shapes.append(",".join(str(int(x)) for x in bgr.shape))
+        lengths.append(str(len(data)))
+        chunks.append(data)
+    headers = {
+        "Content-Type": FRAME_CONTENT_TYPE,
+        HEADER_PARAMS_LENGTH: str(len(head)),
+        HEADER_FORMAT: fmt,
+        HEADER_SHAPES: ";".join(shapes),
+        HEADER_LENGTHS: ",".join(lengths),
+    }
+    if digests:
+        headers[HEADER_FRAME_DIGESTS] = ",".join(digests)
+    return b"".join(chunks), headers
+
+
+def pack_refs(params: Mapping[str, Any], digests: Sequence[str]) -> Tuple[bytes, Dict[str, str]]:
+    """Build (body, headers) for a request whose frames are referenced by digest only."""
+    head = json.dumps(dict(params), separators=(",", ":")).encode("utf-8")
+    headers = {
+        "Content-Type": FRAME_CONTENT_TYPE,
+        HEADER_PARAMS_LENGTH: str(len(head)),
+        HEADER_FRAME_REFS: ",".join(digests),
+    }
+    return head, headers
+
+
+def frame_refs(headers: Mapping[str, str]) -> Optional[List[str]]:
+    raw = _header(headers, HEADER_FRAME_REFS)
+    return None if raw is None else [d.strip() for d in raw.split(",") if d.strip()]
+
+
+def frame_digests(headers: Mapping[str, str]) -> Optional[List[str]]:
+    raw = _header(headers, HEADER_FRAME_DIGESTS)
+    return None if raw is None else [d.strip() for d in raw.split(",") if d.strip()]
+
+
+def frames_lossy(headers: Mapping[str, str]) -> bool:
+    return (_header(headers, HEADER_FORMAT) or "").strip().lower() in LOSSY_FORMATS
+
+
+def is_frames_request(headers: Mapping[str, str]) -> bool:
+    ctype = _header(headers, "content-type") or ""
+    return ctype.split(";", 1)[0].strip().lower() == FRAME_CONTENT_TYPE
+
+
+def unpack_frames(
+    body: bytes, headers: Mapping[str, str]
+) -> Tuple[Dict[str, Any], List[np.ndarray]]:
+    """Inverse of `pack_frames`. Raises ValueError on malformed input."""
+    try:
+        head_len = int(_header(headers, HEADER_PARAMS_LENGTH) or 0)
+    except ValueError as e:
+        raise ValueError(f"Invalid {HEADER_PARAMS_LENGTH}") from e
+    if head_len < 0 or head_len > len(body):
+        raise ValueError(f"Invalid {HEADER_PARAMS_LENGTH}")
+    params: Dict[str, Any] = {}
+    if head_len:
+        try:
+            params = json.loads(body[:head_len].decode("utf-8"))
+        except Exception as e:
+            raise ValueError(f"Invalid params JSON: {e}") from e
+        if not isinstance(params, dict):
+            raise ValueError("Params must be a JSON object")
+
+    fmt = (_header(headers, HEADER_FORMAT) or "").strip().lower()
+    shapes_raw = (_header(headers, HEADER_SHAPES) or "").strip()
+    lengths_raw = (_header(headers, HEADER_LENGTHS) or "").strip()
+    try:
+        shapes = [
+            tuple(int(v) for v in s.split(",")) for s in shapes_raw.split(";") if s
+        ]
+        lengths = [int(v) for v in lengths_raw.split(",") if v]
+    except ValueError as e:
+        raise ValueError("Invalid frame shape/length headers") from e
+    if len(shapes) != len(lengths):
+        raise ValueError("Frame shape/length headers disagree")
+    if head_len + sum(lengths) != len(body):
+        raise ValueError("Body size does not match frame lengths")
+
+    frames: List[np.ndarray] = []
+    offset = head_len
+    for shape, n in zip(shapes, lengths):
+        frames.append(decode_frame(body[offset : offset + n], fmt, shape))
+        offset += n
+    return params, frames
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    # Starlette headers are case-insensitive already; plain dicts are not.
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def _busy_wait_s(r: requests.Response) -> Optional[float]:
+    """Seconds to back off for a 429/503 carrying Retry-After, else None."""
+    if r.status_code not in BUSY_STATUS:
+        return None
+    raw = r.headers.get("Retry-After")
+    if raw is None:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return None
+
+
+def _b64_png(bgr: np.ndarray) -> str:
+    return base64.b64encode(_imencode(ensure_bgr3(bgr), "png")).decode("ascii")
+
+
+class FrameTransport:
+    """
+    Posts frames to the inference server, preferring binary bodies and falling
+    back to the legacy base64-PNG JSON payload when the server does not accept
+    them (older servers answer 422 without the X-Uma-Frames header). The
+    outcome is remembered per transport so the fallback is only probed once.
+
+    When a server worker pool is saturated it answers 429/503 with Retry-After;
+    those calls are retried up to `busy_retries` times, waiting at most
+    `busy_max_wait_s` each time.
+
+    With `conditional=True`, frames this transport already uploaded are sent
+    as digests only; new frames still go out in the first request (tagged so
+    the server keeps them), so only a server-side eviction costs a round trip.
+    Lossy codecs (jpeg) always upload: the server keeps frames only under the
+    digest of the pixels it decoded.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        *,
+        codec: str = "png",
+        busy_retries: int = 2,
+        busy_max_wait_s: float = 2.0,
+        conditional: bool = False,
+        recent_refs: int = 256,
+    ) -> None:
+        self.session = session
+        self.codec = (codec or "json").strip().lower()
+        # None = not negotiated yet; False = server only speaks JSON
+        self.binary_ok: Optional[bool] = None if self.codec in FRAME_CODECS else False
+        self.busy_retries = max(0, int(busy_retries))
+        self.busy_max_wait_s = float(busy_max_wait_s)
+        self.conditional = bool(conditional)
+        # None = not negotiated yet; False = server ignores X-Frame-Refs
+        self.refs_ok: Optional[bool] = None
+        self._recent_refs = max(1, int(recent_refs))
+        self._sent: "OrderedDict[str, None]" = OrderedDict()
+        self._stats: Dict[str, int] = {"ref_hits": 0, "ref_misses": 0, "uploads": 0}
+
+    def post(
+        self,
+        url: str,
+        params: Mapping[str, Any],
+        imgs: Sequence[np.ndarray],
+        *,
+        image_key: str = "img",
+        timeout: float = 30.0,
+    ) -> requests.Response:
+        """
+        `image_key` names where the JSON fallback puts the base64 image(s):
+        'img' for one image, 'imgs' for a list, or a dotted path ('region.img').
+        """
+        attempt = 0
+        while True:
+            r = self._post_once(url, params, imgs, image_key=image_key, timeout=timeout)
+            wait_s = _busy_wait_s(r)
+            if wait_s is None or attempt >= self.busy_retries:
+                return r
+            attempt += 1
+            time.sleep(min(wait_s, self.busy_max_wait_s))
+
+    def _post_once(
+        self,
+        url: str,
+        params: Mapping[str, Any],
+        imgs: Sequence[np.ndarray],
+        *,
+        image_key: str,
+        timeout: float,
+    ) -> requests.Response:
+        if self.binary_ok is not False:
+            digests: Optional[List[str]] = None
+            if (
+                self.conditional
+                and self.refs_ok is not False
+                and imgs
+                and FRAME_CODECS[self.codec] not in LOSSY_FORMATS
+            ):
+                imgs = [ensure_bgr3(im) for im in imgs]
+                digests = [frame_sha256(im) for im in imgs]
+                if all(d in self._sent for d in digests):
+                    r_ref = self._post_refs(url, params, digests, timeout=timeout)
+                    if r_ref is not None:
+                        return r_ref
+            body, headers = pack_frames(params, imgs, codec=self.codec, digests=digests)
+            r = self.session.post(url, data=body, headers=headers, timeout=timeout)
+            if (
+                self.binary_ok
+                or r.status_code not in BINARY_UNSUPPORTED_STATUS
+                or r.headers.get(HEADER_SERVER_SUPPORT)
+            ):
+                if r.ok:
+                    self.binary_ok = True
+                    if digests and r.headers.get(HEADER_REFS_SUPPORT):
+                        self._stats["uploads"] += 1
+                        self._remember(digests)
+                return r
+            self.binary_ok = False
+
+        payload: Dict[str, Any] = json.loads(json.dumps(dict(params)))
+        encoded: Any
+        if image_key == "imgs":
+            encoded = [_b64_png(im) for im in imgs]
+        else:
+            encoded = _b64_png(imgs[0])
+        target = payload
+        *parents, leaf = image_key.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = encoded
+        return self.session.post(url, json=payload, timeout=timeout)
+
+    def _post_refs(
+        self,
+        url: str,
+        params: Mapping[str, Any],
+        digests: List[str],
+        *,
+        timeout: float,
+    ) -> Optional[requests.Response]:
+        """Send digests instead of pixels; None means the caller should upload."""
+        body, headers = pack_refs(params, digests)
+        r = self.session.post(url, data=body, headers=headers, timeout=timeout)
+        if not r.headers.get(HEADER_REFS_SUPPORT):
+            # Server ignored the refs (and likely failed for lack of frames)
+            self.refs_ok = False
+            return None
+        if r.status_code == NEED_BODY_STATUS:
+            self._stats["ref_misses"] += 1
+            for d in digests:
+                self._sent.pop(d, None)
+            return None
+        self.refs_ok = True
+        self._stats["ref_hits"] += 1
+        self._remember(digests)
+        return r
+
+    def _remember(self, digests: Sequence[str]) -> None:
+        for d in digests:
+            self._sent[d] = None
+            self._sent.move_to_end(d)
+        while len(self._sent) > self._recent_refs:
+            self._sent.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
@@ -0,0 +1,254 @@
+# core/utils/frame_gate.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import cv2
+import numpy as np
+from PIL import Image
+
+T = TypeVar("T")
+
+# Fingerprint size and match tolerances shared by the gate, the detection
+# cache and the settle tracker. At 128x72 one thumbnail pixel covers 15x15 px
+# of a 1080p frame, so a 20 px icon still moves some pixel by ~40% of its
+# contrast; `pixel_tol` catches that, and the colour thumbnail catches a
+# button going from green to grey at about the same brightness.
+FP_SIZE: Tuple[int, int] = (128, 72)
+MEAN_TOL = 1.5
+BLOCK_TOL = 4.0
+BITS_TOL = 1
+PIXEL_TOL = 16.0
+
+Fingerprint = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def frame_fingerprint(
+    img: Image.Image, *, size: Tuple[int, int] = FP_SIZE, grid: int = 8
+) -> Fingerprint:
+    """
+    -> (BGR thumbnail, block means, block hash bits) of a downsample.
+
+    The thumbnail catches global changes (fades, screen swaps) and, pixel by
+    pixel, small ones (an icon appearing, a button changing colour); the
+    grayscale block grid catches local changes that barely move the global
+    mean.
+    """
+    rgb = np.asarray(img.convert("RGB").resize(size, Image.BILINEAR), dtype=np.float32)
+    return _fingerprint(rgb[..., ::-1], grid)
+
+
+def frame_fingerprint_bgr(
+    bgr: np.ndarray, *, size: Tuple[int, int] = FP_SIZE, grid: int = 8
+) -> Fingerprint:
+    """`frame_fingerprint` for a BGR (or BGRA / gray) array, downsampled with cv2."""
+    h, w = bgr.shape[:2]
+    # Decimate big frames before the area resize; the thumbnail is small anyway
+    step = max(1, min(h // (size[1] * 4), w // (size[0] * 4)))
+    small = bgr[::step, ::step]
+    if small.ndim == 2:
+        small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+    elif small.shape[2] == 4:
+        small = cv2.cvtColor(small, cv2.COLOR_BGRA2BGR)
+    thumb = cv2.resize(small, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    return _fingerprint(thumb, grid)
+
+
+def _fingerprint(thumb: np.ndarray, grid: int) -> Fingerprint:
+    gray = thumb @ np.asarray([0.114, 0.587, 0.299], dtype=np.float32)
+    h, w = gray.shape
+    bh, bw = h // grid, w // grid
+    blocks = gray[: bh * grid, : bw * grid].reshape(grid, bh, grid, bw).swapaxes(1, 2)
+    means = blocks.mean(axis=(2, 3))
+    # Small margin so flat blocks do not flip bits on capture noise
+    bits = blocks > means[..., None, None] + 2.0
+    return thumb, means, bits
+
+
+def fingerprints_match(
+    a: Fingerprint,
+    b: Fingerprint,
+    *,
+    mean_tol: float = MEAN_TOL,
+    block_tol: float = BLOCK_TOL,
+    bits_tol: int = BITS_TOL,
+    pixel_tol: float = PIXEL_TOL,
+) -> bool:
+    """True when two `frame_fingerprint` results show no visible change."""
+    thumb_a, means_a, bits_a = a
+    thumb_b, means_b, bits_b = b
+    if thumb_a.shape != thumb_b.shape:
+        return False
+    diff = np.abs(thumb_a - thumb_b)
+    if float(diff.mean()) > mean_tol or float(diff.max()) > pixel_tol:
+        return False
+    if float(np.abs(means_a - means_b).max()) > block_tol:
+        return False
+    flipped = (bits_a != bits_b).sum(axis=(2, 3))
+    return int(flipped.max()) <= bits_tol
+
+
+class FrameChangeGate(Generic[T]):
+    """
+    Remember the result computed for the last frame and hand it back while the
+    screen has not visibly changed.
+
+    A frame counts as unchanged when the thumbnails differ by at most
+    `mean_tol` levels on average and `pixel_tol` on any pixel and channel, no
+    block's mean moved more than `block_tol`, and no block's average-hash
+    flipped more than `bits_tol` bits.
+    Results are never reused past `max_age_s`, nor after an input happened
+    (`input_ts`), since the UI may still be reacting to it.
+    """
+
+    def __init__(
+        self,
+        *,
+        mean_tol: float = MEAN_TOL,
+        block_tol: float = BLOCK_TOL,
+        bits_tol: int = BITS_TOL,
+        pixel_tol: float = PIXEL_TOL,
+        max_age_s: float = 2.0,
+    ) -> None:
+        self.mean_tol = float(mean_tol)
+        self.block_tol = float(block_tol)
+        self.bits_tol = int(bits_tol)
+        self.pixel_tol = float(pixel_tol)
+        self.max_age_s = float(max_age_s)
+        self._ref: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._ref_ts = 0.0
+        self._value: Optional[T] = None
+        self._pending: Optional[Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], float]] = None
+        self._stats: Dict[str, int] = {"reused": 0, "computed": 0}
+
+    def lookup(self, img: Image.Image, *, input_ts: float = 0.0) -> Optional[T]:
+        """Cached result if `img` matches the last computed frame, else None (then call `update`)."""
+        now = time.monotonic()
+        fp = frame_fingerprint(img)
+        self._pending = (fp, now)
+        if self._ref is None or self._value is None:
+            return None
+        if now - self._ref_ts > self.max_age_s or input_ts >= self._ref_ts:
+            return None
+        if not self._same(self._ref, fp):
+            return None
+        self._stats["reused"] += 1
+        return self._value
+
+    def update(self, value: T) -> None:
+        """Store the result computed for the frame passed to the last `lookup`."""
+        if self._pending is None:
+            return
+        self._ref, self._ref_ts = self._pending
+        self._pending = None
+        self._value = value
+        self._stats["computed"] += 1
+
+    def reset(self) -> None:
+        self._ref = None
+        self._value = None
+        self._pending = None
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    def _same(self, a, b) -> bool:
+        return fingerprints_match(
+            a,
+            b,
+            mean_tol=self.mean_tol,
+            block_tol=self.block_tol,
+            bits_tol=self.bits_tol,
+            pixel_tol=self.pixel_tol,
+        )
+
+
+class FrameResultCache(Generic[T]):
+    """
+    Bounded cache of results keyed by (params, frame): `get` returns the
+    value stored for the same `params` and a frame that matches `fp` within
+    the same tolerances as `FrameChangeGate` (`bits_tol` is the per-block
+    Hamming distance). Entries expire after `ttl_s`; past `max_entries` the
+    least recently used go first.
+
+    Unlike the gate it keeps several frames (screens the bot goes back and
+    forth between). Entries stored before `input_ts` (the last click / scroll /
+    key) are dropped, since the UI may still be reacting to that input.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 32,
+        ttl_s: float = 2.0,
+        mean_tol: float = MEAN_TOL,
+        block_tol: float = BLOCK_TOL,
+        bits_tol: int = BITS_TOL,
+        pixel_tol: float = PIXEL_TOL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.mean_tol = float(mean_tol)
+        self.block_tol = float(block_tol)
+        self.bits_tol = int(bits_tol)
+        self.pixel_tol = float(pixel_tol)
+        self._clock = clock
+        # id -> (params, fingerprint, stored_at, value), least recently used first
+        self._entries: "OrderedDict[int, Tuple[Hashable, Any, float, T]]" = OrderedDict()
+        self._next_id = 0
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        # The inference server calls one engine from several request threads
+        self._lock = threading.Lock()
+
+    def get(self, fp: Fingerprint, params: Hashable, *, input_ts: float = 0.0) -> Optional[T]:
+        with self._lock:
+            self._expire(self._clock(), input_ts)
+            for key in reversed(self._entries):
+                e_params, e_fp, _, value = self._entries[key]
+                if e_params == params and fingerprints_match(
+                    e_fp,
+                    fp,
+                    mean_tol=self.mean_tol,
+                    block_tol=self.block_tol,
+                    bits_tol=self.bits_tol,
+                    pixel_tol=self.pixel_tol,
+                ):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+            self._stats["misses"] += 1
+            return None
+
+    def put(
+        self, fp: Fingerprint, params: Hashable, value: T, *, seen_at: Optional[float] = None
+    ) -> None:
+        """Store `value`; `seen_at` (default now) is when the frame was looked up."""
+        with self._lock:
+            ts = self._clock() if seen_at is None else float(seen_at)
+            self._entries[self._next_id] = (params, fp, ts, value)
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float, input_ts: float) -> None:
+        stale = [
+            k
+            for k, (_, _, ts, _) in self._entries.items()
+            if now - ts > self.ttl_s or input_ts >= ts
+        ]
+        for k in stale:
+            del self._entries[k]
@@ -11,6 +11,7 @@ from core.controllers.base import IController
 from core.perception.yolo.interface import IDetector
 from core.settings import Settings
 from core.types import DetectionDict
+from core.utils.boxes import group_by_rows, sort_top_to_bottom
 from core.utils.logger import logger_uma
 from core.utils.pointer import smart_scroll_small
 from core.utils.waiter import Waiter
@@ -58,24 +59,14 @@ def by_name(
 def rows_top_to_bottom(
     dets: List[DetectionDict], name: str, *, conf_min: float = 0.0
 ) -> List[DetectionDict]:
-    rows = by_name(dets, name, conf_min=conf_min)
-    rows.sort(key=lambda d: d["xyxy"][1])
-    return rows
+    return sort_top_to_bottom(by_name(dets, name, conf_min=conf_min))
 
 
 def _detections_in_row(
     dets: List[DetectionDict], row: DetectionDict, name: str, *, conf_min: float = 0.0
 ) -> List[DetectionDict]:
     """Return detections with given name whose center lies inside the row bounds."""
-    rx1, ry1, rx2, ry2 = row["xyxy"]
-    matches: List[DetectionDict] = []
-    for d in by_name(dets, name, conf_min=conf_min):
-        x1, y1, x2, y2 = d["xyxy"]
-        cx = 0.5 * (x1 + x2)
-        cy = 0.5 * (y1 + y2)
-        if rx1 <= cx <= rx2 and ry1 <= cy <= ry2:
-            matches.append(d)
-    return matches
+    return group_by_rows([row], by_name(dets, name, conf_min=conf_min))[0]
 
 
 def random_center_tap(
@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 import time
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 from core.controllers.adb import ADBController
 from core.controllers.android import ScrcpyController  # type check only
 from core.controllers.bluestacks import BlueStacksController
 from core.controllers.base import IController
 from core.controllers.steam import SteamController
+from core.types import XYXY
 from core.utils.logger import logger_uma
 
 
@@ -139,3 +140,39 @@ def smart_scroll_small(
             time.sleep(max(0.0, delay_pc))
 
     time.sleep(settle_post_s)
+
+
+def scroll_list_page(
+    ctrl: IController,
+    rows: Sequence[XYXY],
+    *,
+    keep_rows: int = 1,
+) -> Optional[float]:
+    """
+    Calibrated page-down for a list whose visible rows are `rows` (boxes in
+    last-screenshot coords): one gesture through `IController.scroll_by`,
+    keeping `keep_rows` rows of overlap (scroll_by caps it at ~half the list).
+
+    Returns the measured content shift in pixels (about 0 once the list has
+    reached its end), or None when there were no rows or it could not be measured.
+    """
+    if not rows:
+        return None
+    x1 = min(r[0] for r in rows)
+    y1 = min(r[1] for r in rows)
+    x2 = max(r[2] for r in rows)
+    y2 = max(r[3] for r in rows)
+    heights = sorted(r[3] - r[1] for r in rows)
+    row_h = heights[len(heights) // 2]
+    page = max(row_h, (y2 - y1) - keep_rows * row_h)
+    left, top = ctrl.local_to_screen(int(x1), int(y1))
+    region = (left, top, max(1, int(x2 - x1)), max(1, int(y2 - y1)))
+    shift = ctrl.scroll_by(-page, region=region)
+    logger_uma.debug(
+        "[pointer] scroll_list_page asked=%.0f measured=%s gain=%.3f region=%s",
+        -page,
+        "n/a" if shift is None else f"{shift:.1f}",
+        ctrl.scroll_gain,
+        region,
+    )
+    return shift
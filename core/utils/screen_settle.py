@@ -0,0 +1,146 @@
+# core/utils/screen_settle.py
+"""
+Wait for the screen to stop moving instead of sleeping a fixed time.
+
+After a click or scroll the game animates (popups fade in, lists coast,
+tiles rise). `wait_for_settle` samples frames through the controller and
+returns as soon as `stable_frames` consecutive frames show no visible change
+(same fingerprint test as `FrameChangeGate`), or when the timeout runs out.
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from core.settings import Settings
+from core.utils.frame_gate import (
+    BITS_TOL,
+    BLOCK_TOL,
+    MEAN_TOL,
+    PIXEL_TOL,
+    fingerprints_match,
+    frame_fingerprint,
+)
+
+if TYPE_CHECKING:
+    from core.controllers.base import IController, RegionXYWH
+
+
+class SettleTracker:
+    """Counts how many consecutive frames matched the one before them."""
+
+    def __init__(
+        self,
+        stable_frames: int = 2,
+        *,
+        mean_tol: float = MEAN_TOL,
+        block_tol: float = BLOCK_TOL,
+        bits_tol: int = BITS_TOL,
+        pixel_tol: float = PIXEL_TOL,
+    ) -> None:
+        self.stable_frames = max(1, int(stable_frames))
+        self.mean_tol = float(mean_tol)
+        self.block_tol = float(block_tol)
+        self.bits_tol = int(bits_tol)
+        self.pixel_tol = float(pixel_tol)
+        self.frames = 0
+        self.streak = 0
+        self._prev: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.streak >= self.stable_frames
+
+    def feed(self, img: Image.Image) -> bool:
+        """Add a frame; True once the last `stable_frames` frames all matched their predecessor."""
+        fp = frame_fingerprint(img)
+        if self._prev is not None and fingerprints_match(
+            self._prev,
+            fp,
+            mean_tol=self.mean_tol,
+            block_tol=self.block_tol,
+            bits_tol=self.bits_tol,
+            pixel_tol=self.pixel_tol,
+        ):
+            self.streak += 1
+        else:
+            self.streak = 0
+        self._prev = fp
+        self.frames += 1
+        return self.settled
+
+
+def _next_frame(ctrl: "IController", region: Optional["RegionXYWH"], timeout_s: float) -> Image.Image:
+    # The background grabber already captures continuously; wait for its next frame
+    if region is None:
+        frame_after = getattr(ctrl, "frame_after", None)
+        if frame_after is not None:
+            img = frame_after(time.monotonic(), timeout=max(0.05, timeout_s))
+            if img is not None:
+                return img
+    return ctrl.screenshot(region=region)
+
+
+def wait_for_settle(
+    ctrl: "IController",
+    *,
+    region: Optional["RegionXYWH"] = None,
+    stable_frames: int = 2,
+    timeout_s: float = 1.5,
+    interval_s: float = 0.05,
+    min_wait_s: float = 0.0,
+) -> bool:
+    """
+    Block until `region` (absolute screen coords; default: the capture area)
+    has been still for `stable_frames` consecutive frames.
+
+    `min_wait_s` is slept first so the UI has time to start reacting to the
+    input that preceded the call. Returns False if the screen was still
+    moving when `timeout_s` (measured from the call, min wait included) ran out.
+    A sample that would not finish before the deadline (slow grabs, e.g. ADB
+    screencap) is not started; the rest of the timeout is slept instead.
+    """
+    deadline = time.monotonic() + max(0.0, float(timeout_s))
+    if min_wait_s > 0:
+        time.sleep(min(float(min_wait_s), max(0.0, deadline - time.monotonic())))
+    tracker = SettleTracker(stable_frames)
+    while True:
+        t0 = time.monotonic()
+        if tracker.feed(_next_frame(ctrl, region, deadline - t0)):
+            return True
+        grab_s = time.monotonic() - t0
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if remaining < float(interval_s) + grab_s:
+            time.sleep(remaining)
+            return False
+        time.sleep(float(interval_s))
+
+
+def settle_or_sleep(
+    ctrl: "IController",
+    seconds: float,
+    *,
+    region: Optional["RegionXYWH"] = None,
+    min_wait_s: float = 0.15,
+) -> bool:
+    """
+    Drop-in for a fixed `time.sleep(seconds)` after an input: waits at most
+    `seconds`, but returns as soon as the screen settles. With SCREEN_SETTLE
+    off it just sleeps. Returns whether the screen was seen to settle.
+    """
+    if not Settings.SCREEN_SETTLE:
+        time.sleep(seconds)
+        return False
+    return wait_for_settle(
+        ctrl,
+        region=region,
+        stable_frames=Settings.SCREEN_SETTLE_FRAMES,
+        timeout_s=seconds,
+        interval_s=Settings.SCREEN_SETTLE_INTERVAL_S,
+        min_wait_s=min(min_wait_s, seconds),
+    )
@@ -0,0 +1,148 @@
+# core/utils/scroll_calibration.py
+"""
+Measure how far a list actually moved after a scroll, and learn how many
+scroll units (drag pixels, wheel notches) it takes to move it a given
+number of content pixels.
+
+Sign convention matches `IController.scroll`: negative = scroll down, i.e.
+the content moved up in the image.
+"""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+def _gray(img: Image.Image) -> np.ndarray:
+    return np.asarray(img.convert("L"), dtype=np.float32)
+
+
+def measure_vertical_shift(
+    before: Image.Image,
+    after: Image.Image,
+    *,
+    expected: Optional[float] = None,
+    search: float = 0.5,
+) -> Tuple[float, float]:
+    """
+    -> (dy, response): vertical content shift from `before` to `after` by
+    phase correlation, and the peak strength (0..1; below ~0.05 there is no
+    reliable match, e.g. a blank or fully replaced view).
+
+    Lists repeat (same card every row), so the correlation has a peak per
+    row pitch. With `expected` given, the strongest peak within `search` x
+    |expected| (at least 16 px) of it wins, which also resolves the
+    wrap-around past half the height, unless a peak elsewhere is more than
+    twice as strong (the list stopped early, e.g. at its end).
+    """
+    a, b = _gray(before), _gray(after)
+    if a.shape != b.shape:
+        raise ValueError(f"frames differ in size: {a.shape} vs {b.shape}")
+    h, w = a.shape
+    window = cv2.createHanningWindow((w, h), cv2.CV_32F)
+    fa = np.fft.rfft2((a - a.mean()) * window)
+    fb = np.fft.rfft2((b - b.mean()) * window)
+    cross = fb * np.conj(fa)
+    cross /= np.maximum(np.abs(cross), 1e-9)
+    corr = np.fft.irfft2(cross, s=(h, w))
+    # Vertical scroll: keep the columns around dx = 0 (allow a pixel of drift)
+    profile = np.max(corr[:, [0, 1, w - 1]], axis=1)
+
+    shifts = np.arange(h)
+    shifts = np.where(shifts > h // 2, shifts - h, shifts).astype(np.float64)
+    if expected is not None:
+        tol = max(16.0, abs(float(expected)) * float(search))
+        # Each row index stands for dy, dy - h and dy + h; take the one nearest `expected`
+        cand = np.stack([shifts, shifts - h, shifts + h])
+        nearest = cand[np.argmin(np.abs(cand - expected), axis=0), np.arange(h)]
+        mask = np.abs(nearest - expected) <= tol
+        idx = int(np.argmax(np.where(mask, profile, -np.inf))) if mask.any() else -1
+        best = int(np.argmax(profile))
+        if idx < 0 or profile[idx] < 0.5 * profile[best]:
+            # Nothing convincing near the guess (list end, short move): trust the global peak
+            idx, dy = best, float(shifts[best])
+        else:
+            dy = float(nearest[idx])
+    else:
+        idx = int(np.argmax(profile))
+        dy = float(shifts[idx])
+    # Sub-pixel refinement on the 3-point neighbourhood
+    y0, y1, y2 = profile[idx - 1], profile[idx], profile[(idx + 1) % h]
+    denom = y0 - 2 * y1 + y2
+    if denom < 0:
+        dy += float(0.5 * (y0 - y2) / denom)
+    response = float(np.clip(y0 + y1 + y2, 0.0, 1.0))
+    return dy, response
+
+
+class ScrollCalibration:
+    """
+    Running estimate of content pixels moved per scroll unit.
+
+    `units_for(pixels)` converts a wanted displacement into the delta to pass
+    to `scroll()`; `observe()` folds a measured result back in (exponential
+    moving average). Readings that look like the list hit its end (moved much
+    less than asked) or that have a weak correlation peak are ignored.
+    """
+
+    def __init__(
+        self,
+        gain: float = 1.0,
+        *,
+        alpha: float = 0.35,
+        min_response: float = 0.05,
+        integer_units: bool = True,
+    ) -> None:
+        self.gain = float(gain)
+        self.alpha = float(alpha)
+        self.min_response = float(min_response)
+        self.integer_units = bool(integer_units)
+        self.samples = 0
+
+    def units_for(self, pixels: float) -> float:
+        units = float(pixels) / self.gain if self.gain > 0 else float(pixels)
+        if self.integer_units:
+            units = float(int(round(units)))
+            if units == 0 and pixels:
+                units = 1.0 if pixels > 0 else -1.0
+        return units
+
+    def observe(self, units: float, dy: float, response: float) -> bool:
+        """Update the gain from one scroll; True if the reading was used."""
+        if not units or response < self.min_response:
+            return False
+        gain = dy / units
+        if gain <= 0:
+            return False
+        # Far off the estimate: most likely the list ran out (or bounced); do not learn
+        # from it. The starting guess is looser than a learned gain.
+        limit = 4.0 if self.samples else 16.0
+        if not (1.0 / limit <= gain / self.gain <= limit):
+            return False
+        self.gain = gain if self.samples == 0 else (1 - self.alpha) * self.gain + self.alpha * gain
+        self.samples += 1
+        return True
+
+
+class ListEndCheck:
+    """
+    End-of-list test over measured scroll shifts: the list has ended only
+    after `confirm` consecutive shifts under `min_shift` px, so one bad
+    reading (near-identical rows, a frame that had not settled) does not cut
+    a scan short. Unmeasured shifts (None) reset the count.
+    """
+
+    def __init__(self, *, min_shift: float = 4.0, confirm: int = 2) -> None:
+        self.min_shift = float(min_shift)
+        self.confirm = max(1, int(confirm))
+        self._still = 0
+
+    def reached(self, shift: Optional[float]) -> bool:
+        if shift is not None and abs(shift) < self.min_shift:
+            self._still += 1
+        else:
+            self._still = 0
+        return self._still >= self.confirm
@@ -13,6 +13,7 @@ from core.perception.analyzers.hint import (
     build_support_geometries,
 )
 
+from core.utils.boxes import nms_dets
 from core.utils.logger import logger_uma
 from core.utils.analyzers import analyze_support_crop
 from core.utils.support_matching import (
@@ -76,6 +77,50 @@ def reindex_left_to_right(rows: List[Dict]) -> List[Dict]:
         r["tile_idx"] = j
     return rows_sorted
 
+def training_scan_rois(
+    parsed_objs: List[Dict], frame_w: int, frame_h: int, *, conf_min: float = 0.50
+) -> Optional[List[Tuple[int, int, int, int]]]:
+    """
+    Detection ROIs for the per-tile recaptures of the training scan, anchored
+    on a full-frame pass: the support column (cards plus their hint / spirit /
+    flame badges, which hang off the card edges) and the bottom panel
+    (ui_stats, failure pill, training buttons; the raised button sits higher).
+    None when an anchor is missing; the caller then keeps full frames.
+    """
+    btns = [d for d in parsed_objs if d["name"] == "training_button" and d.get("conf", 0.0) >= conf_min]
+    stats = [d for d in parsed_objs if d["name"] == "ui_stats" and d.get("conf", 0.0) >= conf_min]
+    supports = [d for d in parsed_objs if d["name"] in SUPPORT_NAMES and d.get("conf", 0.0) >= conf_min]
+    if not btns or not stats or not supports:
+        return None
+
+    def _clamp(x1, y1, x2, y2):
+        return (
+            max(0, int(x1)),
+            max(0, int(y1)),
+            min(int(frame_w), int(np.ceil(x2))),
+            min(int(frame_h), int(np.ceil(y2))),
+        )
+
+    st = max(stats, key=lambda d: float(d.get("conf", 0.0)))["xyxy"]
+    btn_h = float(np.median([d["xyxy"][3] - d["xyxy"][1] for d in btns]))
+    panel = _clamp(
+        min(st[0], min(d["xyxy"][0] for d in btns)) - 0.25 * btn_h,
+        st[1] - 0.6 * (st[3] - st[1]),
+        max(st[2], max(d["xyxy"][2] for d in btns)) + 0.25 * btn_h,
+        max(d["xyxy"][3] for d in btns) + 0.4 * btn_h,
+    )
+
+    card_w = float(np.median([d["xyxy"][2] - d["xyxy"][0] for d in supports]))
+    column = _clamp(
+        min(d["xyxy"][0] for d in supports) - 0.6 * card_w,
+        0,
+        max(d["xyxy"][2] for d in supports) + 0.6 * card_w,
+        st[3],
+    )
+    if column[2] - column[0] < 2 or panel[3] - panel[1] < 2:
+        return None
+    return [column, panel]
+
 def failure_pct(cur_img, cur_parsed, tile_xyxy, energy, ocr):
     ENERGY_TO_IGNORE_FAILURE = 45
     if energy >= ENERGY_TO_IGNORE_FAILURE:
@@ -211,69 +256,12 @@ def collect_supports_enriched(
     """
     frame_bgr = cv2.cvtColor(np.array(cur_img), cv2.COLOR_RGB2BGR)
 
-    # --- helpers: IoU + NMS ---
-    def _area(xyxy):
-        x1, y1, x2, y2 = [float(v) for v in xyxy]
-        return max(0.0, x2 - x1) * max(0.0, y2 - y1)
-
-    def _iou(a, b):
-        ax1, ay1, ax2, ay2 = [float(v) for v in a]
-        bx1, by1, bx2, by2 = [float(v) for v in b]
-        ix1, iy1 = max(ax1, bx1), max(ay1, by1)
-        ix2, iy2 = min(ax2, bx2), min(ay2, by2)
-        iw, ih = max(0.0, ix2 - ix1), max(0.0, iy2 - iy1)
-        inter = iw * ih
-        if inter <= 0.0:
-            return 0.0
-        ua = _area(a) + _area(b) - inter
-        return inter / ua if ua > 0 else 0.0
-
     def _nms_by_iou(dets, iou_thr=0.50):
         """
-        Class-agnostic NMS: keep highest-conf per overlap cluster.
-        Each det: {"xyxy":[...], "conf":float, "name":str, ...}
+        Class-agnostic NMS: keep highest-conf per overlap cluster. A det is also
+        dropped when its center lies inside a kept box (or the kept center in it).
         """
-        if not dets:
-            return dets
-        # sort by confidence DESC (missing conf -> 0.0)
-        ordered = sorted(
-            dets, key=lambda d: float(d.get("conf", 0.0)), reverse=True
-        )
-        kept = []
-        for d in ordered:
-            dx = d.get("xyxy")
-            if not dx:
-                continue
-            drop = False
-            for k in kept:
-                if _iou(dx, k.get("xyxy")) >= iou_thr:
-                    drop = True
-                    break
-
-                kc = k.get("xyxy")
-                if kc is None:
-                    continue
-
-                cx_d, cy_d = _center(dx)
-                cx_k, cy_k = _center(kc)
-
-                kx1, ky1, kx2, ky2 = [float(v) for v in kc]
-                dx1, dy1, dx2, dy2 = [float(v) for v in dx]
-
-                center_overlap = (
-                    kx1 <= cx_d <= kx2
-                    and ky1 <= cy_d <= ky2
-                ) or (
-                    dx1 <= cx_k <= dx2
-                    and dy1 <= cy_k <= dy2
-                )
-
-                if center_overlap:
-                    drop = True
-                    break
-            if not drop:
-                kept.append(d)
-        return kept
+        return nms_dets(dets, iou_thr, inclusive=True, center_overlap=True)
 
     # Raw supports filtered by confidence
     supports_raw = [
@@ -10,6 +10,9 @@ from PIL import Image
 from core.controllers.base import IController
 from core.perception.ocr.interface import OCRInterface
 from core.perception.yolo.interface import IDetector
+from core.settings import Settings
+from core.utils.adaptive_poll import PollBackoff, confirmed_candidates
+from core.utils.frame_gate import FrameChangeGate
 from core.utils.geometry import crop_pil
 from core.utils.logger import logger_uma
 from core.utils.text import fuzzy_contains, fuzzy_ratio
@@ -33,6 +36,14 @@ class PollConfig:
     timeout_s: float = 4.0
     tag: str = "waiter"
     agent: str = "player"
+    # Adaptive polling: retry after poll_min_interval_s, backing off
+    # (x poll_backoff, +/- poll_jitter) up to poll_interval_s while nothing moves
+    poll_min_interval_s: float = 0.08
+    poll_backoff: float = 2.0
+    poll_jitter: float = 0.2
+    # Candidates at or above this conf are acted on at first sight; weaker
+    # ones must show up in two consecutive polls
+    confident_conf: float = 0.80
 
 
 class Waiter:
@@ -47,6 +58,11 @@ class Waiter:
       3) Else if texts provided and OCR available: OCR candidates and click best
          positive match (ignoring any that match forbidden texts).
       4) Else: keep polling until resolved or timeout.
+
+    With WAITER_ADAPTIVE_POLL, polls reuse the previous detections while the
+    screen is visibly unchanged, back off while it stays that way and speed
+    up again when it moves; a candidate below `confident_conf` is only acted
+    on once the previous poll saw it too.
     """
 
     def __init__(
@@ -61,6 +77,11 @@ class Waiter:
         self.yolo_engine = yolo_engine
         self.cfg = config
         self.agent = config.agent
+        self._gate: Optional[FrameChangeGate] = (
+            FrameChangeGate(max_age_s=Settings.FRAME_GATE_MAX_REUSE_S)
+            if Settings.WAITER_ADAPTIVE_POLL
+            else None
+        )
         logger_uma.debug("[waiter] init agent=%s tag=%s", config.agent, config.tag)
 
     # ---------------------------
@@ -150,12 +171,39 @@ class Waiter:
         texts = self._norm_seq(texts)
         forbid_texts = self._norm_seq(forbid_texts)
 
+        backoff = (
+            PollBackoff(
+                min(self.cfg.poll_min_interval_s, interval),
+                interval,
+                factor=self.cfg.poll_backoff,
+                jitter=self.cfg.poll_jitter,
+            )
+            if self._gate is not None
+            else None
+        )
+        prev_dets: Optional[List[DetectionDict]] = None
+        prev_cand: Optional[List[DetectionDict]] = None
+        tried_dets: Optional[List[DetectionDict]] = None
+
         t0 = time.time()
         while True:
             img, dets = self._snap(tag=tag)
+            # The gate hands back the same list while the screen is unchanged
+            changed = dets is not prev_dets
+            prev_dets = dets
             cand = det_filter(dets, classes)
+            timed_out = (time.time() - t0) >= timeout
 
-            if cand:
+            ready = bool(cand) and dets is not tried_dets
+            if ready and backoff is not None and not timed_out:
+                # Wait one more poll unless every candidate is confident or already seen
+                confirmed = confirmed_candidates(
+                    cand, prev_cand, confident_conf=self.cfg.confident_conf
+                )
+                ready = len(confirmed) == len(cand)
+            prev_cand = cand
+
+            if ready:
                 # 1) Single candidate fast path (with optional forbid check)
                 if len(cand) == 1 and allow_greedy_click:
                     pick = cand[0]
@@ -216,7 +264,10 @@ class Waiter:
                         )
                     # If OCR didn't reach threshold or all candidates were forbidden, continue polling.
 
-            if (time.time() - t0) >= timeout:
+                # Same answer until the frame changes: skip OCR on reused detections
+                tried_dets = dets
+
+            if timed_out:
                 if tag not in [
                     "agent_unknown_advance",
                 ]:
@@ -225,7 +276,11 @@ class Waiter:
                     )
                 return (False, None) if return_object else False
 
-            time.sleep(interval)
+            if backoff is not None:
+                delay = backoff.next_delay(changed)
+                time.sleep(max(0.0, min(delay, timeout - (time.time() - t0))))
+            else:
+                time.sleep(interval)
 
     def seen(
         self,
@@ -357,6 +412,7 @@ class Waiter:
             iou=self.cfg.iou,
             tag=tag,
             agent=self.agent,
+            gate=self._gate,
         )
         return img, dets
 
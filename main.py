@@ -40,6 +40,7 @@ from core.perception.yolo.interface import IDetector
 from core.controllers.steam import SteamController
 from core.controllers.android import ScrcpyController
 from core.controllers.adb import ADBController
+from core.controllers.session import SessionRecorder
 from core.utils.tkthread import ensure_tk_loop
 
 try:
@@ -70,13 +71,22 @@ def make_controller_from_settings() -> IController:
     elif mode == "adb":
         device = getattr(Settings, "ADB_DEVICE", None)
         logger_uma.info(f"[CTRL] Mode=adb, device='{device}'")
-        return ADBController(device=device)
+        return ADBController(
+            device=device,
+            persistent_shell=Settings.ADB_PERSISTENT_SHELL,
+            capture_mode=Settings.ADB_CAPTURE_MODE,
+        )
     elif mode == "bluestack":
         use_adb = getattr(Settings, "USE_ADB", False)
         if use_adb:
             device = getattr(Settings, "ADB_DEVICE", "localhost:5555")
             logger_uma.info(f"[CTRL] Mode=bluestack (ADB), device='{device}'")
-            return ADBController(device=device, auto_connect=True)
+            return ADBController(
+                device=device,
+                auto_connect=True,
+                persistent_shell=Settings.ADB_PERSISTENT_SHELL,
+                capture_mode=Settings.ADB_CAPTURE_MODE,
+            )
 
         logger_uma.info(f"[CTRL] Mode=bluestack, window_title='{window_title}'")
         if HAS_BLUESTACKS_CTRL and BlueStacksController is not None:
@@ -85,6 +95,11 @@ def make_controller_from_settings() -> IController:
     else:
         # scrcpy (default branch)
         logger_uma.info(f"[CTRL] Mode=scrcpy, window_title='{window_title}'")
+        if Settings.X11_CAPTURE and sys.platform.startswith("linux"):
+            # Waydroid / scrcpy under X: capture through X11 shared memory
+            from core.controllers.x11 import X11Controller
+
+            return X11Controller(window_title)
         return ScrcpyController(window_title)
 
 
@@ -276,6 +291,7 @@ class BotState:
                     logger_uma.error(
                         f"[BOT] Could not find/focus the {miss} window (title='{Settings.resolve_window_title(mode)}')."
                     )
+                ctrl.close()
                 return
 
             ocr, yolo_engine = make_ocr_yolo_from_settings(ctrl)
@@ -324,6 +340,15 @@ class BotState:
 
             def _runner():
                 re_init = False
+                recorder = None
+                if Settings.RECORD_SESSION:
+                    stamp = time.strftime("%Y%m%d-%H%M%S")
+                    recorder = SessionRecorder(Settings.SESSION_DIR / f"{stamp}.umasession").attach(ctrl)
+                if Settings.FRAME_GRABBER:
+                    ctrl.start_frame_grabber(
+                        capacity=Settings.FRAME_GRABBER_BUFFER,
+                        interval_s=Settings.FRAME_GRABBER_INTERVAL_S,
+                    )
                 try:
                     logger_uma.info("[BOT] Started.")
                     # if not none
@@ -346,6 +371,10 @@ class BotState:
                     else:
                         logger_uma.exception("[BOT] Crash: %s", e)
                 finally:
+                    ctrl.stop_frame_grabber()
+                    if recorder is not None:
+                        recorder.close()
+                    ctrl.close()
                     if not re_init:
                         with self._lock:
                             self.running = False
@@ -430,6 +459,7 @@ class NavState:
                     logger_uma.error(
                         f"[AgentNav] Could not find/focus the {miss} window (title='{Settings.resolve_window_title(mode)}')."
                     )
+                ctrl.close()
                 return
 
             # OCR from settings, YOLO engine for NAV specifically
@@ -440,6 +470,11 @@ class NavState:
             self.agent = AgentNav(ctrl, ocr, yolo_engine_nav, action=action)
 
             def _runner():
+                if Settings.FRAME_GRABBER:
+                    ctrl.start_frame_grabber(
+                        capacity=Settings.FRAME_GRABBER_BUFFER,
+                        interval_s=Settings.FRAME_GRABBER_INTERVAL_S,
+                    )
                 try:
                     logger_uma.info(f"[AgentNav] Started (action={action}).")
                     if self.agent:
@@ -447,6 +482,8 @@ class NavState:
                 except Exception as e:
                     logger_uma.exception("[AgentNav] Crash: %s", e)
                 finally:
+                    ctrl.stop_frame_grabber()
+                    ctrl.close()
                     with self._lock:
                         self.running = False
                         self.current_action = None
@@ -0,0 +1,128 @@
+"""
+Replay a recorded bot session (RECORD_SESSION=1) through the agent, as fast
+as perception allows, and report how long the flow took.
+
+    python replay_session.py debug/sessions/20261016-101500.umasession
+    python replay_session.py run.umasession --scenario unity_cup --profile out.prof
+
+Sleeps inside the agent run on a virtual clock (they advance time instead of
+waiting), so waits, timeouts and patience counters behave as recorded while
+the wall-clock cost is perception only. Pass --real-time to keep real sleeps.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+
+class _VirtualClock:
+    """Stands in for time.sleep/time.time/time.monotonic during a replay."""
+
+    def __init__(self) -> None:
+        self._real_monotonic = time.monotonic
+        self._wall0 = time.time()
+        self._mono0 = time.monotonic()
+        self.elapsed = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.elapsed += max(0.0, float(seconds))
+
+    def time(self) -> float:
+        return self._wall0 + self.elapsed + (self._real_monotonic() - self._mono0)
+
+    def monotonic(self) -> float:
+        return self._real_monotonic() + self.elapsed
+
+    def install(self) -> None:
+        # Before the agent modules import `from time import sleep`
+        time.sleep = self.sleep  # type: ignore[assignment]
+        time.time = self.time  # type: ignore[assignment]
+        time.monotonic = self.monotonic  # type: ignore[assignment]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("session", type=Path, help="*.umasession file written with RECORD_SESSION=1")
+    ap.add_argument("--scenario", choices=("ura", "unity_cup"), default="ura")
+    ap.add_argument("--max-iterations", type=int, default=None)
+    ap.add_argument("--profile", type=Path, default=None, help="write cProfile stats here")
+    ap.add_argument("--json", type=Path, default=None, help="write the summary as JSON here")
+    ap.add_argument("--real-time", action="store_true", help="keep real sleeps")
+    args = ap.parse_args()
+
+    clock = None
+    if not args.real_time:
+        clock = _VirtualClock()
+        clock.install()
+
+    # Imported after the clock so module-level `from time import sleep` binds to it
+    from core.controllers.replay import ReplayController
+    from core.controllers.session import ReplayFinished
+    from core.settings import Settings
+
+    Settings.ACTIVE_SCENARIO = Settings.normalize_scenario(args.scenario)
+    Settings.ACTIVE_AGENT_NAME = Settings.resolve_agent_name(Settings.ACTIVE_SCENARIO)
+    Settings.ACTIVE_YOLO_WEIGHTS = Settings.resolve_yolo_weights_path(Settings.ACTIVE_SCENARIO)
+    Settings.FRAME_GRABBER = False
+    ctrl = ReplayController(args.session)
+
+    if Settings.USE_EXTERNAL_PROCESSOR:
+        from core.perception.ocr.ocr_remote import RemoteOCREngine
+        from core.perception.yolo.yolo_remote import RemoteYOLOEngine
+
+        ocr = RemoteOCREngine(base_url=Settings.EXTERNAL_PROCESSOR_URL)
+        yolo_engine = RemoteYOLOEngine(
+            ctrl=ctrl, base_url=Settings.EXTERNAL_PROCESSOR_URL, weights=str(Settings.ACTIVE_YOLO_WEIGHTS)
+        )
+    else:
+        from core.perception.ocr.ocr_local import LocalOCREngine
+        from core.perception.yolo.yolo_local import LocalYOLOEngine
+
+        ocr = LocalOCREngine()
+        yolo_engine = LocalYOLOEngine(ctrl=ctrl, weights=str(Settings.ACTIVE_YOLO_WEIGHTS))
+
+    if args.scenario == "unity_cup":
+        from core.actions.unity_cup.agent import AgentUnityCup as Agent
+    else:
+        from core.actions.ura.agent import AgentURA as Agent  # type: ignore[assignment]
+    agent = Agent(ctrl=ctrl, ocr=ocr, yolo_engine=yolo_engine)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    t0 = time.perf_counter()
+    outcome = "completed"
+    try:
+        agent.run(delay=getattr(Settings, "MAIN_LOOP_DELAY", 0.4), max_iterations=args.max_iterations)
+    except ReplayFinished as exc:
+        outcome = f"end of recording ({exc})"
+    wall_s = time.perf_counter() - t0
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(str(args.profile))
+
+    events = ctrl.session.events
+    recorded_s = float(events[-1]["t"]) if events else 0.0
+    summary = {
+        "session": str(args.session),
+        "scenario": args.scenario,
+        "outcome": outcome,
+        "wall_s": round(wall_s, 3),
+        "recorded_s": recorded_s,
+        "virtual_sleep_s": round(clock.elapsed, 3) if clock else None,
+        "speedup": round(recorded_s / wall_s, 2) if wall_s > 0 else None,
+        **ctrl.cursor.stats,
+    }
+    ctrl.close()
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Export the YOLO weights in models/ to ONNX for YOLO_BACKEND=onnx.
+
+Usage:
+    # Every configured detector (URA, Unity Cup, nav) that exists on disk
+    python scripts/export_yolo_onnx.py
+
+    # Specific weights, fixed 832x832 input instead of dynamic axes
+    python scripts/export_yolo_onnx.py models/uma_ura.pt --static
+
+Each `<name>.pt` becomes `<name>.onnx` next to it, which is where
+LocalYOLOEngine looks for it. Needs ultralytics (and torch) only here; the bot
+then runs the .onnx with onnxruntime alone.
+
+Dynamic axes (the default) keep Ultralytics' minimal letterbox padding, so the
+ONNX boxes match the .pt predictions on non-square screenshots. Check with
+`pytest tests/core/perception/test_yolo_onnx.py` (parity test).
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.settings import Settings  # noqa: E402
+
+
+def default_weights() -> List[Path]:
+    paths = [Settings.YOLO_WEIGHTS_URA, Settings.YOLO_WEIGHTS_UNITY_CUP, Settings.YOLO_WEIGHTS_NAV]
+    return [Path(p) for p in dict.fromkeys(paths) if Path(p).is_file()]
+
+
+def export_one(weights: Path, *, imgsz: int, dynamic: bool, opset: Optional[int]) -> Path:
+    from ultralytics.models import YOLO
+
+    model = YOLO(str(weights))
+    kwargs = {"format": "onnx", "imgsz": imgsz, "dynamic": dynamic, "simplify": True}
+    if opset:
+        kwargs["opset"] = opset
+    exported = Path(model.export(**kwargs))
+    target = weights.with_suffix(".onnx")
+    if exported.resolve() != target.resolve():
+        shutil.move(str(exported), target)
+    return target
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("weights", nargs="*", type=Path, help=".pt files (default: configured YOLO weights)")
+    ap.add_argument("--imgsz", type=int, default=Settings.YOLO_IMGSZ)
+    ap.add_argument("--static", action="store_true", help="fixed imgsz x imgsz input (no dynamic axes)")
+    ap.add_argument("--opset", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    weights = args.weights or default_weights()
+    if not weights:
+        print(f"No YOLO weights found in {Settings.MODELS_DIR}", file=sys.stderr)
+        return 1
+
+    failed = 0
+    for w in weights:
+        try:
+            out = export_one(w, imgsz=args.imgsz, dynamic=not args.static, opset=args.opset)
+        except Exception as e:
+            failed += 1
+            print(f"[export] {w}: {e}", file=sys.stderr)
+            continue
+        print(f"[export] {w} -> {out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+INT8 post-training quantization of the exported YOLO detectors.
+
+Usage:
+    # Calibrate on the frames the bot saved under debug/ (STORE_FOR_TRAINING),
+    # report latency + mAP drift on the val split of prepare_uma_yolo_dataset.py
+    python scripts/quantize_yolo_onnx.py models/uma_ura.onnx --dataset datasets/uma
+
+    # Calibrate on another folder, no evaluation
+    python scripts/quantize_yolo_onnx.py models/uma_nav.onnx --calib captures/nav --no-eval
+
+Input is the FP32 model from scripts/export_yolo_onnx.py; output is
+`<name>.int8.onnx` next to it (static QDQ quantization, per-channel INT8
+weights, activations calibrated on real captures) plus `<name>.int8.json`
+with the report. The detection head's box decoding stays in float: YOLO's
+DFL/concat outputs mix pixel coordinates and class scores in one tensor,
+which a single INT8 scale cannot hold.
+
+The bot loads the INT8 model with YOLO_BACKEND=onnx and YOLO_ONNX_INT8=true.
+
+Report: per-image latency (p50 / mean, ms) of both models at the bot's
+YOLO_CONF, and mAP50 / mAP50-95 of both on the held-out split (conf 0.001,
+IoU 0.7 NMS, as Ultralytics' val does), with the INT8 - FP32 drift. Both
+models go through the same onnxruntime pre/postprocessing, so the drift is
+quantization alone.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.perception.yolo.yolo_onnx import OnnxYOLODetector, letterbox  # noqa: E402
+from core.settings import Settings  # noqa: E402
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+# (class name, conf, xyxy) / (class name, xyxy)
+Pred = Tuple[str, float, Tuple[float, float, float, float]]
+Truth = Tuple[str, Tuple[float, float, float, float]]
+
+
+# ---------- Calibration ----------
+
+def calibration_images(sources: Sequence[Path], *, limit: int, seed: int = 0) -> List[Path]:
+    """Images under `sources` (recursive), a seeded random `limit` of them."""
+    found: List[Path] = []
+    for src in sources:
+        if src.is_file():
+            found.append(src)
+        elif src.is_dir():
+            found.extend(p for p in src.rglob("*") if p.suffix.lower() in IMAGE_EXTS)
+    found = sorted(set(found))
+    random.Random(seed).shuffle(found)
+    return found[:limit] if limit > 0 else found
+
+
+def preprocess(bgr: np.ndarray, imgsz: int) -> np.ndarray:
+    """Square letterbox -> (1, 3, imgsz, imgsz) float32 RGB 0..1, as at inference."""
+    img, _, _ = letterbox(bgr, (imgsz, imgsz))
+    blob = np.ascontiguousarray(img[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32)
+    return blob / 255.0
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader over captured frames."""
+
+    def __init__(self, paths: Sequence[Path], input_name: str, imgsz: int) -> None:
+        self.paths = list(paths)
+        self.input_name = input_name
+        self.imgsz = int(imgsz)
+        self._it: Optional[Iterator[Path]] = None
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        if self._it is None:
+            self._it = iter(self.paths)
+        for path in self._it:
+            bgr = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if bgr is not None:
+                return {self.input_name: preprocess(bgr, self.imgsz)}
+        return None
+
+    def rewind(self) -> None:
+        self._it = None
+
+
+def head_nodes_to_exclude(model) -> List[str]:
+    """
+    Non-conv nodes of the last `/model.N/` module (the Detect head): DFL
+    softmax, box decode, the box/score concat. Their convs stay quantized.
+    """
+    head = -1
+    for node in model.graph.node:
+        m = re.match(r"/model\.(\d+)/", node.name)
+        if m:
+            head = max(head, int(m.group(1)))
+    if head < 0:
+        return []
+    prefix = f"/model.{head}/"
+    return [
+        n.name for n in model.graph.node
+        if n.name.startswith(prefix) and n.op_type != "Conv"
+    ]
+
+
+def quantize(
+    fp32: Path,
+    out: Path,
+    calib: Sequence[Path],
+    *,
+    imgsz: int,
+    method: str = "minmax",
+    keep_head_float: bool = True,
+) -> Path:
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepped = out.with_name(out.stem + ".prep.onnx")
+    quant_pre_process(str(fp32), str(prepped))
+    try:
+        model = onnx.load(str(prepped))
+        input_name = model.graph.input[0].name
+        exclude = head_nodes_to_exclude(model) if keep_head_float else []
+        del model
+        reader = FrameCalibrationReader(calib, input_name, imgsz)
+        quantize_static(
+            str(prepped),
+            str(out),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method={
+                "minmax": CalibrationMethod.MinMax,
+                "entropy": CalibrationMethod.Entropy,
+                "percentile": CalibrationMethod.Percentile,
+            }[method],
+            nodes_to_exclude=exclude,
+        )
+    finally:
+        prepped.unlink(missing_ok=True)
+    # Keep class names / stride for OnnxYOLODetector
+    src, dst = onnx.load(str(fp32)), onnx.load(str(out))
+    if not dst.metadata_props:
+        for prop in src.metadata_props:
+            dst.metadata_props.add(key=prop.key, value=prop.value)
+        onnx.save(dst, str(out))
+    return out
+
+
+# ---------- Evaluation ----------
+
+def read_dataset_names(dataset: Path) -> List[str]:
+    import yaml
+
+    data = yaml.safe_load((dataset / "data.yaml").read_text(encoding="utf-8"))
+    names = data.get("names", [])
+    if isinstance(names, dict):
+        return [str(names[k]) for k in sorted(names, key=int)]
+    return [str(n) for n in names]
+
+
+def read_yolo_labels(path: Path, names: Sequence[str], width: int, height: int) -> List[Truth]:
+    """YOLO txt (cls cx cy w h, normalized) -> [(name, xyxy pixels)]."""
+    out: List[Truth] = []
+    if not path.exists():
+        return out
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        c = int(float(parts[0]))
+        cx, cy, w, h = (float(v) for v in parts[1:5])
+        out.append(
+            (
+                names[c] if 0 <= c < len(names) else str(c),
+                ((cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height),
+            )
+        )
+    return out
+
+
+def heldout_split(dataset: Path, split: str) -> List[Path]:
+    img_dir = dataset / "images" / split
+    if not img_dir.is_dir():
+        raise FileNotFoundError(f"{img_dir} not found; run prepare_uma_yolo_dataset.py first")
+    return sorted(p for p in img_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+
+
+def _box_iou(box: Sequence[float], boxes: np.ndarray) -> np.ndarray:
+    iw = np.clip(np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]), 0, None)
+    ih = np.clip(np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]), 0, None)
+    inter = iw * ih
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def average_precision(recall: np.ndarray, precision: np.ndarray) -> float:
+    """101-point interpolated AP, as Ultralytics computes it (a perfect class scores 0.995)."""
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)
+    return float(np.trapezoid(np.interp(x, mrec, mpre), x))
+
+
+def mean_average_precision(
+    preds: Sequence[Sequence[Pred]], truths: Sequence[Sequence[Truth]]
+) -> Dict[str, float]:
+    """-> {"map50", "map50_95"} over classes present in `truths` (per image lists, aligned)."""
+    records: Dict[str, List[Tuple[float, np.ndarray]]] = {}
+    n_gt: Dict[str, int] = {}
+    for img_preds, img_truths in zip(preds, truths):
+        for name, _ in img_truths:
+            n_gt[name] = n_gt.get(name, 0) + 1
+        by_class: Dict[str, List[Pred]] = {}
+        for p in img_preds:
+            by_class.setdefault(p[0], []).append(p)
+        for name, cls_preds in by_class.items():
+            gt = np.array([b for n, b in img_truths if n == name], dtype=np.float64).reshape(-1, 4)
+            taken = np.zeros((len(IOU_THRESHOLDS), len(gt)), dtype=bool)
+            for _, conf, box in sorted(cls_preds, key=lambda p: -p[1]):
+                tp = np.zeros(len(IOU_THRESHOLDS), dtype=bool)
+                if len(gt):
+                    ious = _box_iou(box, gt)
+                    for t, thr in enumerate(IOU_THRESHOLDS):
+                        cand = np.where((ious >= thr) & ~taken[t])[0]
+                        if cand.size:
+                            j = cand[np.argmax(ious[cand])]
+                            taken[t, j] = True
+                            tp[t] = True
+                records.setdefault(name, []).append((conf, tp))
+
+    aps = np.zeros((len(n_gt), len(IOU_THRESHOLDS)))
+    for k, (name, total) in enumerate(n_gt.items()):
+        recs = sorted(records.get(name, []), key=lambda r: -r[0])
+        if not recs:
+            continue
+        tp = np.stack([r[1] for r in recs]).astype(np.float64)
+        ctp = np.cumsum(tp, axis=0)
+        cfp = np.cumsum(1.0 - tp, axis=0)
+        for t in range(len(IOU_THRESHOLDS)):
+            aps[k, t] = average_precision(ctp[:, t] / total, ctp[:, t] / (ctp[:, t] + cfp[:, t]))
+    if not n_gt:
+        return {"map50": 0.0, "map50_95": 0.0}
+    return {"map50": float(aps[:, 0].mean()), "map50_95": float(aps.mean())}
+
+
+def evaluate(
+    detector: OnnxYOLODetector,
+    images: Sequence[Path],
+    truths: Sequence[Sequence[Truth]],
+    *,
+    imgsz: int,
+    warmup: int = 3,
+) -> Dict[str, float]:
+    frames = [cv2.imread(str(p), cv2.IMREAD_COLOR) for p in images]
+    for bgr in frames[:warmup]:
+        detector.detect([bgr], imgsz=imgsz, conf=Settings.YOLO_CONF, iou=Settings.YOLO_IOU)
+
+    times: List[float] = []
+    for bgr in frames:
+        t0 = time.perf_counter()
+        detector.detect([bgr], imgsz=imgsz, conf=Settings.YOLO_CONF, iou=Settings.YOLO_IOU)
+        times.append(time.perf_counter() - t0)
+
+    preds = [
+        [(d["name"], d["conf"], d["xyxy"]) for d in detector.detect([bgr], imgsz=imgsz, conf=0.001, iou=0.7)[0]]
+        for bgr in frames
+    ]
+    report = mean_average_precision(preds, truths)
+    report["latency_p50_ms"] = float(np.percentile(times, 50) * 1000) if times else 0.0
+    report["latency_mean_ms"] = float(np.mean(times) * 1000) if times else 0.0
+    return report
+
+
+def drift_report(fp32: Dict[str, float], int8: Dict[str, float]) -> Dict[str, float]:
+    out = {f"fp32_{k}": v for k, v in fp32.items()}
+    out.update({f"int8_{k}": v for k, v in int8.items()})
+    out["map50_drift"] = int8["map50"] - fp32["map50"]
+    out["map50_95_drift"] = int8["map50_95"] - fp32["map50_95"]
+    if int8["latency_mean_ms"] > 0:
+        out["speedup"] = fp32["latency_mean_ms"] / int8["latency_mean_ms"]
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("model", type=Path, help="FP32 .onnx from scripts/export_yolo_onnx.py")
+    ap.add_argument("--calib", type=Path, nargs="+", default=[Settings.DEBUG_DIR],
+                    help="folders of captured frames (default: the STORE_FOR_TRAINING dumps in debug/)")
+    ap.add_argument("--calib-count", type=int, default=200)
+    ap.add_argument("--method", choices=("minmax", "entropy", "percentile"), default="minmax")
+    ap.add_argument("--quantize-head", action="store_true", help="also quantize the box decode (less accurate)")
+    ap.add_argument("--imgsz", type=int, default=Settings.YOLO_IMGSZ)
+    ap.add_argument("--dataset", type=Path, default=Path("datasets/uma"), help="prepare_uma_yolo_dataset.py output")
+    ap.add_argument("--split", default="val")
+    ap.add_argument("--no-eval", action="store_true")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    fp32 = args.model
+    if fp32.suffix.lower() != ".onnx" or not fp32.is_file():
+        print(f"{fp32}: expected an exported .onnx (scripts/export_yolo_onnx.py)", file=sys.stderr)
+        return 1
+    calib = calibration_images(args.calib, limit=args.calib_count, seed=args.seed)
+    if not calib:
+        print(f"No calibration images under {', '.join(map(str, args.calib))}", file=sys.stderr)
+        return 1
+
+    out = fp32.with_suffix(".int8.onnx")
+    print(f"[quant] calibrating on {len(calib)} frames ({args.method})")
+    quantize(fp32, out, calib, imgsz=args.imgsz, method=args.method, keep_head_float=not args.quantize_head)
+    report: Dict[str, object] = {
+        "fp32": str(fp32),
+        "int8": str(out),
+        "calibration_frames": len(calib),
+        "method": args.method,
+        "fp32_mb": fp32.stat().st_size / 1e6,
+        "int8_mb": out.stat().st_size / 1e6,
+    }
+    print(f"[quant] wrote {out}")
+
+    if not args.no_eval:
+        names = read_dataset_names(args.dataset)
+        images = heldout_split(args.dataset, args.split)
+        truths = []
+        for p in images:
+            h, w = cv2.imread(str(p), cv2.IMREAD_COLOR).shape[:2]
+            truths.append(read_yolo_labels(args.dataset / "labels" / args.split / f"{p.stem}.txt", names, w, h))
+        threads = Settings.YOLO_ONNX_THREADS
+        r32 = evaluate(OnnxYOLODetector(fp32, threads=threads), images, truths, imgsz=args.imgsz)
+        r8 = evaluate(OnnxYOLODetector(out, threads=threads), images, truths, imgsz=args.imgsz)
+        report.update(drift_report(r32, r8))
+        report["eval_images"] = len(images)
+
+    report_path = out.with_suffix(".json")
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
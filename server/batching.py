@@ -0,0 +1,350 @@
+# server/batching.py
+"""
+Worker pools for the inference server.
+
+MicroBatcher: request handlers `submit()` one item and block on the returned
+Future. Worker threads (one pool per model) take the first queued item, keep
+collecting until `max_batch_size` items are queued or `max_wait_s` has passed
+since the first one, then run the whole batch through `run_batch` in a single
+call and resolve each Future with its own result. If the batch call raises,
+each item is rerun alone so the exception only reaches the request that
+caused it.
+
+BoundedExecutor: plain thread pool for work that does not batch (template
+matching, spirit classification).
+
+ModelBatchers: one MicroBatcher per loaded model, keyed like the ModelRegistry
+holding the models so its eviction hook can retire the matching batcher.
+
+Both have bounded queues and raise ServerBusy instead of queueing without
+limit, so a saturated model sheds load instead of delaying every other endpoint.
+"""
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+_STOP = object()
+T = TypeVar("T")
+
+
+class ServerBusy(Exception):
+    """A worker pool's queue is full (or the pool is shut down); retry later."""
+
+    def __init__(self, pool: str, retry_after_s: float, *, closed: bool = False) -> None:
+        super().__init__(f"{pool} is {'shut down' if closed else 'busy'}")
+        self.pool = pool
+        self.retry_after_s = float(retry_after_s)
+        self.closed = closed
+
+
+class MicroBatcher:
+    """Coalesce concurrent submissions into batches for `run_batch(items) -> results`."""
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], List[Any]],
+        *,
+        max_batch_size: int = 8,
+        max_wait_s: float = 0.015,
+        workers: int = 1,
+        max_queue: int = 0,
+        retry_after_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_s))
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))  # 0 = unbounded
+        self.retry_after_s = float(retry_after_s)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        # Makes "not closed -> enqueue" atomic with close(), so nothing lands behind _STOP
+        self._submit_lock = threading.Lock()
+        self._alive = self.workers
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "batches": 0,
+            "items": 0,
+            "largest_batch": 0,
+            "rejected": 0,
+        }
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"batcher-{name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ---------- public API ----------
+    def submit(self, item: Any) -> Future:
+        """Queue one item. Raises ServerBusy when the queue is full or the batcher is closed."""
+        fut: Future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise ServerBusy(self.name, self.retry_after_s, closed=True)
+            if self.max_queue and self._queue.qsize() >= self.max_queue:
+                with self._stats_lock:
+                    self._stats["rejected"] += 1
+                raise ServerBusy(self.name, self.retry_after_s)
+            self._queue.put((item, fut))
+        return fut
+
+    def run(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit and wait; exceptions raised by `run_batch` propagate to the caller."""
+        return self.submit(item).result(timeout=timeout)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            out: Dict[str, Any] = dict(self._stats)
+        out["queued"] = self.queue_depth()
+        out["max_queue"] = self.max_queue
+        out["workers"] = self.workers
+        out["avg_batch"] = (out["items"] / out["batches"]) if out["batches"] else 0.0
+        return out
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting items; queued ones still run unless every worker has exited."""
+        with self._submit_lock:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+        for t in self._threads:
+            t.join(timeout=timeout)
+        if not any(t.is_alive() for t in self._threads):
+            self._fail_leftovers()
+
+    # ---------- worker ----------
+    def _loop(self) -> None:
+        try:
+            self._work()
+        finally:
+            with self._submit_lock:
+                self._alive -= 1
+                last = self._alive == 0
+            if last:
+                self._fail_leftovers()
+
+    def _work(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch: List[Tuple[Any, Future]] = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        # Drop callers that gave up (cancelled) before we started
+        live = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+        if not live:
+            return
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(live)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(live))
+        try:
+            results = self._call([item for item, _ in live])
+        except BaseException as e:  # keep the worker alive
+            if len(live) == 1:
+                live[0][1].set_exception(e)
+                return
+            # One bad item must not fail other callers' requests: rerun each
+            # on its own so only the offending one sees the exception.
+            for item, fut in live:
+                try:
+                    fut.set_result(self._call([item])[0])
+                except BaseException as solo:
+                    fut.set_exception(solo)
+            return
+        for (_, fut), res in zip(live, results):
+            fut.set_result(res)
+
+    def _fail_leftovers(self) -> None:
+        """No worker is left to run what is still queued: fail it instead of leaving callers waiting."""
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is _STOP:
+                continue
+            _, fut = entry
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(ServerBusy(self.name, self.retry_after_s, closed=True))
+
+    def _call(self, items: List[Any]) -> List[Any]:
+        results = self._run_batch(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"{self.name}: batch returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor that rejects work beyond `workers + max_queue` pending tasks."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        workers: int = 1,
+        max_queue: int = 0,
+        retry_after_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))  # 0 = unbounded
+        self.retry_after_s = float(retry_after_s)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"pool-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+        self._stats: Dict[str, int] = {"completed": 0, "rejected": 0}
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._closed:
+                raise ServerBusy(self.name, self.retry_after_s, closed=True)
+            if self.max_queue and self._pending >= self.workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise ServerBusy(self.name, self.retry_after_s)
+            self._pending += 1
+        try:
+            # Carry the caller's context (request metrics) into the worker, like asyncio.to_thread
+            ctx = contextvars.copy_context()
+            fut = self._pool.submit(ctx.run, fn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        fut.add_done_callback(self._on_done)
+        return fut
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return max(0, self._pending - self.workers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["in_flight"] = min(self._pending, self.workers)
+            out["queued"] = max(0, self._pending - self.workers)
+        out["max_queue"] = self.max_queue
+        out["workers"] = self.workers
+        return out
+
+    def close(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=wait)
+
+    def _on_done(self, _fut: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._stats["completed"] += 1
+
+
+class ModelBatchers(Generic[T]):
+    """
+    MicroBatchers for registry-held models, keyed by the registry key. A model's
+    own path can differ from it (the ONNX backend rewrites `.pt` to `.onnx`), so
+    callers pass the key they fetched the model under.
+
+    With `resident` (e.g. `ModelRegistry.peek`), a caller holding a model that
+    was evicted since it fetched it never displaces the resident model's batcher:
+    its items go to that batcher, or to a one-off worker if nothing is resident.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[T, List[Any]], List[Any]],
+        *,
+        resident: Optional[Callable[[str], Optional[T]]] = None,
+        **batcher_kwargs: Any,
+    ) -> None:
+        self.name = name
+        self._run_batch = run_batch
+        self._resident = resident
+        self._batcher_kwargs = batcher_kwargs
+        self._lock = threading.Lock()
+        # key -> (model, batcher); the model is kept to spot a reload after eviction
+        self._entries: Dict[str, Tuple[T, MicroBatcher]] = {}
+
+    def submit(self, key: str, model: T, item: Any) -> Future:
+        """Queue `item` for `model` (fetched under `key`). Raises ServerBusy like MicroBatcher."""
+        with self._lock:
+            batcher, one_off = self._batcher_locked(key, model)
+        if not one_off:
+            return batcher.submit(item)
+        try:
+            return batcher.submit(item)
+        finally:
+            # Stale model: the worker runs this item, then exits
+            batcher.close(timeout=0)
+
+    def retire(self, key: str, model: Optional[T] = None) -> None:
+        """Drop `key`'s batcher (only if it serves `model`, when given); queued items still run."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (model is not None and entry[0] is not model):
+                return
+            del self._entries[key]
+        entry[1].close(timeout=0)
+
+    def batchers(self) -> List[MicroBatcher]:
+        with self._lock:
+            return [batcher for _, batcher in self._entries.values()]
+
+    def _batcher_locked(self, key: str, model: T) -> Tuple[MicroBatcher, bool]:
+        """-> (batcher, one_off); a one-off batcher is not installed and must be closed."""
+        entry = self._entries.get(key)
+        current = self._resident(key) if self._resident is not None else model
+        if entry is not None and (entry[0] is model or entry[0] is current):
+            return entry[1], False
+        if entry is not None:
+            # Its model is no longer resident (an eviction hook that has not run yet)
+            del self._entries[key]
+            entry[1].close(timeout=0)
+        if current is None:
+            # `model` was evicted and nothing replaced it: run its items without
+            # installing it, so the eviction stays in effect
+            return self._new_batcher(key, model), True
+        # Serve a stale caller with the resident model, which has the same weights
+        self._entries[key] = (current, self._new_batcher(key, current))
+        return self._entries[key][1], False
+
+    def _new_batcher(self, key: str, model: T) -> MicroBatcher:
+        def _run(items: List[Any]) -> List[Any]:
+            return self._run_batch(model, items)
+
+        return MicroBatcher(f"{self.name}:{Path(key).name}", _run, **self._batcher_kwargs)
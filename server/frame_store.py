@@ -0,0 +1,90 @@
+# server/frame_store.py
+"""
+Recently uploaded frames, keyed by their pixel digest, so clients can send
+`X-Frame-Refs` instead of re-uploading pixels they sent a moment ago (waits,
+spinners and static menus produce many identical frames).
+
+Frames are stored under the digest the server computes (`verified_digests`),
+never just the one a client claims: otherwise one client could register
+arbitrary pixels under another client's frame digest.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from server.result_cache import frame_digest
+
+
+def verified_digests(claimed: Sequence[str], frames: Sequence[np.ndarray]) -> List[str]:
+    """Digests of `frames`; ValueError unless they equal the client's `claimed` ones."""
+    if len(claimed) != len(frames):
+        raise ValueError(f"{len(claimed)} frame digests for {len(frames)} frames")
+    actual = [frame_digest(f) for f in frames]
+    for i, (want, got) in enumerate(zip(claimed, actual)):
+        if want.lower() != got:
+            raise ValueError(f"Digest of frame {i} does not match its pixels")
+    return actual
+
+
+class RecentFrameStore:
+    """Thread-safe LRU of frames bounded by total pixel bytes. Frames are copied in and out."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def put_many(self, digests: Sequence[str], frames: Sequence[np.ndarray]) -> None:
+        if not self.enabled or len(digests) != len(frames):
+            return
+        for digest, frame in zip(digests, frames):
+            if frame.nbytes > self.max_bytes:
+                continue
+            # Handlers may modify their frames in place; keep a private copy
+            stored = frame.copy()
+            with self._lock:
+                old = self._data.pop(digest, None)
+                if old is not None:
+                    self._bytes -= old.nbytes
+                self._data[digest] = stored
+                self._bytes += stored.nbytes
+                self._stats["stored"] += 1
+                while self._bytes > self.max_bytes and self._data:
+                    _, evicted = self._data.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+                    self._stats["evictions"] += 1
+
+    def get_many(self, digests: Sequence[str]) -> Tuple[Optional[List[np.ndarray]], List[str]]:
+        """-> (frames, []) when every digest is held, else (None, missing digests)."""
+        found: List[np.ndarray] = []
+        missing: List[str] = []
+        with self._lock:
+            for digest in digests:
+                frame = self._data.get(digest)
+                if frame is None:
+                    missing.append(digest)
+                    continue
+                self._data.move_to_end(digest)
+                found.append(frame)
+            self._stats["misses" if missing else "hits"] += 1
+        if missing:
+            return None, missing
+        return [f.copy() for f in found], []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["size"] = len(self._data)
+            out["bytes"] = self._bytes
+        out["max_bytes"] = self.max_bytes
+        return out
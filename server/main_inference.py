@@ -1,40 +1,136 @@
 # app.py
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
+import gc
+import json
+import math
+import os
 import threading
-from typing import Any, Dict, List, Literal, Optional, Tuple
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Literal, NamedTuple, Optional, Tuple, Union
 from pathlib import Path
 
 import cv2
 import numpy as np
 import torch
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field, validator
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field, ValidationError, validator
 import time
 from collections import OrderedDict
 import hashlib
+import re
 
 # Local OCR implementation (host has Paddle installed)
 from core.perception.ocr.ocr_local import LocalOCREngine
 from core.perception.yolo.yolo_local import LocalYOLOEngine
 from PIL import Image, ImageOps
 from core.settings import Settings
+from core.utils.frame_codec import (
+    HEADER_FRAME_MISSING,
+    HEADER_REFS_SUPPORT,
+    HEADER_SERVER_SUPPORT,
+    NEED_BODY_STATUS,
+    frame_digests,
+    frame_refs,
+    frames_lossy,
+    is_frames_request,
+    unpack_frames,
+)
+from core.utils.img import bgr_to_pil
+from core.utils.logger import logger_uma
+from server.batching import BoundedExecutor, MicroBatcher, ModelBatchers, ServerBusy
+from server.frame_store import RecentFrameStore, verified_digests
+from server.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS, stage
+from server.model_registry import ModelRegistry
+from server.result_cache import ResultCache, frame_digest
+from server.template_store import TemplateFeatureStore
 from core.perception.analyzers.matching.base import (
     PreparedTemplate,
     TemplateEntry,
     TemplateMatch,
     TemplateMatcherBase,
 )
+from core.perception.analyzers.matching.remote import (
+    BANK_MISS_STATUS,
+    HEADER_BANKS_SUPPORT,
+    template_bank_digest,
+    template_bank_id,
+)
 from core.perception.unity_cup_spirit_classifier import UnityCupSpiritClassifier
 
+try:  # RSS in /metrics only; psutil is optional on the server
+    import psutil as _psutil
+except ImportError:  # pragma: no cover
+    _psutil = None  # type: ignore[assignment]
+
 app = FastAPI()
 engine = LocalOCREngine()  # load once; keeps models on CPU/GPU as configured
 
+# Results for pixel-identical frames (waiter polls, static screens) are served from here
+_RESULT_CACHE = ResultCache(
+    max_entries=Settings.INFERENCE_RESULT_CACHE_SIZE,
+    ttl_s=Settings.INFERENCE_RESULT_CACHE_TTL_S,
+)
+
+# Frames clients uploaded recently, so repeats can be sent as X-Frame-Refs digests
+_FRAME_STORE = RecentFrameStore(max_bytes=int(Settings.INFERENCE_FRAME_STORE_MB * 1024 * 1024))
+
 # run: uvicorn server.main_inference:app --host 0.0.0.0 --port 8001
 
 
+@app.middleware("http")
+async def _advertise_frame_transport(request: Request, call_next):
+    # Lets clients tell a binary-aware server's 4xx apart from an old JSON-only one.
+    response = await call_next(request)
+    response.headers[HEADER_SERVER_SUPPORT] = "1"
+    response.headers[HEADER_BANKS_SUPPORT] = "1"
+    if _FRAME_STORE.enabled:
+        response.headers[HEADER_REFS_SUPPORT] = "1"
+    return response
+
+
+@app.middleware("http")
+async def _record_metrics(request: Request, call_next):
+    path = request.url.path
+    endpoint = path if path in _route_paths() else "other"
+    with METRICS.track_request(endpoint) as outcome:
+        response = await call_next(request)
+        outcome["status"] = response.status_code
+    return response
+
+
+_ROUTE_PATHS: Optional[frozenset] = None
+
+
+def _route_paths() -> frozenset:
+    # Label by known routes only so stray URLs cannot blow up label cardinality
+    global _ROUTE_PATHS
+    if _ROUTE_PATHS is None:
+        _ROUTE_PATHS = frozenset(getattr(r, "path", "") for r in app.routes)
+    return _ROUTE_PATHS
+
+
+def _json_response(result: Any) -> JSONResponse:
+    with stage("serialize"):
+        return JSONResponse(content=jsonable_encoder(result))
+
+
+@app.exception_handler(ServerBusy)
+async def _server_busy(request: Request, exc: ServerBusy) -> JSONResponse:
+    # Full queue -> 429 so clients back off; pool shut down -> 503
+    return JSONResponse(
+        status_code=503 if exc.closed else 429,
+        content={"detail": str(exc), "pool": exc.pool},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after_s)))},
+    )
+
+
 @app.get("/health")
 def health():
     return {
@@ -44,10 +140,72 @@ def health():
             "size": len(_TEMPLATE_CACHE),
             "hits": _TEMPLATE_CACHE_STATS["hits"],
             "misses": _TEMPLATE_CACHE_STATS["misses"],
+            "disk_hits": _TEMPLATE_CACHE_STATS["disk_hits"],
+            "store": _TEMPLATE_STORE.stats(),
+        },
+        "batching": {
+            name: batcher.stats() for name, batcher in _all_batchers().items()
         },
+        "pools": {pool.name: pool.stats() for pool in (_TEMPLATE_POOL, _SPIRIT_POOL)},
+        "result_cache": _RESULT_CACHE.stats(),
+        "yolo_models": _YOLO_REGISTRY.stats(),
+        "template_banks": len(_TEMPLATE_BANKS),
+        "frame_store": _FRAME_STORE.stats(),
     }
 
 
+@app.get("/metrics")
+def metrics() -> Response:
+    return Response(content=METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _collect_server_metrics() -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+    pools: Dict[str, Dict[str, Any]] = {
+        name: batcher.stats() for name, batcher in _all_batchers().items()
+    }
+    for pool in (_TEMPLATE_POOL, _SPIRIT_POOL):
+        pools[pool.name] = pool.stats()
+    with _TEMPLATE_CACHE_LOCK:
+        tmpl = dict(_TEMPLATE_CACHE_STATS)
+        tmpl_size = len(_TEMPLATE_CACHE)
+    tmpl_lookups = tmpl["hits"] + tmpl["misses"] + tmpl["disk_hits"]
+    result_cache = _RESULT_CACHE.stats()
+
+    models: List[Tuple[Dict[str, str], float]] = [
+        ({"kind": "yolo", "name": Path(w).name}, float(_YOLO_REGISTRY.is_resident(w)))
+        for w in _YOLO_MODELS
+    ]
+    models.append(({"kind": "ocr", "name": type(engine).__name__}, 1.0))
+    models.append(({"kind": "spirit", "name": "unity_cup_spirit_cnn"}, float(_SPIRIT_CLF is not None)))
+
+    out = [
+        ("queue_depth", "gauge", "Requests waiting in each worker pool",
+         [({"pool": n}, float(st.get("queued", 0))) for n, st in pools.items()]),
+        ("pool_rejected_total", "counter", "Requests turned away with 429 per pool",
+         [({"pool": n}, float(st.get("rejected", 0))) for n, st in pools.items()]),
+        ("batch_size_avg", "gauge", "Average micro-batch size per batcher",
+         [({"pool": n}, float(st["avg_batch"])) for n, st in pools.items() if "avg_batch" in st]),
+        ("template_cache_entries", "gauge", "Prepared templates held in memory",
+         [({}, float(tmpl_size))]),
+        ("template_cache_lookups_total", "counter", "Template cache lookups by outcome",
+         [({"result": r}, float(tmpl[r])) for r in ("hits", "misses", "disk_hits")]),
+        ("template_cache_hit_ratio", "gauge", "Share of template lookups served without preparing",
+         [({}, (tmpl["hits"] + tmpl["disk_hits"]) / tmpl_lookups if tmpl_lookups else 0.0)]),
+        ("result_cache_entries", "gauge", "Inference results held in the frame-digest cache",
+         [({}, float(result_cache["size"]))]),
+        ("result_cache_hit_ratio", "gauge", "Share of inference lookups answered from cache",
+         [({}, float(result_cache["hit_ratio"]))]),
+        ("model_loaded", "gauge", "Models resident in this process", models),
+    ]
+    if _psutil is not None:
+        rss = float(_psutil.Process().memory_info().rss)
+        out.append(("process_resident_memory_bytes", "gauge", "Resident set size", [({}, rss)]))
+    return out
+
+
+METRICS.add_collector(_collect_server_metrics)
+
+
 # -------- OCR endpoint --------
 class OCRRequest(BaseModel):
     mode: Literal["raw", "text", "digits", "batch_text", "batch_digits"] = Field(
@@ -80,72 +238,351 @@ def _decode_b64_to_bgr(b64: str) -> Tuple[np.ndarray, Image.Image]:
             b64 = b64.split("base64,", 1)[1]
         b64 = b64.strip()
 
-        try:
-            raw = base64.b64decode(b64, validate=True)
-        except Exception:
-            # Some encoders insert newlines or lack padding; be permissive as a fallback.
-            raw = base64.b64decode(b64, validate=False)
-
-        # Decode with PIL first to retain EXIF and correct orientation, then force RGB.
-        bio = io.BytesIO(raw)
-        pil_img = Image.open(bio)
-        pil_img = ImageOps.exif_transpose(pil_img).convert("RGB")
-
-        # Convert to BGR for OpenCV consumers (guaranteed 3 channels).
-        rgb = np.array(pil_img)  # H×W×3, uint8
-        bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        with stage("b64_decode"):
+            try:
+                raw = base64.b64decode(b64, validate=True)
+            except Exception:
+                # Some encoders insert newlines or lack padding; be permissive as a fallback.
+                raw = base64.b64decode(b64, validate=False)
+
+        with stage("image_decode"):
+            # Decode with PIL first to retain EXIF and correct orientation, then force RGB.
+            bio = io.BytesIO(raw)
+            pil_img = Image.open(bio)
+            pil_img = ImageOps.exif_transpose(pil_img).convert("RGB")
+
+            # Convert to BGR for OpenCV consumers (guaranteed 3 channels).
+            rgb = np.array(pil_img)  # H×W×3, uint8
+            bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
         return bgr, pil_img
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid base64 image: {e}") from e
 
 
+def _parse_payload(
+    model: Any, headers: Any, body: bytes
+) -> Tuple[Any, Optional[List[np.ndarray]]]:
+    """
+    Parse either a legacy JSON body or a binary frame body (see core.utils.frame_codec).
+    Returns (validated request model, decoded BGR frames or None for JSON bodies).
+    """
+    frames: Optional[List[np.ndarray]] = None
+    if is_frames_request(headers):
+        try:
+            with stage("image_decode"):
+                params, frames = unpack_frames(body, headers)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid frame payload: {e}")
+        refs = frame_refs(headers) if _FRAME_STORE.enabled else None
+        if refs:
+            frames, missing = _FRAME_STORE.get_many(refs)
+            if missing:
+                raise HTTPException(
+                    status_code=NEED_BODY_STATUS,
+                    detail={"error": "frames_missing", "missing": missing},
+                    headers={HEADER_FRAME_MISSING: ",".join(missing)},
+                )
+        else:
+            digests = frame_digests(headers)
+            if digests and _FRAME_STORE.enabled and not frames_lossy(headers):
+                try:
+                    with stage("hash"):
+                        digests = verified_digests(digests, frames)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid frame payload: {e}")
+                _FRAME_STORE.put_many(digests, frames)
+    else:
+        try:
+            with stage("parse"):
+                params = json.loads(body or b"{}")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=422, detail="Request body must be an object")
+    try:
+        with stage("parse"):
+            return model(**params), frames
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+
+def _frame_digest(img: np.ndarray) -> str:
+    with stage("hash"):
+        return frame_digest(img)
+
+
+def _single_frame(
+    frames: Optional[List[np.ndarray]], b64: Optional[str], field: str
+) -> np.ndarray:
+    if frames:
+        return frames[0]
+    if not b64:
+        raise HTTPException(
+            status_code=400, detail=f"Field '{field}' is required for this request."
+        )
+    bgr, _ = _decode_b64_to_bgr(b64)
+    return bgr
+
+
+class _Batched(NamedTuple):
+    """Work queued on micro-batchers; `finish(results)` builds the response."""
+
+    futures: List[Optional[Future]]  # None for items answered without a batcher
+    finish: Callable[[List[Any]], Dict[str, Any]]
+
+
+async def _await_batched(
+    prepared: Union[Dict[str, Any], _Batched], failure: str
+) -> Dict[str, Any]:
+    """
+    Wait for batched work on the event loop. Parsing runs on the threadpool, but
+    no threadpool thread stays parked while items sit in a batcher queue.
+    """
+    if not isinstance(prepared, _Batched):
+        return prepared
+    try:
+        with stage("inference"):
+            results = [
+                None if fut is None else await asyncio.wrap_future(fut)
+                for fut in prepared.futures
+            ]
+        return prepared.finish(results)
+    except (HTTPException, ServerBusy):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{failure}: {e}")
+    finally:
+        # Drop items still queued if we failed (or the client went away) early
+        for fut in prepared.futures:
+            if fut is not None:
+                fut.cancel()
+
+
 @app.post("/ocr")
-def ocr(req: OCRRequest) -> Dict[str, Any]:
+async def ocr(request: Request) -> Dict[str, Any]:
+    with stage("parse"):
+        body = await request.body()
+    prepared = await run_in_threadpool(_ocr, request.headers, body)
+    return _json_response(await _await_batched(prepared, "OCR failure"))
+
+
+def _ocr(headers: Any, body: bytes) -> Union[Dict[str, Any], _Batched]:
+    req, frames = _parse_payload(OCRRequest, headers, body)
     try:
         if req.mode in ("raw", "text", "digits"):
-            if not req.img:
-                raise HTTPException(
-                    status_code=400, detail="Field 'img' is required for this mode."
-                )
-            img, pil_img = _decode_b64_to_bgr(req.img)
-            if req.mode == "raw":
-                data = engine.raw(img)
-            elif req.mode == "text":
-                data = engine.text(img, joiner=req.joiner, min_conf=req.min_conf)
-            else:
-                data = engine.digits(img)
-            sha = hashlib.sha256(img.tobytes()).hexdigest()[:12]
-            return {"mode": req.mode, "data": data, "meta": {"checksum": sha}}
+            img = _single_frame(frames, req.img, "img")
+            digest = _frame_digest(img)
+            key = ("ocr", req.mode, img.shape, digest, req.joiner, req.min_conf)
+            data = _RESULT_CACHE.get(key)
+            if data is not None:
+                return {
+                    "mode": req.mode,
+                    "data": data,
+                    "meta": {"checksum": digest[:12], "cache": "hit"},
+                }
+            fut = _OCR_BATCHER.submit((req.mode, [img], req.joiner, req.min_conf))
+
+            def finish(results: List[Any]) -> Dict[str, Any]:
+                _RESULT_CACHE.put(key, results[0])
+                return {
+                    "mode": req.mode,
+                    "data": results[0],
+                    "meta": {"checksum": digest[:12], "cache": "miss"},
+                }
+
+            return _Batched([fut], finish)
 
         elif req.mode in ("batch_text", "batch_digits"):
-            if not req.imgs:
+            if frames:
+                imgs = frames
+            elif req.imgs:
+                imgs = [_decode_b64_to_bgr(b)[0] for b in req.imgs]
+            else:
                 raise HTTPException(
                     status_code=400, detail="Field 'imgs' is required for this mode."
                 )
-            imgs = [_decode_b64_to_bgr(b) for b in req.imgs]
-            if req.mode == "batch_text":
-                data = engine.batch_text(imgs, joiner=req.joiner, min_conf=req.min_conf)
-            else:
-                data = engine.batch_digits(imgs)
-            return {"mode": req.mode, "data": data}
+            key = (
+                "ocr",
+                req.mode,
+                tuple((im.shape, _frame_digest(im)) for im in imgs),
+                req.joiner,
+                req.min_conf,
+            )
+            data = _RESULT_CACHE.get(key)
+            if data is not None:
+                return {"mode": req.mode, "data": data, "meta": {"cache": "hit"}}
+            fut = _OCR_BATCHER.submit((req.mode, imgs, req.joiner, req.min_conf))
+
+            def finish_batch(results: List[Any]) -> Dict[str, Any]:
+                _RESULT_CACHE.put(key, results[0])
+                return {"mode": req.mode, "data": results[0], "meta": {"cache": "miss"}}
+
+            return _Batched([fut], finish_batch)
 
         else:
             raise HTTPException(status_code=400, detail="Unsupported mode.")
-    except HTTPException:
+    except (HTTPException, ServerBusy):
         raise
     except Exception as e:
         # Keep a short message; logs on server should have the stacktrace
         raise HTTPException(status_code=500, detail=f"OCR failure: {e}")
 
 
-# Instantiate YOLO engines for each scenario/mode (no controller needed here)
-yolo_engine_ura = LocalYOLOEngine(ctrl=None, weights=Settings.YOLO_WEIGHTS_URA)
-yolo_engine_unity_cup = LocalYOLOEngine(ctrl=None, weights=Settings.YOLO_WEIGHTS_UNITY_CUP)
-yolo_engine_nav = LocalYOLOEngine(ctrl=None, weights=Settings.YOLO_WEIGHTS_NAV)
+def _digits_from_text(s: str) -> int:
+    only = re.sub(r"[^\d]", "", s or "").strip()
+    return int(only) if only else -1
+
+
+def _run_ocr_batch(items: List[Tuple[str, List[np.ndarray], str, float]]) -> List[Any]:
+    """
+    Serve queued OCR requests with as few Paddle calls as possible: every text-like
+    image sharing (joiner, min_conf) goes through one `batch_text` call.
+    Items are (mode, imgs, joiner, min_conf); digits modes use the engine defaults.
+    """
+    results: List[Any] = [None] * len(items)
+    groups: Dict[Tuple[str, float], List[Tuple[int, int, int]]] = {}
+    flat: Dict[Tuple[str, float], List[np.ndarray]] = {}
+    for i, (mode, imgs, joiner, min_conf) in enumerate(items):
+        if mode == "raw":
+            results[i] = engine.raw(imgs[0])
+            continue
+        key = (" ", 0.2) if mode in ("digits", "batch_digits") else (joiner, float(min_conf))
+        bucket = flat.setdefault(key, [])
+        groups.setdefault(key, []).append((i, len(bucket), len(bucket) + len(imgs)))
+        bucket.extend(imgs)
+
+    for key, spans in groups.items():
+        texts = engine.batch_text(flat[key], joiner=key[0], min_conf=key[1])
+        for i, lo, hi in spans:
+            mode = items[i][0]
+            chunk = texts[lo:hi]
+            if mode == "text":
+                results[i] = chunk[0]
+            elif mode == "digits":
+                results[i] = _digits_from_text(chunk[0])
+            elif mode == "batch_digits":
+                results[i] = [re.sub(r"[^\d]", "", t or "") for t in chunk]
+            else:
+                results[i] = chunk
+    return results
+
+
+_OCR_BATCHER = MicroBatcher(
+    "ocr",
+    _run_ocr_batch,
+    max_batch_size=Settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_s=Settings.INFERENCE_BATCH_MAX_WAIT_MS / 1000.0,
+    workers=Settings.INFERENCE_OCR_WORKERS,
+    max_queue=Settings.INFERENCE_QUEUE_MAX,
+    retry_after_s=Settings.INFERENCE_RETRY_AFTER_S,
+)
+
+# Work that does not batch gets its own bounded pools so a burst of template
+# matches cannot starve YOLO/OCR requests of Starlette threadpool threads.
+_TEMPLATE_POOL = BoundedExecutor(
+    "template_match",
+    workers=Settings.INFERENCE_TEMPLATE_WORKERS,
+    max_queue=Settings.INFERENCE_QUEUE_MAX,
+    retry_after_s=Settings.INFERENCE_RETRY_AFTER_S,
+)
+_SPIRIT_POOL = BoundedExecutor(
+    "spirit",
+    workers=1,
+    max_queue=Settings.INFERENCE_QUEUE_MAX,
+    retry_after_s=Settings.INFERENCE_RETRY_AFTER_S,
+)
+
+
+# YOLO weights per scenario/mode -> default agent. Engines load on first use.
+_YOLO_MODELS: Dict[str, str] = {
+    str(Settings.YOLO_WEIGHTS_NAV): Settings.AGENT_NAME_NAV,
+    str(Settings.YOLO_WEIGHTS_UNITY_CUP): Settings.AGENT_NAME_UNITY_CUP,
+    str(Settings.YOLO_WEIGHTS_URA): Settings.AGENT_NAME_URA,
+}
+_YOLO_DEFAULT_WEIGHTS = str(Settings.YOLO_WEIGHTS_URA)
+
+
+def _load_yolo_engine(weights: str) -> LocalYOLOEngine:
+    # No controller needed on the server
+    return LocalYOLOEngine(ctrl=None, weights=weights)
+
+
+def _yolo_engine_nbytes(yolo_engine: LocalYOLOEngine) -> int:
+    """Parameter + buffer bytes of the torch module; weights file size as a fallback."""
+    try:
+        module = yolo_engine.model.model
+        tensors = list(module.parameters()) + list(module.buffers())
+        return int(sum(t.numel() * t.element_size() for t in tensors))
+    except Exception:
+        try:
+            return os.path.getsize(yolo_engine.weights_path)
+        except OSError:
+            return 0
+
+
+def _on_yolo_evicted(weights: str, yolo_engine: LocalYOLOEngine) -> None:
+    # Queued frames still finish; the worker exits after them
+    _YOLO_BATCHERS.retire(weights, yolo_engine)
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+_YOLO_REGISTRY: ModelRegistry[LocalYOLOEngine] = ModelRegistry(
+    "yolo",
+    _load_yolo_engine,
+    size_of=_yolo_engine_nbytes,
+    budget_bytes=int(Settings.INFERENCE_YOLO_MEMORY_BUDGET_MB * 1024 * 1024),
+    max_models=Settings.INFERENCE_YOLO_MAX_MODELS,
+    on_evict=_on_yolo_evicted,
+)
+
+# Keyed by registry key (the resolved `.pt` path), even when the engine runs an `.onnx` export
+_YOLO_BATCHERS: ModelBatchers[LocalYOLOEngine] = ModelBatchers(
+    "yolo",
+    lambda yolo_engine, items: _run_yolo_batch(yolo_engine, items),
+    resident=_YOLO_REGISTRY.peek,
+    max_batch_size=Settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_s=Settings.INFERENCE_BATCH_MAX_WAIT_MS / 1000.0,
+    workers=Settings.INFERENCE_YOLO_WORKERS,
+    max_queue=Settings.INFERENCE_QUEUE_MAX,
+    retry_after_s=Settings.INFERENCE_RETRY_AFTER_S,
+)
+
+
+def _run_yolo_batch(
+    yolo_engine: LocalYOLOEngine, items: List[Dict[str, Any]]
+) -> List[Tuple[Dict[str, Any], List[Any]]]:
+    outs = yolo_engine.detect_bgr_batch(
+        [it["bgr"] for it in items],
+        imgsz=[it["imgsz"] for it in items],
+        conf=[it["conf"] for it in items],
+        iou=[it["iou"] for it in items],
+    )
+    for it, (_, dets) in zip(items, outs):
+        if it.get("pil") is not None:
+            yolo_engine._maybe_store_debug(
+                it["pil"],
+                dets,
+                tag=it["tag"],
+                thr=Settings.STORE_FOR_TRAINING_THRESHOLD,
+                agent=it["agent"],
+            )
+    return outs
+
+
+def _all_batchers() -> Dict[str, MicroBatcher]:
+    out: Dict[str, MicroBatcher] = {"ocr": _OCR_BATCHER}
+    for batcher in _YOLO_BATCHERS.batchers():
+        out[batcher.name] = batcher
+    return out
 
 
 class YoloRequest(BaseModel):
-    img: str = Field(..., description="Base64-encoded PNG/JPEG image (BGR compatible)")
+    img: Optional[str] = Field(
+        None,
+        description="Base64-encoded PNG/JPEG image (omitted for binary frame bodies)",
+    )
     imgsz: int = Field(832, ge=64, le=3072)
     conf: float = Field(0.66, ge=0.0, le=1.0)
     iou: float = Field(0.45, ge=0.0, le=1.0)
@@ -154,80 +591,311 @@ class YoloRequest(BaseModel):
     tag: Optional[str] = Field(None, description="Detection tag used for debug capture folders")
 
 
+def _resolve_yolo_weights(weights_path: Optional[str]) -> str:
+    """Map a client weights path onto one of the server's models (URA by default)."""
+    w_str = str(weights_path or "")
+    resolved = _YOLO_DEFAULT_WEIGHTS
+    # Exact path or same file name; later entries win, as before (nav < unity cup < URA)
+    for known in _YOLO_MODELS:
+        if w_str == known or Path(w_str).name == Path(known).name:
+            resolved = known
+    return resolved
+
+
+def _resolve_yolo_engine(
+    weights_path: Optional[str],
+) -> Tuple[str, str, LocalYOLOEngine, str]:
+    """
+    Map a client weights path onto one of the server engines
+    -> (weights_str, registry_key, engine, agent).
+    """
+    w_str = str(weights_path or "")
+    resolved = _resolve_yolo_weights(weights_path)
+    return w_str, resolved, _YOLO_REGISTRY.get(resolved), _YOLO_MODELS[resolved]
+
+
+def _weights_for_hint(hint: str) -> str:
+    """Preload hints accept agent names ('ura', 'unity_cup', 'nav') as well as weight paths."""
+    h = (hint or "").strip()
+    for weights, agent in _YOLO_MODELS.items():
+        if h in (agent, agent.replace("agent_", "")):
+            return weights
+    return _resolve_yolo_weights(h)
+
+
+def _preload_pinned_yolo() -> None:
+    hints = [h for h in Settings.INFERENCE_YOLO_PRELOAD.split(",") if h.strip()]
+    try:
+        _YOLO_REGISTRY.preload([_weights_for_hint(h) for h in hints], pin=True)
+    except Exception as e:
+        logger_uma.error(f"YOLO preload failed: {e}")
+
+
+# Warm the hot model(s) in the background so the server accepts requests right away
+threading.Thread(target=_preload_pinned_yolo, name="yolo-preload", daemon=True).start()
+
+
+class ModelPreloadRequest(BaseModel):
+    weights: List[str] = Field(
+        ..., description="Weight paths or agent names ('ura', 'unity_cup', 'nav')"
+    )
+    pin: bool = Field(False, description="Keep these resident regardless of LRU/budget")
+
+
+@app.get("/admin/models")
+def list_models() -> Dict[str, Any]:
+    return {
+        "known": list(_YOLO_MODELS),
+        "resident": _YOLO_REGISTRY.resident(),
+        "stats": _YOLO_REGISTRY.stats(),
+    }
+
+
+@app.post("/admin/models/preload")
+def preload_models(req: ModelPreloadRequest) -> Dict[str, Any]:
+    weights = [_weights_for_hint(w) for w in req.weights]
+    try:
+        loaded = _YOLO_REGISTRY.preload(weights, pin=req.pin)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"YOLO preload failure: {e}")
+    return {"loaded": loaded, "resident": _YOLO_REGISTRY.resident()}
+
+
+@app.post("/admin/models/evict")
+def evict_models(req: ModelPreloadRequest) -> Dict[str, Any]:
+    weights = [_weights_for_hint(w) for w in req.weights]
+    for w in weights:
+        _YOLO_REGISTRY.unpin(w)
+    evicted = [w for w in weights if _YOLO_REGISTRY.evict(w)]
+    return {"evicted": evicted, "resident": _YOLO_REGISTRY.resident()}
+
+
 @app.post("/yolo")
-def yolo_detect(req: YoloRequest):
+async def yolo_detect(request: Request):
+    with stage("parse"):
+        body = await request.body()
+    prepared = await run_in_threadpool(_yolo_detect, request.headers, body)
+    return _json_response(await _await_batched(prepared, "YOLO failure"))
+
+
+def _yolo_detect(headers: Any, body: bytes) -> Union[Dict[str, Any], _Batched]:
+    req, frames = _parse_payload(YoloRequest, headers, body)
     try:
-        # Normalize incoming weights selection (string) and match against server's engines
-        w_in = req.weights_path or ""
-        try:
-            w_str = str(w_in)
-        except Exception:
-            w_str = ""
-        
-        # Check which engine matches the requested weights
-        yolo_engine_req = yolo_engine_ura  # default fallback
-        default_agent = Settings.AGENT_NAME_URA
-        
-        try:
-            nav_str = str(Settings.YOLO_WEIGHTS_NAV)
-            if (w_str == nav_str) or (Path(w_str).name == Path(nav_str).name):
-                yolo_engine_req = yolo_engine_nav
-                default_agent = Settings.AGENT_NAME_NAV
-        except Exception:
-            pass
-        
-        try:
-            unity_cup_str = str(Settings.YOLO_WEIGHTS_UNITY_CUP)
-            if (w_str == unity_cup_str) or (Path(w_str).name == Path(unity_cup_str).name):
-                yolo_engine_req = yolo_engine_unity_cup
-                default_agent = Settings.AGENT_NAME_UNITY_CUP
-        except Exception:
-            pass
-        
-        try:
-            ura_str = str(Settings.YOLO_WEIGHTS_URA)
-            if (w_str == ura_str) or (Path(w_str).name == Path(ura_str).name):
-                yolo_engine_req = yolo_engine_ura
-                default_agent = Settings.AGENT_NAME_URA
-        except Exception:
-            pass
+        w_str, model_key, yolo_engine_req, default_agent = _resolve_yolo_engine(
+            req.weights_path
+        )
         agent_name = (req.agent or default_agent or "").strip()
         default_tag = "yolo_endpoint"
         tag_name = (req.tag or default_tag or "").strip() or default_tag
 
-        bgr, pil_img = _decode_b64_to_bgr(req.img)
-        meta, dets = yolo_engine_req.detect_bgr(
-            bgr,
-            imgsz=req.imgsz,
-            conf=req.conf,
-            iou=req.iou,
-            original_pil_img=pil_img,
-            tag=tag_name,
-            agent=agent_name,
-        )
-        # tiny debug: checksum of raw BGR bytes
-        sha = hashlib.sha256(bgr.tobytes()).hexdigest()[:12]
-        meta.update(
+        pil_img: Optional[Image.Image] = None
+        if frames:
+            bgr = frames[0]
+        elif req.img:
+            bgr, pil_img = _decode_b64_to_bgr(req.img)
+        else:
+            raise HTTPException(status_code=400, detail="Field 'img' is required.")
+
+        digest = _frame_digest(bgr)
+        key = _yolo_cache_key(yolo_engine_req, bgr, digest, req.imgsz, req.conf, req.iou)
+        cached = _RESULT_CACHE.get(key)
+
+        def finish(results: List[Any]) -> Dict[str, Any]:
+            if cached is not None:
+                meta, dets = cached
+            else:
+                meta, dets = results[0]
+                _RESULT_CACHE.put(key, (meta, dets))
+            meta.update(
+                {
+                    "shape": tuple(int(x) for x in bgr.shape),
+                    # tiny debug: checksum of raw BGR bytes
+                    "checksum": digest[:12],
+                    "cache": "hit" if cached is not None else "miss",
+                    "weights": w_str,
+                    "agent": agent_name,
+                    "tag": tag_name,
+                    # "ultralytics" or "onnx"; the ONNX backend has no torch model
+                    "backend": yolo_engine_req.backend,
+                }
+            )
+            return {"meta": meta, "dets": dets}
+
+        if cached is not None:
+            return finish([])
+        if pil_img is None and Settings.STORE_FOR_TRAINING:
+            # PIL copy is only consumed by low-confidence debug capture
+            pil_img = bgr_to_pil(bgr)
+        fut = _YOLO_BATCHERS.submit(
+            model_key,
+            yolo_engine_req,
             {
-                "shape": tuple(int(x) for x in bgr.shape),
-                "checksum": sha,
-                "weights": w_str,
-                "agent": agent_name,
+                "bgr": bgr,
+                "imgsz": req.imgsz,
+                "conf": req.conf,
+                "iou": req.iou,
+                "pil": pil_img,
                 "tag": tag_name,
-                "ultralytics": getattr(
-                    type(yolo_engine_req.model), "__module__", "ultralytics"
-                ),
+                "agent": agent_name,
             }
         )
-        return {"meta": meta, "dets": dets}
-    except HTTPException:
+        return _Batched([fut], finish)
+    except (HTTPException, ServerBusy):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"YOLO failure: {e}")
 
 
+def _yolo_cache_key(
+    yolo_engine: LocalYOLOEngine,
+    bgr: np.ndarray,
+    digest: str,
+    imgsz: int,
+    conf: float,
+    iou: float,
+) -> Tuple[Any, ...]:
+    return ("yolo", yolo_engine.weights_path, bgr.shape, digest, imgsz, conf, iou)
+
+
+class YoloBatchItem(BaseModel):
+    imgsz: int = Field(832, ge=64, le=3072)
+    conf: float = Field(0.66, ge=0.0, le=1.0)
+    iou: float = Field(0.45, ge=0.0, le=1.0)
+    weights_path: Optional[str] = None
+    agent: Optional[str] = None
+    tag: Optional[str] = None
+
+
+class YoloBatchRequest(BaseModel):
+    items: List[YoloBatchItem]
+    imgs: Optional[List[str]] = Field(
+        None,
+        description="Base64-encoded images aligned with items (omitted for binary frame bodies)",
+    )
+
+    @validator("items")
+    def _non_empty_items(cls, v: List[YoloBatchItem]) -> List[YoloBatchItem]:
+        if not v:
+            raise ValueError("At least one item is required")
+        return v
+
+
+def _submit_yolo_batch_items(
+    items: List[YoloBatchItem],
+    bgrs: List[np.ndarray],
+    pils: List[Optional[Image.Image]],
+    pending: List[Tuple[Any, ...]],
+) -> None:
+    """Queue every cache miss on its model's batcher, appending to `pending` as it goes."""
+    for i, item in enumerate(items):
+        w_str, model_key, engine_i, default_agent = _resolve_yolo_engine(item.weights_path)
+        agent_name = (item.agent or default_agent or "").strip()
+        tag_name = (item.tag or "").strip() or "yolo_batch_endpoint"
+        digest = _frame_digest(bgrs[i])
+        key = _yolo_cache_key(
+            engine_i, bgrs[i], digest, item.imgsz, item.conf, item.iou
+        )
+        cached = _RESULT_CACHE.get(key)
+        fut = None
+        if cached is None:
+            pil_i = pils[i]
+            if pil_i is None and Settings.STORE_FOR_TRAINING:
+                pil_i = bgr_to_pil(bgrs[i])
+            fut = _YOLO_BATCHERS.submit(
+                model_key,
+                engine_i,
+                {
+                    "bgr": bgrs[i],
+                    "imgsz": item.imgsz,
+                    "conf": item.conf,
+                    "iou": item.iou,
+                    "pil": pil_i,
+                    "tag": tag_name,
+                    "agent": agent_name,
+                }
+            )
+        pending.append(
+            (fut, cached, key, digest, w_str, agent_name, tag_name, engine_i.backend)
+        )
+
+
+@app.post("/yolo/batch")
+async def yolo_detect_batch(request: Request):
+    with stage("parse"):
+        body = await request.body()
+    prepared = await run_in_threadpool(_yolo_detect_batch, request.headers, body)
+    return _json_response(await _await_batched(prepared, "YOLO batch failure"))
+
+
+def _yolo_detect_batch(headers: Any, body: bytes) -> Union[Dict[str, Any], _Batched]:
+    """N frames with per-frame imgsz/conf/weights, answered in input order."""
+    req, frames = _parse_payload(YoloBatchRequest, headers, body)
+    n = len(req.items)
+    try:
+        pils: List[Optional[Image.Image]]
+        if frames is not None:
+            bgrs = list(frames)
+            pils = [None] * len(bgrs)
+        elif req.imgs:
+            decoded = [_decode_b64_to_bgr(b) for b in req.imgs]
+            bgrs = [d[0] for d in decoded]
+            pils = [d[1] for d in decoded]
+        else:
+            raise HTTPException(status_code=400, detail="Field 'imgs' is required.")
+        if len(bgrs) != n:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Got {len(bgrs)} images for {n} items.",
+            )
+
+        # Each frame joins its model's micro-batch, so one request's frames (and
+        # concurrent clients' frames) share forward passes.
+        pending: List[Tuple[Any, ...]] = []
+        try:
+            _submit_yolo_batch_items(req.items, bgrs, pils, pending)
+        except ServerBusy:
+            # All-or-nothing: drop the frames that did get queued
+            for p in pending:
+                if p[0] is not None:
+                    p[0].cancel()
+            raise
+
+        def finish(outputs: List[Any]) -> Dict[str, Any]:
+            results: List[Dict[str, Any]] = []
+            for i, (fut, cached, key, digest, w_str, agent_name, tag_name, backend) in enumerate(
+                pending
+            ):
+                if fut is not None:
+                    meta, dets = outputs[i]
+                    _RESULT_CACHE.put(key, (meta, dets))
+                else:
+                    meta, dets = cached
+                meta.update(
+                    {
+                        "shape": tuple(int(x) for x in bgrs[i].shape),
+                        "checksum": digest[:12],
+                        "cache": "miss" if fut is not None else "hit",
+                        "weights": w_str,
+                        "agent": agent_name,
+                        "tag": tag_name,
+                        "backend": backend,
+                    }
+                )
+                results.append({"meta": meta, "dets": dets})
+            return {"results": results, "meta": {"batch_size": n}}
+
+        return _Batched([p[0] for p in pending], finish)
+    except (HTTPException, ServerBusy):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"YOLO batch failure: {e}")
+
+
 class RegionPayload(BaseModel):
-    img: str = Field(..., description="Base64-encoded region image (PNG/JPEG)")
+    img: Optional[str] = Field(
+        None,
+        description="Base64-encoded region image (omitted for binary frame bodies)",
+    )
     meta: Dict[str, Any] = Field(default_factory=dict)
 
 
@@ -271,7 +939,16 @@ class TemplateDescriptor(BaseModel):
 class TemplateMatchRequest(BaseModel):
     mode: Literal["support_cards", "race_banners", "generic"] = "generic"
     region: RegionPayload
-    templates: List[TemplateDescriptor]
+    templates: List[TemplateDescriptor] = Field(default_factory=list)
+    bank_id: Optional[str] = Field(
+        None, description="Registered template bank to match against instead of inline templates"
+    )
+    bank_digest: Optional[str] = Field(
+        None, description="Client's digest of the bank; a mismatch answers 409 (re-upload)"
+    )
+    candidates: Optional[List[str]] = Field(
+        None, description="Restrict a bank to these template ids/names"
+    )
     options: Optional[TemplateMatchOptions] = None
     agent: Optional[str] = Field(
         None, description="Optional agent identifier for logging/debug captures"
@@ -284,13 +961,38 @@ class TemplateMatchRequest(BaseModel):
         return v
 
 
+class TemplateBankRequest(BaseModel):
+    mode: Literal["support_cards", "race_banners", "generic"] = "generic"
+    templates: List[TemplateDescriptor]
+
+    @validator("templates")
+    def _non_empty_templates(cls, v: List[TemplateDescriptor]) -> List[TemplateDescriptor]:
+        if not v:
+            raise ValueError("At least one template descriptor is required")
+        return v
+
+
+# bank_id -> (digest, descriptors); uploaded once per template set by remote matchers
+_TEMPLATE_BANKS: "OrderedDict[str, Tuple[str, List[TemplateDescriptor]]]" = OrderedDict()
+_TEMPLATE_BANKS_LOCK = threading.Lock()
+
 _TEMPLATE_CACHE: "OrderedDict[str, PreparedTemplate]" = OrderedDict()
-_TEMPLATE_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+_TEMPLATE_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "disk_hits": 0}
 _TEMPLATE_CACHE_MAX = 256
+# Guards the cache/stats above; _TEMPLATE_POOL runs several matches at once
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+# Prepared features survive restarts here; the in-memory LRU above sits in front
+_TEMPLATE_STORE = TemplateFeatureStore(
+    Settings.INFERENCE_TEMPLATE_STORE_DIR,
+    enabled=Settings.INFERENCE_TEMPLATE_STORE,
+)
 
 
 class SpiritClassifyRequest(BaseModel):
-    img: str = Field(..., description="Base64-encoded spirit icon (PNG/JPEG)")
+    img: Optional[str] = Field(
+        None,
+        description="Base64-encoded spirit icon (omitted for binary frame bodies)",
+    )
     threshold: float = Field(0.0, ge=0.0, le=1.0)
 
 
@@ -343,13 +1045,13 @@ def _prepare_template(
     descriptor: TemplateDescriptor,
 ) -> PreparedTemplate:
     key = _template_cache_key(mode, descriptor)
-    cached = _TEMPLATE_CACHE.get(key)
-    if cached is not None:
-        _TEMPLATE_CACHE_STATS["hits"] += 1
-        _TEMPLATE_CACHE.move_to_end(key)
-        return cached
+    with _TEMPLATE_CACHE_LOCK:
+        cached = _TEMPLATE_CACHE.get(key)
+        if cached is not None:
+            _TEMPLATE_CACHE_STATS["hits"] += 1
+            _TEMPLATE_CACHE.move_to_end(key)
+            return cached
 
-    image = _decode_template_image(descriptor.img)
     metadata = dict(descriptor.metadata or {})
     if descriptor.hash_hex and "hash_hex" not in metadata:
         metadata["hash_hex"] = descriptor.hash_hex
@@ -362,12 +1064,35 @@ def _prepare_template(
 
     # Resolve path: if public_path is provided and no inline image, map to server's local asset structure
     resolved_path = descriptor.path
-    if descriptor.public_path and image is None:
+    if descriptor.public_path and not descriptor.img:
         # public_path format: /events/trainee_icon_event/Vodka.png
         # Map to server's web/public/ structure
         public_rel = descriptor.public_path.lstrip("/")
         resolved_path = str(Settings.ROOT_DIR / "web" / "public" / public_rel)
 
+    store_key: Optional[str] = None
+    if _TEMPLATE_STORE.enabled:
+        store_key = _TEMPLATE_STORE.content_key(
+            path=resolved_path if not descriptor.img else None,
+            b64_img=descriptor.img,
+            hash_hex=metadata.get("hash_hex"),
+        )
+    prepared: Optional[PreparedTemplate] = None
+    if store_key is not None:
+        prepared = _TEMPLATE_STORE.load(
+            store_key,
+            name=descriptor.id,
+            path=str(resolved_path or metadata.get("path", "")),
+            metadata=metadata,
+        )
+    if prepared is not None:
+        with _TEMPLATE_CACHE_LOCK:
+            _TEMPLATE_CACHE_STATS["disk_hits"] += 1
+            _TEMPLATE_CACHE[key] = prepared
+            _pop_cache_if_needed()
+        return prepared
+
+    image = _decode_template_image(descriptor.img)
     entry = TemplateEntry(
         name=descriptor.id,
         path=resolved_path,
@@ -391,17 +1116,82 @@ def _prepare_template(
             detail=" ".join(detail_parts),
         )
 
-    _TEMPLATE_CACHE_STATS["misses"] += 1
-    _TEMPLATE_CACHE[key] = prepared
-    _pop_cache_if_needed()
+    if store_key is not None:
+        _TEMPLATE_STORE.save(store_key, prepared)
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE_STATS["misses"] += 1
+        _TEMPLATE_CACHE[key] = prepared
+        _pop_cache_if_needed()
     return prepared
 
 
+@app.post("/template-banks")
+async def register_template_bank(request: Request) -> Dict[str, Any]:
+    with stage("parse"):
+        body = await request.body()
+    return _json_response(await run_in_threadpool(_register_template_bank, body))
+
+
+def _register_template_bank(body: bytes) -> Dict[str, Any]:
+    try:
+        with stage("parse"):
+            params = json.loads(body or b"{}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(params, dict) or not isinstance(params.get("templates"), list):
+        raise HTTPException(status_code=422, detail="Field 'templates' must be a list")
+    try:
+        req = TemplateBankRequest(**params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+    # Digest over the templates exactly as sent, so clients can compute it offline
+    with stage("hash"):
+        digest = template_bank_digest(params["templates"])
+    bank_id = template_bank_id(digest)
+    with _TEMPLATE_BANKS_LOCK:
+        _TEMPLATE_BANKS[bank_id] = (digest, list(req.templates))
+        _TEMPLATE_BANKS.move_to_end(bank_id)
+        while len(_TEMPLATE_BANKS) > max(1, Settings.INFERENCE_TEMPLATE_BANKS_MAX):
+            _TEMPLATE_BANKS.popitem(last=False)
+    return {"bank_id": bank_id, "digest": digest, "templates": len(req.templates)}
+
+
+def _bank_templates(
+    bank_id: str, digest: Optional[str], candidates: Optional[List[str]]
+) -> List[TemplateDescriptor]:
+    with _TEMPLATE_BANKS_LOCK:
+        entry = _TEMPLATE_BANKS.get(bank_id)
+        if entry is not None:
+            _TEMPLATE_BANKS.move_to_end(bank_id)
+    if entry is None or (digest and digest != entry[0]):
+        raise HTTPException(
+            status_code=BANK_MISS_STATUS,
+            detail={"error": "template_bank_miss", "bank_id": bank_id},
+        )
+    templates = entry[1]
+    if not candidates:
+        return templates
+    # Same selection rule as RemoteTemplateMatcherBase._select_templates
+    wanted = {str(c).strip() for c in candidates if c}
+    selected = [
+        t for t in templates if t.id in wanted or (t.metadata or {}).get("name") in wanted
+    ]
+    return selected or templates
+
+
 @app.post("/template-match")
-def template_match(req: TemplateMatchRequest) -> Dict[str, Any]:
+async def template_match(request: Request) -> Dict[str, Any]:
+    with stage("parse"):
+        body = await request.body()
+    return _json_response(await asyncio.wrap_future(_TEMPLATE_POOL.submit(_template_match, request.headers, body)))
+
+
+def _template_match(headers: Any, body: bytes) -> Dict[str, Any]:
     start = time.perf_counter()
+    req, frames = _parse_payload(TemplateMatchRequest, headers, body)
     try:
-        region_bgr, _ = _decode_b64_to_bgr(req.region.img)
+        region_bgr = _single_frame(frames, req.region.img, "region.img")
         options = req.options or TemplateMatchOptions(ms_steps=9)
         matcher = TemplateMatcherBase(
             tm_weight=options.tm_weight,
@@ -413,23 +1203,38 @@ def template_match(req: TemplateMatchRequest) -> Dict[str, Any]:
             ms_steps=options.ms_steps,
         )
 
-        region_features = matcher._prepare_region(region_bgr)
+        with stage("inference"):
+            region_features = matcher._prepare_region(region_bgr)
+
+        if req.bank_id:
+            descriptors = _bank_templates(req.bank_id, req.bank_digest, req.candidates)
+        elif req.templates:
+            descriptors = req.templates
+        else:
+            raise HTTPException(
+                status_code=422, detail="Either 'templates' or 'bank_id' is required"
+            )
 
         prepared_templates: List[PreparedTemplate] = []
-        for descriptor in req.templates:
-            prepared = _prepare_template(matcher, req.mode, descriptor)
-            prepared_templates.append(prepared)
+        with stage("template_prepare"):
+            for descriptor in descriptors:
+                prepared = _prepare_template(matcher, req.mode, descriptor)
+                prepared_templates.append(prepared)
 
         if not prepared_templates:
             raise HTTPException(status_code=404, detail="No templates available for matching")
 
-        matches: List[TemplateMatch] = matcher._match_region(region_features, prepared_templates)
+        with stage("inference"):
+            matches: List[TemplateMatch] = matcher._match_region(
+                region_features, prepared_templates
+            )
 
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         cache_snapshot = {
             "size": len(_TEMPLATE_CACHE),
             "hits": _TEMPLATE_CACHE_STATS["hits"],
             "misses": _TEMPLATE_CACHE_STATS["misses"],
+            "disk_hits": _TEMPLATE_CACHE_STATS["disk_hits"],
         }
         result = {
             "meta": {
@@ -437,6 +1242,7 @@ def template_match(req: TemplateMatchRequest) -> Dict[str, Any]:
                 "agent": req.agent,
                 "elapsed_ms": elapsed_ms,
                 "templates_considered": len(prepared_templates),
+                "bank_id": req.bank_id,
                 "cache": cache_snapshot,
             },
             "matches": [
@@ -459,22 +1265,35 @@ def template_match(req: TemplateMatchRequest) -> Dict[str, Any]:
 
 
 @app.post("/classify/spirit")
-def classify_spirit(req: SpiritClassifyRequest) -> Dict[str, Any]:
+async def classify_spirit(request: Request) -> Dict[str, Any]:
+    with stage("parse"):
+        body = await request.body()
+    return _json_response(await asyncio.wrap_future(_SPIRIT_POOL.submit(_classify_spirit, request.headers, body)))
+
+
+def _classify_spirit(headers: Any, body: bytes) -> Dict[str, Any]:
+    req, frames = _parse_payload(SpiritClassifyRequest, headers, body)
     try:
-        bgr, pil_img = _decode_b64_to_bgr(req.img)
+        bgr = _single_frame(frames, req.img, "img")
         clf = _get_spirit_classifier()
-        pred = clf.predict(pil_img)
+        digest = _frame_digest(bgr)
+        key = ("spirit", bgr.shape, digest)
+        pred = _RESULT_CACHE.get(key)
+        cache_state = "hit" if pred is not None else "miss"
+        if pred is None:
+            with stage("inference"):
+                pred = clf.predict(bgr_to_pil(bgr))
+            _RESULT_CACHE.put(key, pred)
 
         pred_id = int(pred.get("pred_id", -1))
         raw = pred.get("raw", [])
         confidence = float(pred.get("confidence", 0.0))
         pred_label = str(pred.get("pred_label", "unknown"))
 
+        # threshold is applied after the cache so it never needs to be part of the key
         if confidence < req.threshold:
             pred_label = "unknown"
 
-        sha = hashlib.sha256(bgr.tobytes()).hexdigest()[:12]
-
         return {
             "pred_id": pred_id,
             "pred_label": pred_label,
@@ -484,8 +1303,9 @@ def classify_spirit(req: SpiritClassifyRequest) -> Dict[str, Any]:
             "img_size": clf.img_size,
             "threshold": float(req.threshold),
             "meta": {
-                "checksum": sha,
+                "checksum": digest[:12],
                 "backend": "unity_cup_spirit_cnn",
+                "cache": cache_state,
             },
         }
     except HTTPException:
@@ -0,0 +1,180 @@
+# server/metrics.py
+"""
+Minimal Prometheus text-format metrics for the inference server.
+
+Request counts and end-to-end latency are recorded by the HTTP middleware.
+Code on the request path wraps its work in `stage("...")`; the per-stage time is
+summed over the request and observed once per stage when the request finishes.
+The request being timed travels in a ContextVar, which Starlette's threadpool
+and BoundedExecutor both carry into worker threads.
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a cache hit (~0.1 ms) up to a cold model load
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+# (name, type, help, [(labels, value), ...]) produced at scrape time
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _fmt_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Dict[str, str], amount: float = 1.0) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[Labels, Tuple[List[int], float, int]] = {}
+
+    def observe(self, labels: Dict[str, str], value: float) -> None:
+        key = tuple(sorted(labels.items()))
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[idx] += 1
+            self._values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in items:
+            running = 0
+            for bound, c in zip((*self.buckets, math.inf), counts):
+                running += c
+                le = (*key, ("le", _fmt_value(bound)))
+                lines.append(f"{self.name}_bucket{_fmt_labels(le)} {running}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {n}")
+        return lines
+
+
+class _RequestTiming:
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+
+_CURRENT: "contextvars.ContextVar[Optional[_RequestTiming]]" = contextvars.ContextVar(
+    "uma_request_timing", default=None
+)
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "uma") -> None:
+        self.prefix = prefix
+        self.requests = Counter(f"{prefix}_requests_total", "Requests by endpoint and status code")
+        self.latency = Histogram(f"{prefix}_request_seconds", "End-to-end request latency")
+        self.stages = Histogram(
+            f"{prefix}_stage_seconds", "Per-request time spent in each processing stage"
+        )
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    # ---------- request path ----------
+    @contextmanager
+    def track_request(self, endpoint: str) -> Iterator[Dict[str, int]]:
+        """Time one request; the caller stores the response status in the yielded dict."""
+        timing = _RequestTiming(endpoint)
+        token = _CURRENT.set(timing)
+        outcome = {"status": 500}
+        t0 = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            elapsed = time.perf_counter() - t0
+            _CURRENT.reset(token)
+            self.requests.inc({"endpoint": endpoint, "status": str(outcome["status"])})
+            self.latency.observe({"endpoint": endpoint}, elapsed)
+            for name, seconds in list(timing.stages.items()):
+                self.stages.observe({"endpoint": endpoint, "stage": name}, seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        timing = _CURRENT.get()
+        if timing is None:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing.add(name, time.perf_counter() - t0)
+
+    # ---------- scrape ----------
+    def add_collector(self, fn: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callback returning gauge/counter samples read at scrape time."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (self.requests, self.latency, self.stages):
+            lines += metric.render()
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{full}{_fmt_labels(sorted(labels.items()))} {_fmt_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+stage = METRICS.stage
@@ -0,0 +1,192 @@
+# server/model_registry.py
+"""
+Lazily loaded, LRU-evicted set of resident models.
+
+Models load on first `get()` (once, even under concurrent first requests) and
+stay resident until the total estimated footprint exceeds the memory budget or
+`max_models`, at which point the least recently used unpinned model is dropped.
+Pinned models (the hot URA detector, or anything preloaded with pin=True) are
+never evicted.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+from core.utils.logger import logger_uma
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Resident(Generic[T]):
+    model: T
+    nbytes: int
+    loaded_at: float
+    last_used: float
+    load_s: float
+    pinned: bool = False
+
+
+class ModelRegistry(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[str], T],
+        *,
+        size_of: Optional[Callable[[T], int]] = None,
+        budget_bytes: int = 0,
+        max_models: int = 0,
+        on_evict: Optional[Callable[[str, T], None]] = None,
+    ) -> None:
+        self.name = name
+        self._loader = loader
+        self._size_of = size_of or (lambda _m: 0)
+        self.budget_bytes = max(0, int(budget_bytes))  # 0 = no memory limit
+        self.max_models = max(0, int(max_models))  # 0 = no count limit
+        self._on_evict = on_evict
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._resident: "OrderedDict[str, _Resident[T]]" = OrderedDict()
+        self._pins: set = set()
+        self._stats: Dict[str, int] = {"loads": 0, "evictions": 0, "hits": 0}
+
+    # ---------- lookup ----------
+    def get(self, key: str) -> T:
+        with self._lock:
+            entry = self._resident.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._resident.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay servable meanwhile
+        with load_lock:
+            with self._lock:
+                entry = self._resident.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    self._resident.move_to_end(key)
+                    return entry.model
+            t0 = time.perf_counter()
+            model = self._loader(key)
+            load_s = time.perf_counter() - t0
+            try:
+                nbytes = int(self._size_of(model))
+            except Exception:
+                nbytes = 0
+            now = time.monotonic()
+            with self._lock:
+                self._resident[key] = _Resident(
+                    model=model,
+                    nbytes=nbytes,
+                    loaded_at=now,
+                    last_used=now,
+                    load_s=load_s,
+                    pinned=key in self._pins,
+                )
+                self._stats["loads"] += 1
+                evicted = self._evict_over_budget_locked(keep=key)
+            logger_uma.info(
+                "[%s] loaded %s in %.2fs (~%.1f MB)", self.name, key, load_s, nbytes / 1e6
+            )
+        self._notify_evicted(evicted)
+        return model
+
+    def preload(self, keys: Iterable[str], *, pin: bool = False) -> List[str]:
+        """Load (and optionally pin) models ahead of traffic; returns the keys now resident."""
+        keys = list(keys)
+        if pin:
+            with self._lock:
+                for key in keys:
+                    self._pins.add(key)
+                    if key in self._resident:
+                        self._resident[key].pinned = True
+        for key in keys:
+            self.get(key)
+        return [k for k in keys if self.is_resident(k)]
+
+    def unpin(self, key: str) -> None:
+        with self._lock:
+            self._pins.discard(key)
+            if key in self._resident:
+                self._resident[key].pinned = False
+
+    def evict(self, key: str) -> bool:
+        with self._lock:
+            entry = self._resident.pop(key, None)
+            if entry is not None:
+                self._stats["evictions"] += 1
+        if entry is None:
+            return False
+        self._notify_evicted([(key, entry.model)])
+        return True
+
+    def is_resident(self, key: str) -> bool:
+        with self._lock:
+            return key in self._resident
+
+    def peek(self, key: str) -> Optional[T]:
+        """The resident model for `key`, if any; unlike `get` it never loads or touches LRU order."""
+        with self._lock:
+            entry = self._resident.get(key)
+            return entry.model if entry is not None else None
+
+    # ---------- introspection ----------
+    def resident(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": key,
+                    "bytes": e.nbytes,
+                    "pinned": e.pinned,
+                    "load_s": round(e.load_s, 3),
+                    "idle_s": round(now - e.last_used, 3),
+                }
+                for key, e in self._resident.items()
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["resident"] = len(self._resident)
+            out["resident_bytes"] = sum(e.nbytes for e in self._resident.values())
+        out["budget_bytes"] = self.budget_bytes
+        out["max_models"] = self.max_models
+        return out
+
+    # ---------- eviction ----------
+    def _over_budget_locked(self) -> bool:
+        if self.max_models and len(self._resident) > self.max_models:
+            return True
+        if self.budget_bytes:
+            return sum(e.nbytes for e in self._resident.values()) > self.budget_bytes
+        return False
+
+    def _evict_over_budget_locked(self, *, keep: str) -> List[Any]:
+        evicted = []
+        for key in list(self._resident.keys()):  # oldest first
+            if not self._over_budget_locked():
+                break
+            entry = self._resident[key]
+            if key == keep or entry.pinned:
+                continue
+            del self._resident[key]
+            self._stats["evictions"] += 1
+            evicted.append((key, entry.model))
+        return evicted
+
+    def _notify_evicted(self, evicted: List[Any]) -> None:
+        for key, model in evicted:
+            logger_uma.info("[%s] evicted %s", self.name, key)
+            if self._on_evict is not None:
+                try:
+                    self._on_evict(key, model)
+                except Exception as exc:
+                    logger_uma.debug("[%s] on_evict(%s) failed: %s", self.name, key, exc)
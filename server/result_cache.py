@@ -0,0 +1,85 @@
+# server/result_cache.py
+"""
+Bounded LRU + TTL cache for inference results keyed by frame content.
+
+Bots waiting on a static screen resend pixel-identical frames several times a
+second; keying results on the frame digest plus the model/parameters lets the
+server answer those without touching the models.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+def frame_digest(img: np.ndarray) -> str:
+    """
+    Full SHA256 of the raw pixel bytes; its first 12 hex chars are the `checksum`
+    the endpoints already report. Callers put the shape in the cache key as well.
+    """
+    return hashlib.sha256(np.ascontiguousarray(img).data).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU with per-entry expiry. Values are deep-copied in and out."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 30.0) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, value = entry
+            if self.ttl_s > 0 and now >= expires_at:
+                del self._data[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, stored)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["size"] = len(self._data)
+        out["max_entries"] = self.max_entries
+        out["ttl_s"] = self.ttl_s
+        lookups = out["hits"] + out["misses"]
+        out["hit_ratio"] = (out["hits"] / lookups) if lookups else 0.0
+        return out
@@ -0,0 +1,170 @@
+# server/template_store.py
+"""
+On-disk store for prepared template features (gray, edges, HS histogram, phash,
+alpha mask) so /template-match does not re-decode and re-prepare hundreds of
+event/support/banner images after every server restart.
+
+Entries are uncompressed `.npz` files keyed by a content hash of the template
+source (file bytes or inline base64 text) plus anything else that changes the
+features. The store version is part of the directory name; bump
+`STORE_VERSION` whenever `TemplateMatcherBase._prepare_entry` changes its output.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from imagehash import hex_to_hash
+
+from core.perception.analyzers.matching.base import PreparedTemplate
+from core.utils.logger import logger_uma
+
+STORE_VERSION = 1
+
+_ARRAY_FIELDS = ("bgr", "gray", "edges", "hist")
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TemplateFeatureStore:
+    """Content-addressed PreparedTemplate store; safe to share between worker threads."""
+
+    def __init__(self, root: Path | str, *, enabled: bool = True) -> None:
+        self.root = Path(root) / f"v{STORE_VERSION}"
+        self.enabled = bool(enabled)
+        self._lock = threading.Lock()
+        # (path, mtime_ns, size) -> sha256, so warm paths are not re-hashed
+        self._file_digests: Dict[Tuple[str, int, int], str] = {}
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    # ---------- keys ----------
+    def content_key(
+        self,
+        *,
+        path: Optional[str] = None,
+        b64_img: Optional[str] = None,
+        hash_hex: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Key for a template source, or None when it cannot be addressed by
+        content (missing file, no source at all).
+        """
+        if b64_img:
+            src = hashlib.sha256(b64_img.strip().encode("utf-8")).hexdigest()
+        elif path:
+            src = self._file_digest(path)
+            if src is None:
+                return None
+        else:
+            return None
+        # An explicit hash override replaces the computed phash
+        extra = f"|hash:{hash_hex}" if hash_hex else ""
+        return hashlib.sha256(f"{src}{extra}".encode("utf-8")).hexdigest()
+
+    def _file_digest(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._file_digests.get(stamp)
+        if digest is None:
+            digest = _sha256_file(path)
+            with self._lock:
+                self._file_digests[stamp] = digest
+        return digest
+
+    def _file_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npz"
+
+    # ---------- load/save ----------
+    def load(
+        self,
+        key: str,
+        *,
+        name: str,
+        path: str,
+        metadata: Dict[str, Any],
+    ) -> Optional[PreparedTemplate]:
+        """
+        Rebuild a PreparedTemplate from disk. Name/path/metadata come from the
+        current request, since the same image can be served under several ids.
+        """
+        if not self.enabled:
+            return None
+        target = self._file_for(key)
+        if not target.exists():
+            self._count("misses")
+            return None
+        try:
+            with np.load(target, allow_pickle=False) as data:
+                arrays = {f: np.array(data[f]) for f in _ARRAY_FIELDS}
+                mask = np.array(data["mask"]) if "mask" in data.files else None
+                info = json.loads(str(data["info"]))
+        except Exception as exc:
+            self._count("errors")
+            logger_uma.debug("[template_store] Unreadable entry %s: %s", target, exc)
+            return None
+        self._count("hits")
+        meta = dict(metadata)
+        meta.pop("hash_hex", None)  # consumed by _prepare_entry; mirror that here
+        return PreparedTemplate(
+            name=name,
+            path=path,
+            bgr=arrays["bgr"],
+            gray=arrays["gray"],
+            edges=arrays["edges"],
+            hist=arrays["hist"],
+            hash=hex_to_hash(info["hash"]),
+            metadata=meta,
+            mask=mask,
+        )
+
+    def save(self, key: str, prepared: PreparedTemplate) -> None:
+        if not self.enabled:
+            return
+        target = self._file_for(key)
+        arrays: Dict[str, Any] = {f: getattr(prepared, f) for f in _ARRAY_FIELDS}
+        if prepared.mask is not None:
+            arrays["mask"] = prepared.mask
+        arrays["info"] = np.array(json.dumps({"hash": str(prepared.hash)}))
+        tmp: Optional[str] = None
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(suffix=".npz", dir=target.parent)
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp, target)
+        except Exception as exc:
+            self._count("errors")
+            logger_uma.debug("[template_store] Failed to write %s: %s", target, exc)
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self._count("writes")
+
+    # ---------- stats ----------
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+        out["enabled"] = self.enabled
+        out["root"] = str(self.root)
+        return out
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+import pytest
+
+from core.controllers.adb_screencap import decode_raw_screencap
+
+
+def _canned(width: int, height: int, fmt: int, pixels: bytes, *, colorspace: bool = True) -> bytes:
+    header = struct.pack("<III", width, height, fmt)
+    if colorspace:
+        header += struct.pack("<I", 1)  # sRGB, Android 9+
+    return header + pixels
+
+
+def _rgb(width: int = 5, height: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("colorspace", [True, False])
+def test_rgba_with_either_header(colorspace: bool) -> None:
+    rgb = _rgb()
+    rgba = np.dstack([rgb, np.full(rgb.shape[:2], 255, np.uint8)])
+
+    out = decode_raw_screencap(_canned(5, 3, 1, rgba.tobytes(), colorspace=colorspace))
+
+    assert out.shape == (3, 5, 3)
+    assert out.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(out, rgb)
+
+
+def test_bgra_is_swapped_to_rgb() -> None:
+    rgb = _rgb()
+    bgra = np.dstack([rgb[..., ::-1], np.zeros(rgb.shape[:2], np.uint8)])
+
+    np.testing.assert_array_equal(decode_raw_screencap(_canned(5, 3, 5, bgra.tobytes())), rgb)
+
+
+def test_rgb565_expands_to_full_range() -> None:
+    # white, pure red, pure green, pure blue
+    px = np.array([[0xFFFF, 0xF800, 0x07E0, 0x001F]], dtype="<u2")
+
+    out = decode_raw_screencap(_canned(4, 1, 4, px.tobytes()))
+
+    assert out.tolist() == [[[255, 255, 255], [255, 0, 0], [0, 255, 0], [0, 0, 255]]]
+
+
+def test_padded_row_stride_is_cropped() -> None:
+    rgb = _rgb(width=5)
+    padded = np.zeros((3, 8, 4), dtype=np.uint8)
+    padded[:, :5, :3] = rgb
+
+    np.testing.assert_array_equal(decode_raw_screencap(_canned(5, 3, 1, padded.tobytes())), rgb)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x00" * 8,
+        _canned(2, 2, 99, b"\x00" * 16),
+        _canned(2, 2, 1, b"\x00" * 7),
+    ],
+)
+def test_rejects_what_it_cannot_decode(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        decode_raw_screencap(data)
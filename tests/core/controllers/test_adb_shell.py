@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.controllers.adb_shell import ADBShellSession
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake adb is a POSIX shell script")
+
+# Stands in for `adb -s <device> shell`: logs each spawn, records every `input`
+# command it receives and otherwise behaves like a shell reading stdin.
+_FAKE_ADB = """#!/bin/sh
+echo "spawn $*" >> "{log}"
+input() {{ echo "input $*" >> "{log}"; echo "ok $1"; }}
+while IFS= read -r line; do eval "$line"; done
+"""
+
+
+@pytest.fixture
+def fake_adb(tmp_path: Path):
+    log = tmp_path / "adb.log"
+    script = tmp_path / "adb"
+    script.write_text(_FAKE_ADB.format(log=log))
+    script.chmod(0o755)
+    return str(script), log
+
+
+def _log(log: Path) -> list:
+    return log.read_text().splitlines()
+
+
+def test_commands_share_one_shell(fake_adb) -> None:
+    adb, log = fake_adb
+    session = ADBShellSession("emu:5555", adb_path=adb, timeout=5)
+    try:
+        assert session.run_args(["input", "tap", "10", "20"]) == "ok tap"
+        assert session.run_args(["input", "swipe", "1", "2", "3", "4", "120"]) == "ok swipe"
+    finally:
+        session.close()
+
+    assert _log(log) == [
+        "spawn -s emu:5555 shell",
+        "input tap 10 20",
+        "input swipe 1 2 3 4 120",
+    ]
+    assert session.spawns == 1
+
+
+def test_nonzero_exit_raises_and_session_stays_usable(fake_adb) -> None:
+    adb, _ = fake_adb
+    session = ADBShellSession(adb_path=adb, timeout=5)
+    try:
+        with pytest.raises(RuntimeError, match="exit 3"):
+            session.run("echo boom; (exit 3)")
+        assert session.run("echo fine") == "fine"
+    finally:
+        session.close()
+
+    assert session.spawns == 1
+
+
+def test_reconnects_after_shell_dies(fake_adb) -> None:
+    adb, log = fake_adb
+    session = ADBShellSession(adb_path=adb, timeout=5)
+    try:
+        session.run_args(["input", "tap", "1", "1"])
+        assert session._proc is not None
+        session._proc.kill()
+        session._proc.wait()
+
+        session.run_args(["input", "tap", "2", "2"])
+    finally:
+        session.close()
+
+    assert session.spawns == 2
+    assert [line for line in _log(log) if line.startswith("input")] == [
+        "input tap 1 1",
+        "input tap 2 2",
+    ]
+
+
+def test_timeout_drops_the_shell(fake_adb) -> None:
+    adb, _ = fake_adb
+    session = ADBShellSession(adb_path=adb, timeout=5)
+    try:
+        with pytest.raises(RuntimeError, match="timed out"):
+            session.run("sleep 2", timeout=0.2)
+        assert not session.alive
+        assert session.run("echo back") == "back"
+    finally:
+        session.close()
+
+    assert session.spawns == 2
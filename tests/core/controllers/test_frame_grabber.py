@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+from PIL import Image
+
+from core.controllers.frame_grabber import FrameGrabber
+
+
+class _Screen:
+    """Capture source that returns a distinct 1x1 image per grab."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.grabs = 0
+        self.fail_next = False
+        self.threads: List[str] = []
+
+    def __call__(self):
+        self.threads.append(threading.current_thread().name)
+        if self.fail_next:
+            self.fail_next = False
+            raise OSError("window gone")
+        time.sleep(self.delay)
+        self.grabs += 1
+        return Image.new("L", (1, 1), self.grabs % 256), (10, 20), (10, 20, 1, 1)
+
+
+def test_ring_buffer_keeps_newest_frames() -> None:
+    screen = _Screen()
+    grabber = FrameGrabber(screen, capacity=3, interval_s=0.005)
+    grabber.start()
+    try:
+        assert grabber.after(0.0, timeout=2) is not None
+        time.sleep(0.1)
+        latest = grabber.latest()
+    finally:
+        grabber.stop()
+
+    assert latest is not None
+    assert latest.origin == (10, 20) and latest.bbox == (10, 20, 1, 1)
+    assert latest.seq >= 3
+    assert set(screen.threads) == {"frame-grabber"}
+    assert grabber.stats()["buffered"] == 0  # cleared on stop
+
+
+def test_frame_after_waits_for_a_grab_started_later() -> None:
+    grabber = FrameGrabber(_Screen(delay=0.02), capacity=4, interval_s=0.0)
+    grabber.start()
+    try:
+        assert grabber.after(0.0, timeout=2) is not None
+        clicked_at = time.monotonic()
+        # Anything already buffered started before the click
+        assert grabber.latest(not_before=clicked_at) is None
+        frame = grabber.after(clicked_at, timeout=2)
+    finally:
+        grabber.stop()
+
+    assert frame is not None and frame.ts > clicked_at
+
+
+def test_max_age_and_capture_errors() -> None:
+    screen = _Screen()
+    screen.fail_next = True
+    grabber = FrameGrabber(screen, capacity=2, interval_s=0.5)
+    grabber.start()
+    try:
+        # First grab fails; the loop keeps going after a short pause
+        frame = grabber.after(0.0, timeout=2)
+        assert frame is not None
+        time.sleep(0.05)
+        assert grabber.latest(max_age=0.01) is None
+        assert grabber.latest(max_age=5) is frame
+    finally:
+        grabber.stop()
+
+    assert grabber.stats()["errors"] == 1
+
+
+def test_grabber_does_not_move_the_agents_capture_origin() -> None:
+    # core.controllers.base pulls in pyautogui, which needs a display
+    try:
+        from core.controllers.static_image import StaticImageController
+    except Exception as exc:  # pragma: no cover - headless without Xvfb
+        pytest.skip(f"controllers need a display: {exc}")
+
+    class _Ctrl(StaticImageController):
+        def _capture(self, region=None):
+            time.sleep(0.001)
+            if region is None:
+                return self._img, (0, 0), (0, 0, 8, 8)
+            L, T, W, H = region
+            return self._img, (L, T), (L, T, W, H)
+
+        def screenshot(self, region=None):
+            return super(StaticImageController, self).screenshot(region)
+
+    ctrl = _Ctrl(Image.new("RGB", (8, 8)))
+    ctrl.start_frame_grabber(interval_s=0.0)
+    try:
+        for i in range(200):
+            ctrl.screenshot(region=(100 + i, 50, 4, 4))
+            time.sleep(0.0005)
+            assert ctrl.capture_origin() == (100 + i, 50)
+        frame = ctrl.frame_grabber.latest()
+        assert frame is not None and frame.origin == (0, 0)
+    finally:
+        ctrl.stop_frame_grabber()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from PIL import Image
+
+from core.controllers.session import ReplayCursor, ReplayFinished, SessionRecorder, load_session
+
+
+class _FakeCtrl:
+    """Just enough of IController for the recorder to hook."""
+
+    def __init__(self, screens: List[Image.Image]) -> None:
+        self.screens = screens
+        self.shown = 0
+        self.clicks: List[Tuple[int, int]] = []
+
+    def screenshot(self, region=None) -> Image.Image:
+        return self.screens[min(self.shown, len(self.screens) - 1)]
+
+    def capture_origin(self):
+        return (5, 7)
+
+    def capture_bbox(self):
+        return (5, 7, 4, 4)
+
+    def click(self, x, y, *, clicks=1, **kwargs) -> None:
+        self.clicks.append((x, y))
+        self.shown += 1
+
+    def hold(self, x, y, seconds, **kwargs) -> None:
+        self.mouse_down(x, y)
+        self.mouse_up(x, y)
+
+    def mouse_down(self, x, y, **kwargs) -> None:
+        pass
+
+    def mouse_up(self, x, y, **kwargs) -> None:
+        self.shown += 1
+
+
+def _color(value: int) -> Image.Image:
+    return Image.new("RGB", (4, 4), (value, value, value))
+
+
+def _record(tmp_path: Path) -> Path:
+    ctrl = _FakeCtrl([_color(10), _color(20), _color(30)])
+    path = tmp_path / "run.umasession"
+    rec = SessionRecorder(path).attach(ctrl)
+    ctrl.screenshot()
+    ctrl.screenshot()  # static screen: same frame stored once
+    ctrl.click(1, 2, clicks=1)
+    ctrl.screenshot()
+    ctrl.hold(3, 4, 0.5)  # nested mouse_down/up are not recorded separately
+    ctrl.screenshot()
+    rec.close()
+
+    assert "screenshot" not in vars(ctrl)  # detached
+    assert ctrl.clicks == [(1, 2)]
+    return path
+
+
+def test_recording_dedupes_frames_and_keeps_outer_actions(tmp_path: Path) -> None:
+    session = load_session(_record(tmp_path))
+    try:
+        kinds = [e["kind"] for e in session.events]
+        assert kinds == ["frame", "frame", "click", "frame", "hold", "frame"]
+        assert len({e["frame"] for e in session.events if e["kind"] == "frame"}) == 3
+        assert session.events[2]["args"] == [1, 2] and session.events[2]["kwargs"] == {"clicks": 1}
+        assert session.events[0]["origin"] == [5, 7]
+        first = session.frame(session.events[0]["frame"])
+        assert first.getpixel((0, 0)) == (10, 10, 10)
+    finally:
+        session.close()
+
+
+def test_cursor_follows_the_agents_actions(tmp_path: Path) -> None:
+    session = load_session(_record(tmp_path))
+    try:
+        cursor = ReplayCursor(session.events, max_idle_snaps=2)
+
+        def shade() -> int:
+            return session.frame(cursor.next_frame()["frame"]).getpixel((0, 0))[0]
+
+        assert [shade(), shade(), shade()] == [10, 10, 10]  # extra snaps repeat the last frame
+        cursor.on_action("click")
+        assert shade() == 20
+        cursor.on_action("scroll")  # diverged from the recorded hold
+        assert [shade(), shade(), shade()] == [30, 30, 30]
+        with pytest.raises(ReplayFinished):
+            shade()
+        with pytest.raises(ReplayFinished):
+            cursor.on_action("click")
+        assert cursor.stats == {"frames": 7, "actions": 2, "mismatches": 1}
+    finally:
+        session.close()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or shutil.which("Xvfb") is None,
+    reason="needs Xvfb",
+)
+
+
+@pytest.fixture
+def xvfb(monkeypatch):
+    disp = ":97"
+    proc = subprocess.Popen(
+        ["Xvfb", disp, "-screen", "0", "800x600x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    monkeypatch.setenv("DISPLAY", disp)
+    try:
+        yield disp
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+def _open_window(disp: str, title: str, xywh, pixel: int):
+    from Xlib import X, display as xdisplay
+
+    d = xdisplay.Display(disp)
+    screen = d.screen()
+    x, y, w, h = xywh
+    win = screen.root.create_window(
+        x, y, w, h, 0, screen.root_depth, X.InputOutput, X.CopyFromParent, background_pixel=pixel
+    )
+    win.set_wm_name(title)
+    win.map()
+    d.sync()
+    time.sleep(0.2)
+    return d
+
+
+def test_finds_window_by_title_and_captures_its_pixels(xvfb) -> None:
+    keep = _open_window(xvfb, "Waydroid - Uma", (50, 40, 120, 90), 0x2080C0)
+    from core.controllers.x11 import X11Controller
+
+    ctrl = X11Controller("waydroid", display=xvfb)
+    try:
+        assert ctrl.focus()
+        assert ctrl._client_bbox_screen_xywh() == (50, 40, 120, 90)
+
+        img = ctrl.screenshot()
+        bgr = ctrl.screenshot_bgr(region=(0, 0, 30, 20))
+    finally:
+        ctrl.close()
+        keep.close()
+
+    assert img.size == (120, 90)
+    assert np.asarray(img)[45, 60].tolist() == [0x20, 0x80, 0xC0]
+    assert ctrl.capture_origin() == (0, 0)
+    assert bgr.shape == (20, 30, 3)
+
+
+def test_plain_xgetimage_fallback_matches_shm(xvfb) -> None:
+    keep = _open_window(xvfb, "scrcpy", (0, 0, 64, 64), 0x00FF00)
+    from core.controllers.x11_shm import X11ShmCapture
+
+    shm, plain = X11ShmCapture(xvfb), X11ShmCapture(xvfb, use_shm=False)
+    try:
+        a = shm.grab(0, 0, 64, 64)
+        b = plain.grab(0, 0, 64, 64)
+        clamped = plain.grab(790, 590, 64, 64)
+    finally:
+        shm.close()
+        plain.close()
+        keep.close()
+
+    np.testing.assert_array_equal(a[..., :3], b[..., :3])
+    assert a[10, 10, :3].tolist() == [0, 255, 0]
+    assert clamped.shape == (10, 10, 4)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.perception.analyzers.matching.remote import (
+    HEADER_BANKS_SUPPORT,
+    RemoteTemplateMatcherBase,
+    template_bank_digest,
+    template_bank_id,
+)
+from core.utils.frame_codec import HEADER_PARAMS_LENGTH, HEADER_SERVER_SUPPORT
+
+_NEW_SERVER = {HEADER_SERVER_SUPPORT: "1", HEADER_BANKS_SUPPORT: "1"}
+
+
+class _Resp:
+    def __init__(
+        self, status: int, body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.status_code = status
+        self.headers = headers if headers is not None else dict(_NEW_SERVER)
+        self.ok = status < 400
+        self._body = body or {}
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _Session:
+    def __init__(self, responses: List[_Resp]) -> None:
+        self.responses = responses
+        self.calls: List[Dict[str, Any]] = []
+
+    def post(self, url: str, **kwargs: Any) -> _Resp:
+        params = kwargs.get("json")
+        if params is None and "data" in kwargs:
+            head = int(kwargs["headers"][HEADER_PARAMS_LENGTH])
+            params = json.loads(kwargs["data"][:head])
+        self.calls.append({"url": url, "params": params})
+        return self.responses.pop(0)
+
+
+_TEMPLATES = [
+    {"id": "a", "img": "AAAA", "metadata": {"name": "Alpha"}},
+    {"id": "b", "public_path": "/events/b.png"},
+]
+_MATCHES = {"matches": [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.4}]}
+
+
+def _matcher(session: _Session) -> RemoteTemplateMatcherBase:
+    return RemoteTemplateMatcherBase(
+        _TEMPLATES, base_url="http://x", session=session, frame_codec="raw", use_banks=True  # type: ignore[arg-type]
+    )
+
+
+def _region() -> np.ndarray:
+    return np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+def test_bank_miss_uploads_once_then_matches_by_id() -> None:
+    uploaded = _Resp(200, {"bank_id": "srv-bank", "digest": "srv-digest"})
+    session = _Session([_Resp(409), uploaded, _Resp(200, _MATCHES), _Resp(200, _MATCHES)])
+    matcher = _matcher(session)
+
+    first = matcher.match(_region(), candidates=["Alpha"])
+    second = matcher.match(_region())
+
+    assert [m.name for m in first] == ["a", "b"]
+    assert [m.name for m in second] == ["a", "b"]
+    urls = [c["url"] for c in session.calls]
+    assert urls == [
+        "http://x/template-match",
+        "http://x/template-banks",
+        "http://x/template-match",
+        "http://x/template-match",
+    ]
+    # Match calls never carry template images
+    for call in (session.calls[0], session.calls[2], session.calls[3]):
+        assert "templates" not in call["params"]
+    assert session.calls[0]["params"]["candidates"] == ["Alpha"]
+    assert len(session.calls[1]["params"]["templates"]) == 2
+    # Later calls use the ids the server handed back
+    assert session.calls[3]["params"]["bank_id"] == "srv-bank"
+
+
+def test_client_digest_matches_what_it_uploads() -> None:
+    session = _Session([_Resp(409), _Resp(200, {"bank_id": "x", "digest": "y"}), _Resp(200, _MATCHES)])
+    matcher = _matcher(session)
+
+    matcher.match(_region())
+
+    uploaded = session.calls[1]["params"]["templates"]
+    digest = template_bank_digest(uploaded)
+    assert session.calls[0]["params"]["bank_digest"] == digest
+    assert session.calls[0]["params"]["bank_id"] == template_bank_id(digest)
+
+
+def test_legacy_server_falls_back_to_inline_templates() -> None:
+    legacy = {HEADER_SERVER_SUPPORT: "1"}
+    session = _Session([_Resp(422, headers=legacy), _Resp(200, _MATCHES), _Resp(200, _MATCHES)])
+    matcher = _matcher(session)
+
+    assert matcher.match(_region())
+    assert matcher.match(_region())
+
+    assert "bank_id" in session.calls[0]["params"]
+    assert [t["id"] for t in session.calls[1]["params"]["templates"]] == ["a", "b"]
+    assert "bank_id" not in session.calls[2]["params"]
+    assert len(session.calls) == 3
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+import pytest
+
+from core.perception.yolo.roi import detect_rois, merge_roi_dets, roi_imgsz_for, roi_to_pixels
+from core.settings import Settings
+from core.utils.training_check_helpers import training_scan_rois
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+
+def _det(name: str, conf: float, xyxy) -> Dict[str, Any]:
+    return {"idx": 0, "name": name, "conf": conf, "xyxy": tuple(float(v) for v in xyxy)}
+
+
+def test_roi_fractions_and_pixels() -> None:
+    assert roi_to_pixels((0.5, 0.25, 1.0, 1.0), 400, 800) == (200, 200, 400, 800)
+    assert roi_to_pixels((10, 20, 500, 90.5), 400, 800) == (10, 20, 400, 91)
+    with pytest.raises(ValueError):
+        roi_to_pixels((500, 10, 600, 20), 400, 800)
+
+
+def test_roi_imgsz_keeps_full_frame_scale() -> None:
+    # 421x936 frame at 832: a 100x520 column keeps 832 * 520 / 936 = 462 -> 480
+    assert roi_imgsz_for((320, 0, 420, 520), 421, 936, 832) == 480
+    assert roi_imgsz_for((0, 0, 421, 936), 421, 936, 832) == 832
+    assert roi_imgsz_for((0, 0, 4, 4), 421, 936, 832) == 32
+
+
+def test_merge_shifts_and_drops_cross_roi_duplicates() -> None:
+    boxes = [(300, 0, 420, 700), (0, 600, 421, 936)]
+    per_roi = [
+        # card fully inside the column; a second card cut by the column bottom
+        [_det("support_card", 0.9, (40, 100, 100, 170)), _det("support_card", 0.5, (40, 650, 100, 700))],
+        # same second card, whole, seen from the panel crop; buttons
+        [_det("support_card", 0.8, (340, 50, 400, 120)), _det("training_button", 0.9, (10, 200, 90, 290))],
+    ]
+    out = merge_roi_dets(per_roi, boxes, iou=0.45)
+    assert [d["name"] for d in out] == ["support_card", "training_button", "support_card"]
+    assert out[0]["xyxy"] == (340.0, 100.0, 400.0, 170.0)
+    assert out[2]["xyxy"] == (340.0, 650.0, 400.0, 720.0)
+    assert [d["idx"] for d in out] == [0, 1, 2]
+
+
+class _FakeDetector:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[List[Tuple[int, int]], Any]] = []
+
+    def detect_bgr_batch(self, bgrs, *, imgsz, conf, iou, **kwargs):
+        self.calls.append(([b.shape[:2] for b in bgrs], imgsz))
+        return [
+            ({"names": {0: "thing"}, "batch_size": len(bgrs)}, [_det("thing", 0.9, (1, 2, 11, 12))])
+            for _ in bgrs
+        ]
+
+
+def test_detect_rois_crops_and_maps_back() -> None:
+    frame = np.zeros((936, 421, 3), dtype=np.uint8)
+    det = _FakeDetector()
+    meta, dets = detect_rois(
+        det, frame, [(0.75, 0.0, 1.0, 0.75), (0, 600, 421, 936)], imgsz=832, conf=0.6, iou=0.45
+    )
+    shapes, sizes = det.calls[0]
+    assert shapes == [(702, 106), (336, 421)]
+    assert sizes == [640, 384]
+    assert meta["rois"] == [(315, 0, 421, 702), (0, 600, 421, 936)]
+    assert meta["roi_imgsz"] == [640, 384] and "batch_size" not in meta
+    assert [d["xyxy"] for d in dets] == [(316.0, 2.0, 326.0, 12.0), (1.0, 602.0, 11.0, 612.0)]
+
+    detect_rois(det, frame, [(0, 0, 100, 100)], imgsz=832, roi_imgsz=[320], conf=0.6, iou=0.45)
+    assert det.calls[-1][1] == [320]
+
+
+def _iou(a, b) -> float:
+    iw = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _inside(box, roi) -> bool:
+    return roi[0] <= box[0] and roi[1] <= box[1] and box[2] <= roi[2] and box[3] <= roi[3]
+
+
+def test_training_rois_match_full_frame_detection() -> None:
+    """
+    On the training fixture, ROI detection agrees with the full-frame pass both
+    ways: every confident full-frame box lying inside a ROI has a same-class
+    ROI box with IoU >= 0.85, and every confident ROI box has a full-frame one.
+    """
+    pytest.importorskip("ultralytics")
+    weights = Path(Settings.YOLO_WEIGHTS_URA)
+    if not weights.is_file():
+        pytest.skip("needs models/uma_ura.pt")
+    from core.perception.yolo.yolo_local import LocalYOLOEngine
+
+    engine = LocalYOLOEngine(weights=str(weights), use_gpu=False, backend="ultralytics")
+    bgr = cv2.imread(str(DATA_DIR / "training_stats_01.png"))
+    h, w = bgr.shape[:2]
+    imgsz, conf, iou = 832, 0.60, 0.45  # scan_training_screen's parameters
+
+    _, full = engine.detect_bgr(bgr, imgsz=imgsz, conf=conf, iou=iou)
+    rois = training_scan_rois(full, w, h)
+    assert rois is not None
+    _, got = engine.detect_bgr(bgr, imgsz=imgsz, conf=conf, iou=iou, rois=rois)
+
+    covered = [d for d in full if any(_inside(d["xyxy"], r) for r in rois)]
+    assert sum(d["name"] == "training_button" for d in got) == sum(
+        d["name"] == "training_button" for d in full
+    )
+    for side, dets, other in (("missed", covered, got), ("extra", got, full)):
+        for d in dets:
+            if d["conf"] < conf + 0.05:
+                continue  # near the threshold, may flip with the crop
+            best = max(
+                (_iou(d["xyxy"], o["xyxy"]) for o in other if o["name"] == d["name"]),
+                default=0.0,
+            )
+            assert best >= 0.85, f"{side} {d['name']} {d['xyxy']}"
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.perception.yolo.yolo_local import LocalYOLOEngine
+from core.utils.frame_gate import FrameResultCache
+
+
+def _det(idx: int, conf: float) -> Dict[str, Any]:
+    x = float(idx * 20)
+    return {"idx": idx, "name": "thing", "conf": conf, "xyxy": (x, 0.0, x + 10, 10.0)}
+
+
+def _engine(monkeypatch: pytest.MonkeyPatch, cache: bool = False) -> LocalYOLOEngine:
+    """Engine without a model; `_predict` drops boxes under the call's conf like the backends."""
+    eng = LocalYOLOEngine.__new__(LocalYOLOEngine)
+    eng.ctrl = None
+    eng.weights_path = "fake.pt"
+    eng._cache = FrameResultCache(ttl_s=60.0) if cache else None
+    confs = [0.9, 0.5, 0.8, 0.3]
+
+    def predict(bgrs, *, imgsz, conf, iou):
+        dets = [c for c in confs if c >= conf]
+        return [({0: "thing"}, [_det(i, c) for i, c in enumerate(dets)]) for _ in bgrs]
+
+    monkeypatch.setattr(eng, "_predict", predict)
+    return eng
+
+
+def test_cache_hit_does_not_store_debug_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    eng = _engine(monkeypatch, cache=True)
+    stored: List[int] = []
+    monkeypatch.setattr(eng, "_maybe_store_debug", lambda pil, dets, **kw: stored.append(len(dets)))
+    bgr = np.zeros((64, 64, 3), dtype=np.uint8)
+    pil = Image.new("RGB", (64, 64))
+
+    meta, _ = eng.detect_bgr(bgr, imgsz=64, conf=0.25, iou=0.45, original_pil_img=pil)
+    assert "cached" not in meta
+    meta, _ = eng.detect_bgr(bgr, imgsz=64, conf=0.25, iou=0.45, original_pil_img=pil)
+    assert meta["cached"] is True
+    assert stored == [4]
+
+
+def test_batch_matches_single_calls_for_mixed_confs(monkeypatch: pytest.MonkeyPatch) -> None:
+    eng = _engine(monkeypatch)
+    frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(2)]
+    confs = [0.25, 0.6]
+
+    batch = eng.detect_bgr_batch(frames, imgsz=64, conf=confs, iou=0.45)
+    for bgr, conf, (_, dets) in zip(frames, confs, batch):
+        _, single = eng.detect_bgr(bgr, imgsz=64, conf=conf, iou=0.45)
+        assert dets == single
+    assert [d["idx"] for d in batch[1][1]] == [0, 1]
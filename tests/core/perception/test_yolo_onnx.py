@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from core.perception.yolo.yolo_onnx import (
+    PAD_VALUE,
+    letterbox,
+    nms_xyxy,
+    onnx_weights_for,
+    postprocess,
+)
+from core.settings import Settings
+
+DATA = Path(__file__).resolve().parents[2] / "data"
+FIXTURES = sorted(DATA.glob("*.png"))
+
+
+def test_letterbox_square_pads_evenly() -> None:
+    img = np.zeros((500, 1000, 3), dtype=np.uint8)
+    out, scale, (px, py) = letterbox(img, (832, 832))
+    assert out.shape == (832, 832, 3)
+    assert scale == pytest.approx(0.832)
+    assert (px, py) == (0.0, 208.0)
+    assert (out[:208] == PAD_VALUE).all() and (out[-208:] == PAD_VALUE).all()
+    assert (out[208:-208] == 0).all()
+
+
+def test_letterbox_auto_pads_to_stride_only() -> None:
+    img = np.zeros((1080, 606, 3), dtype=np.uint8)
+    out, scale, (px, py) = letterbox(img, (832, 832), auto=True)
+    # 606 * 832/1080 = 466.8 -> 467, padded to 480
+    assert out.shape == (832, 480, 3)
+    assert py == 0.0
+    assert px == 6.0  # 13 px of padding: 6 left, 7 right
+
+
+def _raw_head(boxes_xywh, class_scores) -> np.ndarray:
+    """Build a (4 + nc, N) head output like the exported YOLO graph."""
+    return np.concatenate(
+        [np.asarray(boxes_xywh, np.float32), np.asarray(class_scores, np.float32)], axis=1
+    ).T
+
+
+def test_postprocess_filters_nms_and_scales_back() -> None:
+    pred = _raw_head(
+        [
+            [100, 100, 40, 40],  # kept
+            [102, 101, 40, 40],  # same class, overlaps -> suppressed
+            [102, 101, 40, 40],  # other class, overlaps -> kept (class-aware)
+            [300, 300, 20, 20],  # below conf
+        ],
+        [[0.9, 0.0], [0.8, 0.1], [0.0, 0.7], [0.3, 0.2]],
+    )
+    boxes, scores, cls = postprocess(
+        pred, conf=0.5, iou=0.45, scale=0.5, pad=(0.0, 10.0), orig_shape=(1000, 1000)
+    )
+    assert cls.tolist() == [0, 1]
+    assert scores.tolist() == pytest.approx([0.9, 0.7])
+    assert boxes[0].tolist() == pytest.approx([160, 140, 240, 220])
+
+
+def test_postprocess_clips_and_handles_empty() -> None:
+    pred = _raw_head([[5, 5, 40, 40]], [[0.9]])
+    boxes, _, _ = postprocess(pred, conf=0.5, iou=0.5, scale=1.0, pad=(0, 0), orig_shape=(100, 100))
+    assert boxes[0].tolist() == pytest.approx([0, 0, 25, 25])
+
+    boxes, scores, cls = postprocess(pred, conf=0.95, iou=0.5, scale=1.0, pad=(0, 0), orig_shape=(100, 100))
+    assert boxes.shape == (0, 4) and scores.size == 0 and cls.size == 0
+
+
+def test_nms_keeps_highest_first() -> None:
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]], np.float32)
+    keep = nms_xyxy(boxes, np.array([0.5, 0.9, 0.7], np.float32), 0.5)
+    assert keep.tolist() == [1, 2]
+
+
+def test_onnx_weights_for() -> None:
+    assert onnx_weights_for("models/uma_ura.pt") == Path("models/uma_ura.onnx")
+    assert onnx_weights_for("x/model.onnx") == Path("x/model.onnx")
+
+
+def _iou(a, b) -> float:
+    iw = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def test_parity_with_ultralytics() -> None:
+    """
+    Exported model agrees with the .pt model on the fixtures, both ways: every
+    confident box of either has a same-class box in the other with IoU >= 0.9.
+    """
+    pytest.importorskip("onnxruntime")
+    ultralytics = pytest.importorskip("ultralytics")
+    from core.perception.yolo.yolo_onnx import OnnxYOLODetector
+
+    pt = Path(Settings.YOLO_WEIGHTS_URA)
+    onnx_path = onnx_weights_for(pt)
+    if not pt.is_file() or not onnx_path.is_file():
+        pytest.skip("needs models/uma_ura.pt and its export (scripts/export_yolo_onnx.py)")
+
+    model = ultralytics.YOLO(str(pt))
+    detector = OnnxYOLODetector(onnx_path)
+    imgsz, conf, iou = Settings.YOLO_IMGSZ, Settings.YOLO_CONF, Settings.YOLO_IOU
+    for path in FIXTURES:
+        bgr = cv2.imread(str(path))
+        res = model.predict(source=bgr, imgsz=imgsz, conf=conf, iou=iou, verbose=False)[0]
+        ref = [
+            {"name": res.names[int(c)], "conf": score, "xyxy": box}
+            for c, score, box in zip(
+                res.boxes.cls.cpu().numpy().astype(int),
+                res.boxes.conf.cpu().numpy().tolist(),
+                res.boxes.xyxy.cpu().numpy().tolist(),
+            )
+        ]
+        got = detector.detect([bgr], imgsz=imgsz, conf=conf, iou=iou)[0]
+
+        for side, dets, other in (("missed", ref, got), ("extra", got, ref)):
+            for d in dets:
+                if d["conf"] < conf + 0.02:
+                    continue  # right at the threshold, may flip either way
+                best = max(
+                    (_iou(d["xyxy"], o["xyxy"]) for o in other if o["name"] == d["name"]),
+                    default=0.0,
+                )
+                assert best >= 0.9, f"{path.name}: {side} {d['name']} {d['xyxy']}"
+
+
+class _FakeSession:
+    """Stands in for an onnxruntime session of an exported model."""
+
+    def __init__(self, batch) -> None:
+        self.batch = batch
+        self.calls = []
+
+    def get_inputs(self):
+        class _Inp:
+            name = "images"
+            shape = [self.batch, 3, 64, 64]
+
+        return [_Inp()]
+
+    def get_modelmeta(self):
+        class _Meta:
+            custom_metadata_map = {"names": "{0: 'thing'}", "stride": "32"}
+
+        return _Meta()
+
+    def run(self, _outputs, feeds):
+        blob = feeds["images"]
+        if isinstance(self.batch, int):
+            assert blob.shape[0] == self.batch, "ORT rejects a different batch size"
+        self.calls.append(blob.shape[0])
+        head = _raw_head([[32, 32, 10, 10]], [[0.9]])
+        return [np.stack([head] * blob.shape[0])]
+
+
+@pytest.mark.parametrize("batch, calls", [(1, [1, 1, 1]), (2, [2, 2]), ("batch", [3])])
+def test_detect_respects_fixed_batch_axis(batch, calls) -> None:
+    from core.perception.yolo.yolo_onnx import OnnxYOLODetector
+
+    detector = OnnxYOLODetector.__new__(OnnxYOLODetector)
+    detector._bind(_FakeSession(batch))
+    frames = [np.zeros((64, 64, 3), np.uint8)] * 3
+
+    out = detector.detect(frames, imgsz=64, conf=0.5, iou=0.45)
+
+    assert detector.session.calls == calls
+    assert [[d["name"] for d in dets] for dets in out] == [["thing"]] * 3
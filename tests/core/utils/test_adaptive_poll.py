@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import random
+
+from core.utils.adaptive_poll import PollBackoff, confirmed_candidates
+
+
+def _det(name: str, xyxy, conf: float) -> dict:
+    return {"name": name, "xyxy": xyxy, "conf": conf}
+
+
+def test_backoff_grows_while_static_and_resets_on_change() -> None:
+    b = PollBackoff(0.05, 0.4, factor=2.0, jitter=0.0)
+    assert b.next_delay(changed=True) == 0.05
+    assert [b.next_delay(changed=False) for _ in range(4)] == [0.1, 0.2, 0.4, 0.4]
+    assert b.next_delay(changed=True) == 0.05
+
+
+def test_backoff_jitter_stays_in_band() -> None:
+    b = PollBackoff(0.1, 0.1, jitter=0.2, rng=random.Random(3))
+    delays = [b.next_delay(changed=True) for _ in range(50)]
+    assert all(0.08 <= d <= 0.12 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_confident_candidates_pass_immediately() -> None:
+    cand = [_det("button_green", (100, 500, 300, 560), 0.93)]
+    assert confirmed_candidates(cand, None, confident_conf=0.8) == cand
+
+
+def test_weak_candidate_needs_previous_poll() -> None:
+    weak = _det("button_green", (100, 500, 300, 560), 0.55)
+    assert confirmed_candidates([weak], None, confident_conf=0.8) == []
+    # Same button, slightly shifted during a fade-in
+    prev = [_det("button_green", (104, 502, 302, 561), 0.52)]
+    assert confirmed_candidates([weak], prev, confident_conf=0.8) == [weak]
+    # Different class or a different place does not count
+    assert confirmed_candidates([weak], [_det("button_white", (100, 500, 300, 560), 0.9)], confident_conf=0.8) == []
+    assert confirmed_candidates([weak], [_det("button_green", (100, 100, 300, 160), 0.9)], confident_conf=0.8) == []
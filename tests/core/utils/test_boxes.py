@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from core.perception.yolo.roi import merge_roi_dets
+from core.utils.boxes import (
+    as_boxes,
+    dets_from_arrays,
+    group_by_rows,
+    iou_matrix,
+    nms,
+    nms_dets,
+    sort_top_to_bottom,
+)
+
+# Loop implementations these replace (training_check_helpers' nested NMS,
+# claw's IoU, nav's row helpers), kept here as the reference.
+
+
+def _ref_iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0.0:
+        return 0.0
+    ua = max(0.0, a[2] - a[0]) * max(0.0, a[3] - a[1]) + max(0.0, b[2] - b[0]) * max(0.0, b[3] - b[1]) - inter
+    return inter / ua if ua > 0 else 0.0
+
+
+def _ref_claw_iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0.0:
+        return 0.0
+    area_a = max(1.0, (a[2] - a[0]) * (a[3] - a[1]))
+    area_b = max(1.0, (b[2] - b[0]) * (b[3] - b[1]))
+    return inter / (area_a + area_b - inter)
+
+
+def _inside(pt, box):
+    return box[0] <= pt[0] <= box[2] and box[1] <= pt[1] <= box[3]
+
+
+def _center(b):
+    return (b[0] + b[2]) / 2.0, (b[1] + b[3]) / 2.0
+
+
+def _ref_nms_by_iou(dets, iou_thr):
+    kept = []
+    for d in sorted(dets, key=lambda d: float(d.get("conf", 0.0)), reverse=True):
+        dx = d.get("xyxy")
+        if not dx:
+            continue
+        if not any(
+            _ref_iou(dx, k["xyxy"]) >= iou_thr
+            or _inside(_center(dx), k["xyxy"])
+            or _inside(_center(k["xyxy"]), dx)
+            for k in kept
+        ):
+            kept.append(d)
+    return kept
+
+
+def _random_dets(rng: np.random.Generator, n: int, *, names=("a", "b")) -> List[Dict[str, Any]]:
+    xy = rng.integers(0, 300, size=(n, 2)).astype(float)
+    wh = rng.integers(1, 80, size=(n, 2)).astype(float)
+    # coarse confs so ties exercise the stable order
+    conf = rng.integers(1, 10, size=n) / 10.0
+    return [
+        {"idx": i, "name": str(rng.choice(names)), "conf": float(conf[i]),
+         "xyxy": (xy[i, 0], xy[i, 1], xy[i, 0] + wh[i, 0], xy[i, 1] + wh[i, 1])}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_iou_matrix_matches_scalar_iou(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    a, b = _random_dets(rng, 12), _random_dets(rng, 7)
+    b.append({"xyxy": (5.0, 5.0, 5.0, 9.0)})  # zero area
+    got = iou_matrix(as_boxes(a), as_boxes(b))
+    ref = [[_ref_iou(p["xyxy"], q["xyxy"]) for q in b] for p in a]
+    np.testing.assert_allclose(got, ref, atol=1e-12)
+    got_claw = iou_matrix(as_boxes(a), as_boxes(b), min_area=1.0)
+    np.testing.assert_allclose(got_claw, [[_ref_claw_iou(p["xyxy"], q["xyxy"]) for q in b] for p in a], atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(30))
+@pytest.mark.parametrize("thr", [0.3, 0.5])
+def test_nms_dets_matches_support_nms(seed: int, thr: float) -> None:
+    dets = _random_dets(np.random.default_rng(seed), 25)
+    dets.append({"name": "a", "conf": 0.9, "xyxy": None})
+    got = nms_dets(dets, thr, inclusive=True, center_overlap=True)
+    assert got == _ref_nms_by_iou(dets, thr)
+
+
+def test_nms_class_aware_and_threshold() -> None:
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10], [1, 0, 11, 10], [50, 50, 60, 60]], dtype=float)
+    scores = np.array([0.5, 0.9, 0.8, 0.1])
+    assert nms(boxes, scores, 0.5).tolist() == [1, 3]
+    assert nms(boxes, scores, 0.5, classes=np.array([0, 0, 1, 1])).tolist() == [1, 2, 3]
+    # IoU of boxes 1 and 2 is 9/11: strict vs inclusive at exactly that value
+    assert nms(boxes[1:3], scores[1:3], 9 / 11).tolist() == [0, 1]
+    assert nms(boxes[1:3], scores[1:3], 9 / 11, inclusive=True).tolist() == [0]
+    assert nms(np.zeros((0, 4)), np.zeros(0), 0.5).tolist() == []
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_rows_match_loop_helpers(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    rows = _random_dets(rng, 6, names=("row",))
+    items = _random_dets(rng, 30, names=("item",))
+    assert sort_top_to_bottom(rows) == sorted(rows, key=lambda d: d["xyxy"][1])
+    grouped = group_by_rows(rows, items)
+    for row, got in zip(rows, grouped):
+        assert got == [d for d in items if _inside(_center(d["xyxy"]), row["xyxy"])]
+    assert group_by_rows(rows, []) == [[] for _ in rows]
+
+
+def test_dets_from_arrays_keeps_source_index() -> None:
+    xyxy = np.array([[0, 0, 10, 10], [5, 5, 20, 20], [1, 2, 3, 4]], dtype=np.float32)
+    dets = dets_from_arrays(xyxy, np.array([0.9, 0.2, 0.5]), np.array([1.0, 0.0, 7.0]), {0: "a", 1: "b"}, conf_min=0.25)
+    assert [(d["idx"], d["name"]) for d in dets] == [(0, "b"), (2, "7")]
+    assert dets[1]["xyxy"] == (1.0, 2.0, 3.0, 4.0) and isinstance(dets[0]["conf"], float)
+    assert dets_from_arrays(xyxy, np.zeros(3), np.zeros(3), {}, conf_min=0.5) == []
+
+
+def _ref_merge(per_roi, boxes, iou):
+    shifted = []
+    for r, (dets, box) in enumerate(zip(per_roi, boxes)):
+        for d in dets:
+            x1, y1, x2, y2 = d["xyxy"]
+            shifted.append((r, {**d, "xyxy": (float(x1 + box[0]), float(y1 + box[1]), float(x2 + box[0]), float(y2 + box[1]))}))
+    shifted.sort(key=lambda item: -float(item[1]["conf"]))
+    kept = []
+    for r, d in shifted:
+        dup = False
+        for kr, k in kept:
+            if kr == r or k["name"] != d["name"]:
+                continue
+            a, b = d["xyxy"], k["xyxy"]
+            inter = max(0.0, min(a[2], b[2]) - max(a[0], b[0])) * max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+            if inter <= 0:
+                continue
+            area_a, area_b = (a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1])
+            if inter / (area_a + area_b - inter) > iou or inter / max(min(area_a, area_b), 1e-9) >= 0.6:
+                dup = True
+                break
+        if not dup:
+            kept.append((r, d))
+    return [d for _, d in kept]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_merge_roi_dets_matches_loop(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    per_roi = [_random_dets(rng, 10), _random_dets(rng, 10)]
+    boxes = [(0, 0, 300, 300), (40, 30, 340, 330)]
+    got = merge_roi_dets(per_roi, boxes, iou=0.45)
+    ref = _ref_merge(per_roi, boxes, 0.45)
+    assert [(d["name"], d["conf"], d["xyxy"]) for d in got] == [(d["name"], d["conf"], d["xyxy"]) for d in ref]
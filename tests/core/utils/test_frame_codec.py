@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from core.utils.frame_codec import (
+    HEADER_FRAME_DIGESTS,
+    HEADER_FRAME_REFS,
+    HEADER_REFS_SUPPORT,
+    HEADER_SERVER_SUPPORT,
+    NEED_BODY_STATUS,
+    FrameTransport,
+    frame_sha256,
+    pack_frames,
+    unpack_frames,
+)
+
+
+def _frame(h: int = 24, w: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    return rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("codec", ["raw", "png"])
+def test_roundtrip_lossless(codec: str) -> None:
+    frames = [_frame(), _frame(10, 12)]
+    body, headers = pack_frames({"mode": "batch_text", "joiner": " "}, frames, codec=codec)
+
+    params, decoded = unpack_frames(body, headers)
+
+    assert params == {"mode": "batch_text", "joiner": " "}
+    assert len(decoded) == 2
+    for src, out in zip(frames, decoded):
+        assert out.shape == src.shape
+        assert np.array_equal(src, out)
+
+
+def test_roundtrip_jpeg_keeps_shape() -> None:
+    src = np.full((40, 50, 3), 128, dtype=np.uint8)
+    body, headers = pack_frames({}, [src], codec="jpeg")
+
+    _, decoded = unpack_frames(body, headers)
+
+    assert decoded[0].shape == src.shape
+    assert np.abs(decoded[0].astype(int) - 128).max() <= 2
+
+
+def test_gray_and_bgra_inputs_are_normalized() -> None:
+    gray = np.zeros((8, 8), dtype=np.uint8)
+    bgra = np.zeros((8, 8, 4), dtype=np.uint8)
+    body, headers = pack_frames({}, [gray, bgra], codec="raw")
+
+    _, decoded = unpack_frames(body, headers)
+
+    assert [d.shape for d in decoded] == [(8, 8, 3), (8, 8, 3)]
+
+
+def test_unpack_rejects_truncated_body() -> None:
+    body, headers = pack_frames({"a": 1}, [_frame()], codec="raw")
+
+    with pytest.raises(ValueError):
+        unpack_frames(body[:-5], headers)
+
+
+class _Resp:
+    def __init__(self, status: int, headers: Dict[str, str] | None = None) -> None:
+        self.status_code = status
+        self.headers = headers or {}
+        self.ok = status < 400
+
+
+class _Session:
+    def __init__(self, statuses: List[_Resp]) -> None:
+        self.statuses = statuses
+        self.calls: List[Dict[str, Any]] = []
+
+    def post(self, url: str, **kwargs: Any) -> _Resp:
+        self.calls.append(kwargs)
+        return self.statuses.pop(0)
+
+
+def test_transport_falls_back_to_json_for_legacy_server() -> None:
+    session = _Session([_Resp(422), _Resp(200), _Resp(200)])
+    transport = FrameTransport(session, codec="raw")  # type: ignore[arg-type]
+
+    transport.post("http://x/template-match", {"region": {"meta": {}}}, [_frame()], image_key="region.img")
+    transport.post("http://x/template-match", {"region": {"meta": {}}}, [_frame()], image_key="region.img")
+
+    assert "data" in session.calls[0]
+    assert isinstance(session.calls[1]["json"]["region"]["img"], str)
+    # Negotiated once; later calls go straight to JSON
+    assert "json" in session.calls[2]
+    assert transport.binary_ok is False
+
+
+def test_transport_keeps_binary_on_new_server_errors() -> None:
+    session = _Session([_Resp(422, {HEADER_SERVER_SUPPORT: "1"})])
+    transport = FrameTransport(session, codec="png")  # type: ignore[arg-type]
+
+    resp = transport.post("http://x/yolo", {"imgsz": 10}, [_frame()])
+
+    assert resp.status_code == 422
+    assert len(session.calls) == 1
+    head_len = int(session.calls[0]["headers"]["X-Uma-Params-Length"])
+    assert json.loads(session.calls[0]["data"][:head_len]) == {"imgsz": 10}
+    assert transport.binary_ok is None
+
+
+def test_transport_retries_busy_server(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: List[float] = []
+    monkeypatch.setattr("core.utils.frame_codec.time.sleep", sleeps.append)
+    busy = {HEADER_SERVER_SUPPORT: "1", "Retry-After": "5"}
+    session = _Session([_Resp(429, busy), _Resp(429, busy), _Resp(200), _Resp(429, busy)])
+    transport = FrameTransport(session, codec="raw", busy_retries=2, busy_max_wait_s=0.5)  # type: ignore[arg-type]
+
+    assert transport.post("http://x/yolo", {}, [_frame()]).status_code == 200
+    assert sleeps == [0.5, 0.5]
+    assert len(session.calls) == 3
+
+
+def test_conditional_transport_sends_refs_for_repeat_frames() -> None:
+    new = {HEADER_SERVER_SUPPORT: "1", HEADER_REFS_SUPPORT: "1"}
+    session = _Session(
+        [_Resp(200, new), _Resp(200, new), _Resp(NEED_BODY_STATUS, new), _Resp(200, new)]
+    )
+    transport = FrameTransport(session, codec="raw", conditional=True)  # type: ignore[arg-type]
+    frame = _frame()
+    digest = frame_sha256(frame)
+
+    transport.post("http://x/ocr", {"mode": "text"}, [frame])  # new frame: upload + tag
+    transport.post("http://x/ocr", {"mode": "text"}, [frame])  # repeat: digest only
+    transport.post("http://x/ocr", {"mode": "text"}, [frame])  # server evicted it: 428, re-upload
+
+    first, ref, miss, reupload = session.calls
+    assert first["headers"][HEADER_FRAME_DIGESTS] == digest
+    assert ref["headers"][HEADER_FRAME_REFS] == digest
+    assert len(ref["data"]) == int(ref["headers"]["X-Uma-Params-Length"])
+    assert miss["headers"][HEADER_FRAME_REFS] == digest
+    assert HEADER_FRAME_REFS not in reupload["headers"]
+    assert transport.stats() == {"ref_hits": 1, "ref_misses": 1, "uploads": 2}
+
+
+def test_conditional_transport_stops_using_refs_on_old_server() -> None:
+    old = {HEADER_SERVER_SUPPORT: "1"}
+    session = _Session([_Resp(200, old), _Resp(200, old)])
+    transport = FrameTransport(session, codec="raw", conditional=True)  # type: ignore[arg-type]
+
+    transport.post("http://x/yolo", {}, [_frame()])
+    transport.post("http://x/yolo", {}, [_frame()])
+
+    # Never remembered (server does not advertise refs), so both upload pixels
+    assert all(HEADER_FRAME_REFS not in c["headers"] for c in session.calls)
+
+
+def test_conditional_transport_never_refs_lossy_frames() -> None:
+    new = {HEADER_SERVER_SUPPORT: "1", HEADER_REFS_SUPPORT: "1"}
+    session = _Session([_Resp(200, new), _Resp(200, new)])
+    transport = FrameTransport(session, codec="jpeg", conditional=True)  # type: ignore[arg-type]
+
+    transport.post("http://x/yolo", {}, [_frame()])
+    transport.post("http://x/yolo", {}, [_frame()])
+
+    # The server cannot verify a jpeg against the pre-encoding digest
+    assert all(
+        HEADER_FRAME_REFS not in c["headers"] and HEADER_FRAME_DIGESTS not in c["headers"]
+        for c in session.calls
+    )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from core.utils.frame_gate import (
+    FrameChangeGate,
+    FrameResultCache,
+    frame_fingerprint_bgr,
+)
+
+
+def _screen(button: bool = False, noise: int = 0) -> Image.Image:
+    rng = np.random.default_rng(1)
+    arr = np.full((360, 640, 3), 90, dtype=np.uint8)
+    arr[40:120, 60:580] = 200  # header panel
+    if button:
+        arr[300:340, 520:600] = (40, 200, 60)  # small green button in one corner
+    if noise:
+        arr = np.clip(arr.astype(np.int16) + rng.integers(-noise, noise + 1, arr.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(arr)
+
+
+def test_static_screen_reuses_result() -> None:
+    gate: FrameChangeGate[str] = FrameChangeGate()
+    assert gate.lookup(_screen()) is None
+    gate.update("dets-1")
+
+    assert gate.lookup(_screen(noise=2)) == "dets-1"
+    assert gate.stats() == {"reused": 1, "computed": 1}
+
+
+def test_small_local_change_is_detected() -> None:
+    gate: FrameChangeGate[str] = FrameChangeGate()
+    gate.lookup(_screen())
+    gate.update("before")
+
+    assert gate.lookup(_screen(button=True)) is None
+    gate.update("after")
+    assert gate.lookup(_screen(button=True)) == "after"
+
+
+def test_input_and_age_invalidate() -> None:
+    gate: FrameChangeGate[str] = FrameChangeGate(max_age_s=0.05)
+    gate.lookup(_screen())
+    gate.update("v")
+
+    assert gate.lookup(_screen(), input_ts=time.monotonic()) is None  # clicked since
+    time.sleep(0.06)
+    assert gate.lookup(_screen()) is None  # staleness cap
+
+
+def _full_screen(
+    width: int = 1920, height: int = 1080, *, icon: int = 0, button=None, noise: int = 0
+) -> Image.Image:
+    rng = np.random.default_rng(2)
+    arr = np.full((height, width, 3), 90, dtype=np.uint8)
+    arr[height // 9 : height // 3, width // 10 : width * 9 // 10] = 200
+    if icon:
+        arr[707 : 707 + icon, 1511 : 1511 + icon] = (230, 60, 60)
+    if button is not None:
+        arr[900:960, 330:630] = button
+    if noise:
+        arr = np.clip(arr.astype(np.int16) + rng.integers(-noise, noise + 1, arr.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(arr)
+
+
+def test_icon_sized_change_at_full_resolution() -> None:
+    gate: FrameChangeGate[str] = FrameChangeGate()
+    gate.lookup(_full_screen())
+    gate.update("before")
+    assert gate.lookup(_full_screen(noise=3)) == "before"
+    assert gate.lookup(_full_screen(icon=16)) is None  # a checkbox tick at 1080p
+
+
+def test_same_brightness_colour_change_is_detected() -> None:
+    # Half-screen window: a green button greys out at about the same luma
+    green, grey = (60, 200, 40), (140, 140, 140)
+    gate: FrameChangeGate[str] = FrameChangeGate()
+    gate.lookup(_full_screen(960, 1080, button=green))
+    gate.update("enabled")
+    assert gate.lookup(_full_screen(960, 1080, button=green, noise=3)) == "enabled"
+    assert gate.lookup(_full_screen(960, 1080, button=grey)) is None
+
+
+def _bgr(img: Image.Image) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(img)[..., ::-1])
+
+
+def test_result_cache_serves_matching_frames_per_params() -> None:
+    now = [10.0]
+    cache: FrameResultCache[str] = FrameResultCache(max_entries=2, ttl_s=1.0, clock=lambda: now[0])
+    key = ("w", (1080, 1920), 832)
+    plain = frame_fingerprint_bgr(_bgr(_full_screen()))
+    with_icon = frame_fingerprint_bgr(_bgr(_full_screen(icon=20)))
+    cache.put(plain, key, "plain")
+
+    assert cache.get(frame_fingerprint_bgr(_bgr(_full_screen(noise=3))), key) == "plain"
+    assert cache.get(with_icon, key) is None  # a 20 px icon at 1080p is a new screen
+    assert cache.get(plain, ("w", (720, 1280), 832)) is None  # other frame size / query
+    cache.put(with_icon, key, "icon")
+    assert cache.get(with_icon, key) == "icon"
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 2}
+
+    # LRU: "plain" was used less recently than "icon"
+    cache.put(frame_fingerprint_bgr(_bgr(Image.new("RGB", (1920, 1080)))), key, "black")
+    assert cache.get(plain, key) is None
+    assert cache.get(with_icon, key) == "icon"
+
+    # A click after the frame was seen invalidates it, as does age
+    cache.put(plain, key, "plain", seen_at=now[0] - 0.5)
+    assert cache.get(plain, key, input_ts=now[0] - 0.2) is None
+    assert cache.get(with_icon, key, input_ts=now[0] - 0.2) == "icon"  # seen after it
+    assert cache.get(with_icon, key, input_ts=now[0]) is None
+    cache.put(plain, key, "plain")
+    now[0] += 1.5
+    assert cache.get(plain, key) is None
+    assert len(cache) == 0
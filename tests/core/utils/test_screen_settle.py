@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+
+from core.utils.screen_settle import SettleTracker, wait_for_settle
+
+
+def _list_at(offset: int) -> Image.Image:
+    """Scrolling list: bright rows every 60 px, shifted by `offset`."""
+    arr = np.full((360, 640, 3), 70, dtype=np.uint8)
+    for y in range(-60, 360, 60):
+        top = y + offset % 60
+        arr[max(0, top) : max(0, top + 30), 40:600] = 210
+    return Image.fromarray(arr)
+
+
+class _FakeCtrl:
+    """Replays a scripted sequence of frames, repeating the last one."""
+
+    def __init__(self, frames: List[Image.Image], grab_s: float = 0.0) -> None:
+        self.frames = frames
+        self.grab_s = grab_s
+        self.calls = 0
+
+    def screenshot(self, region: Optional[tuple] = None) -> Image.Image:
+        time.sleep(self.grab_s)
+        img = self.frames[min(self.calls, len(self.frames) - 1)]
+        self.calls += 1
+        return img
+
+
+def test_tracker_needs_consecutive_matches() -> None:
+    tracker = SettleTracker(stable_frames=2)
+    assert not tracker.feed(_list_at(0))
+    assert not tracker.feed(_list_at(0))  # one match
+    assert not tracker.feed(_list_at(20))  # moved: streak resets
+    assert not tracker.feed(_list_at(20))
+    assert tracker.feed(_list_at(20))
+    assert tracker.frames == 5
+
+
+def test_returns_once_scroll_inertia_stops() -> None:
+    ctrl = _FakeCtrl([_list_at(o) for o in (0, 18, 30, 37)] + [_list_at(40)])
+    t0 = time.monotonic()
+    assert wait_for_settle(ctrl, stable_frames=2, timeout_s=5.0, interval_s=0.0)
+    assert time.monotonic() - t0 < 1.0
+    # 5 moving frames, then two more that match
+    assert ctrl.calls == 7
+
+
+def test_times_out_on_a_moving_screen() -> None:
+    ctrl = _FakeCtrl([_list_at(o * 13) for o in range(200)])
+    t0 = time.monotonic()
+    assert not wait_for_settle(ctrl, stable_frames=2, timeout_s=0.2, interval_s=0.01)
+    assert 0.15 < time.monotonic() - t0 < 1.0
+
+
+def test_slow_grabs_do_not_overrun_the_timeout() -> None:
+    # 0.2 s per grab (ADB screencap): a third sample would end at ~0.6 s
+    ctrl = _FakeCtrl([_list_at(o * 13) for o in range(20)], grab_s=0.2)
+    t0 = time.monotonic()
+    assert not wait_for_settle(ctrl, stable_frames=2, timeout_s=0.5, interval_s=0.01)
+    assert 0.45 < time.monotonic() - t0 < 0.58
+    assert ctrl.calls == 2
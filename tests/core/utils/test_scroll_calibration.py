@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.utils.scroll_calibration import ListEndCheck, ScrollCalibration, measure_vertical_shift
+
+
+def _list_page(height: int = 3000, width: int = 360, pitch: int = 110) -> np.ndarray:
+    """Tall list of same-sized cards with different contents, like the race/skills lists."""
+    rng = np.random.default_rng(2)
+    page = np.full((height, width), 60, dtype=np.uint8)
+    for y in range(0, height - pitch, pitch):
+        page[y + 10 : y + 100, 20:340] = rng.integers(120, 230)
+        page[y + 30 : y + 50, 40 : 40 + int(rng.integers(60, 280))] = 20
+        page[y + 60 : y + 70, 200 : int(rng.integers(210, 330))] = 250
+    return page
+
+
+def _view(page: np.ndarray, offset: int, height: int = 500) -> Image.Image:
+    rows = page[offset : offset + height]
+    rgb = np.stack([rows] * 3, axis=-1)
+    rgb[:40] = 90  # static header that does not scroll
+    return Image.fromarray(rgb)
+
+
+@pytest.mark.parametrize("moved", [13, 120, 200, 240, -90])
+def test_measures_list_shift(moved: int) -> None:
+    page = _list_page()
+    dy, response = measure_vertical_shift(
+        _view(page, 800), _view(page, 800 + moved), expected=-moved * 0.8
+    )
+    assert dy == pytest.approx(-moved, abs=1.0)
+    assert response > 0.05
+
+
+def test_list_that_did_not_move_reads_zero() -> None:
+    page = _list_page()
+    dy, _ = measure_vertical_shift(_view(page, 800), _view(page, 800), expected=-200)
+    assert abs(dy) < 1.0
+
+
+def test_blank_view_has_no_response() -> None:
+    blank = Image.new("RGB", (300, 400), (40, 40, 40))
+    _, response = measure_vertical_shift(blank, blank.copy(), expected=-100)
+    assert response < 0.05
+
+
+def test_calibration_learns_gain_and_ignores_list_end() -> None:
+    cal = ScrollCalibration(30.0)  # e.g. a wheel: guessed 30 px per tick
+    units = cal.units_for(-200)
+    assert units == -7.0
+
+    # Really 45 px per tick
+    assert cal.observe(units, units * 45.0, 0.6)
+    assert cal.gain == pytest.approx(45.0)
+    assert cal.units_for(-200) == -4.0
+
+    # List ran out: moved 10 px instead of ~180
+    assert not cal.observe(-4.0, -10.0, 0.9)
+    # Weak correlation peak
+    assert not cal.observe(-4.0, -170.0, 0.01)
+    assert cal.gain == pytest.approx(45.0)
+
+    assert cal.observe(-4.0, -200.0, 0.5)
+    assert 45.0 < cal.gain < 50.0
+
+
+def test_list_end_needs_two_still_readings_in_a_row() -> None:
+    end = ListEndCheck()
+    # one bad near-zero reading mid-list, then movement again
+    assert [end.reached(s) for s in (-180.0, 0.5, -175.0, None, -1.0)] == [False] * 5
+    assert end.reached(2.0) is True
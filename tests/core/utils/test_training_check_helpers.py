@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from core.utils.training_check_helpers import training_scan_rois
+
+
+def _det(name: str, xyxy, conf: float = 0.9):
+    return {"name": name, "conf": conf, "xyxy": xyxy}
+
+
+def _training_screen():
+    # Layout of tests/data/training_stats_01.png (421x936)
+    return [
+        _det("ui_stats", (15, 665, 345, 720)),
+        _det("support_card", (348, 145, 404, 205)),
+        _det("support_card_rainbow", (348, 215, 404, 275)),
+        _det("support_hint", (350, 150, 364, 164)),
+    ] + [_det("training_button", (20 + 80 * i, 790, 100 + 80 * i, 880)) for i in range(5)]
+
+
+def test_rois_cover_support_column_and_panel() -> None:
+    column, panel = training_scan_rois(_training_screen(), 421, 936)
+    assert column == (314, 0, 421, 720)
+    assert panel == (0, 632, 421, 916)
+
+
+def test_no_rois_without_anchors() -> None:
+    parsed = [d for d in _training_screen() if d["name"] != "ui_stats"]
+    assert training_scan_rois(parsed, 421, 936) is None
+    no_cards = [d for d in _training_screen() if not d["name"].startswith("support_card")]
+    assert training_scan_rois(no_cards, 421, 936) is None
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import pytest
+
+from server.batching import _STOP, BoundedExecutor, MicroBatcher, ModelBatchers, ServerBusy
+from server.model_registry import ModelRegistry
+
+
+def test_concurrent_submissions_share_a_batch() -> None:
+    seen: List[List[int]] = []
+
+    def run(items: List[int]) -> List[int]:
+        seen.append(list(items))
+        return [x * 10 for x in items]
+
+    batcher = MicroBatcher("t", run, max_batch_size=8, max_wait_s=0.2)
+    try:
+        futs = [batcher.submit(i) for i in range(5)]
+        assert [f.result(timeout=2) for f in futs] == [0, 10, 20, 30, 40]
+        assert seen == [[0, 1, 2, 3, 4]]
+        assert batcher.stats()["largest_batch"] == 5
+    finally:
+        batcher.close(timeout=1)
+
+
+def test_flushes_at_max_batch_size() -> None:
+    seen: List[int] = []
+    gate = threading.Event()
+
+    def run(items: List[int]) -> List[int]:
+        gate.wait(timeout=2)
+        seen.append(len(items))
+        return items
+
+    batcher = MicroBatcher("t", run, max_batch_size=3, max_wait_s=0.3)
+    try:
+        futs = [batcher.submit(i) for i in range(7)]
+        gate.set()
+        assert [f.result(timeout=2) for f in futs] == list(range(7))
+        assert max(seen) <= 3
+        assert sum(seen) == 7
+    finally:
+        batcher.close(timeout=1)
+
+
+def test_lone_request_waits_at_most_the_window() -> None:
+    batcher = MicroBatcher("t", lambda items: items, max_batch_size=8, max_wait_s=0.02)
+    try:
+        t0 = time.perf_counter()
+        assert batcher.run("x", timeout=1) == "x"
+        assert time.perf_counter() - t0 < 0.5
+    finally:
+        batcher.close(timeout=1)
+
+
+def test_batch_error_only_fails_the_offending_request() -> None:
+    seen: List[List[int]] = []
+
+    def run(items: List[int]) -> List[int]:
+        seen.append(list(items))
+        if any(x < 0 for x in items):
+            raise ValueError("boom")
+        return [x * 10 for x in items]
+
+    batcher = MicroBatcher("t", run, max_batch_size=4, max_wait_s=0.2)
+    try:
+        futs = [batcher.submit(i) for i in (1, -1, 2)]
+        assert futs[0].result(timeout=2) == 10
+        with pytest.raises(ValueError):
+            futs[1].result(timeout=2)
+        assert futs[2].result(timeout=2) == 20
+        assert seen == [[1, -1, 2], [1], [-1], [2]]
+        with pytest.raises(ValueError):
+            batcher.run(-5, timeout=2)
+        assert batcher.run(9, timeout=2) == 90
+    finally:
+        batcher.close(timeout=1)
+
+
+def test_full_queue_rejects_with_server_busy() -> None:
+    gate = threading.Event()
+    started = threading.Event()
+
+    def run(items: List[int]) -> List[int]:
+        started.set()
+        gate.wait(timeout=2)
+        return items
+
+    batcher = MicroBatcher(
+        "t", run, max_batch_size=1, max_wait_s=0.0, max_queue=2, retry_after_s=3
+    )
+    try:
+        first = batcher.submit(0)  # picked up by the worker
+        assert started.wait(timeout=2)
+        queued = [batcher.submit(1), batcher.submit(2)]
+        with pytest.raises(ServerBusy) as err:
+            batcher.submit(3)
+        assert err.value.retry_after_s == 3
+        assert batcher.stats()["rejected"] == 1
+        gate.set()
+        assert [f.result(timeout=2) for f in [first, *queued]] == [0, 1, 2]
+    finally:
+        gate.set()
+        batcher.close(timeout=1)
+    with pytest.raises(ServerBusy) as err:
+        batcher.submit(4)
+    assert err.value.closed
+
+
+def test_close_racing_submit_never_strands_a_future() -> None:
+    for _ in range(20):
+        batcher = MicroBatcher(
+            "t", lambda items: items, max_batch_size=4, max_wait_s=0.001, workers=2
+        )
+        futs: List = []
+        start = threading.Event()
+
+        def spam() -> None:
+            start.wait(timeout=2)
+            for i in range(200):
+                try:
+                    futs.append(batcher.submit(i))
+                except ServerBusy:
+                    return
+
+        threads = [threading.Thread(target=spam) for _ in range(3)]
+        for t in threads:
+            t.start()
+        start.set()
+        batcher.close(timeout=0)
+        for t in threads:
+            t.join(timeout=2)
+        for fut in futs:
+            # Each one either ran or was failed; none is left pending forever
+            exc = fut.exception(timeout=2)
+            assert exc is None or isinstance(exc, ServerBusy)
+
+
+def test_items_left_after_the_workers_exit_fail_with_server_busy() -> None:
+    batcher = MicroBatcher("t", lambda items: items, max_wait_s=0.0)
+    stranded: Future = Future()
+    with batcher._submit_lock:
+        batcher._closed = True
+        batcher._queue.put(_STOP)
+        # What an unlocked submit used to leave behind the sentinel
+        batcher._queue.put(("late", stranded))
+    with pytest.raises(ServerBusy) as err:
+        stranded.result(timeout=2)
+    assert err.value.closed
+
+
+def test_bounded_executor_limits_pending_work() -> None:
+    gate = threading.Event()
+    pool = BoundedExecutor("t", workers=1, max_queue=1)
+    try:
+        futs = [pool.submit(gate.wait, 2), pool.submit(gate.wait, 2)]
+        with pytest.raises(ServerBusy):
+            pool.submit(gate.wait, 2)
+        assert pool.stats()["rejected"] == 1
+        gate.set()
+        assert all(f.result(timeout=2) for f in futs)
+        # Slots free up once work completes
+        assert pool.submit(lambda: "ok").result(timeout=2) == "ok"
+    finally:
+        gate.set()
+        pool.close()
+
+
+class _OnnxEngine:
+    """Stands in for LocalYOLOEngine on the ONNX backend: weights_path != registry key."""
+
+    def __init__(self, key: str) -> None:
+        self.weights_path = key.replace(".pt", ".onnx")
+
+
+def _yolo_like(**registry_kwargs):
+    registry: ModelRegistry[_OnnxEngine]
+    batchers: ModelBatchers[_OnnxEngine] = ModelBatchers(
+        "yolo",
+        lambda engine, items: [engine for _ in items],
+        resident=lambda key: registry.peek(key),
+        max_wait_s=0.0,
+    )
+    registry = ModelRegistry("yolo", _OnnxEngine, on_evict=batchers.retire, **registry_kwargs)
+    return registry, batchers
+
+
+def test_registry_eviction_retires_onnx_engine_batcher() -> None:
+    registry, batchers = _yolo_like(max_models=1)
+    ura = registry.get("models/uma_ura.pt")
+    assert batchers.submit("models/uma_ura.pt", ura, "x").result(timeout=2) is ura
+    (ura_batcher,) = batchers.batchers()
+
+    nav = registry.get("models/uma_nav.pt")  # evicts URA
+    assert batchers.submit("models/uma_nav.pt", nav, "x").result(timeout=2) is nav
+    try:
+        assert [b.name for b in batchers.batchers()] == ["yolo:uma_nav.pt"]
+        with pytest.raises(ServerBusy) as err:
+            ura_batcher.submit("x")
+        assert err.value.closed
+    finally:
+        batchers.retire("models/uma_nav.pt")
+
+
+def test_stale_engine_does_not_displace_the_resident_batcher() -> None:
+    registry, batchers = _yolo_like()
+    key = "models/uma_ura.pt"
+    stale = registry.get(key)
+    registry.evict(key)
+
+    # Nothing resident: the stale engine runs its frames without being installed
+    assert batchers.submit(key, stale, "x").result(timeout=2) is stale
+    assert batchers.batchers() == []
+
+    fresh = registry.get(key)
+    assert batchers.submit(key, fresh, "x").result(timeout=2) is fresh
+    (live,) = batchers.batchers()
+    try:
+        # A request still holding the evicted engine is served by the resident one
+        assert batchers.submit(key, stale, "y").result(timeout=2) is fresh
+        assert batchers.batchers() == [live]
+        assert live.submit("z").result(timeout=2) is fresh
+    finally:
+        batchers.retire(key)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from core.utils.frame_codec import frame_sha256
+from server.frame_store import RecentFrameStore, verified_digests
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((10, 10, 3), value, dtype=np.uint8)  # 300 bytes
+
+
+def test_roundtrip_returns_private_copies() -> None:
+    store = RecentFrameStore(max_bytes=10_000)
+    src = _frame(1)
+    store.put_many(["a"], [src])
+    src[:] = 9  # caller mutating its frame must not leak into the store
+
+    frames, missing = store.get_many(["a"])
+
+    assert missing == []
+    assert frames is not None and int(frames[0].max()) == 1
+    frames[0][:] = 7
+    again, _ = store.get_many(["a"])
+    assert again is not None and int(again[0].max()) == 1
+
+
+def test_reports_every_missing_digest() -> None:
+    store = RecentFrameStore(max_bytes=10_000)
+    store.put_many(["a"], [_frame(1)])
+
+    frames, missing = store.get_many(["a", "b", "c"])
+
+    assert frames is None
+    assert missing == ["b", "c"]
+    assert store.stats()["misses"] == 1
+
+
+def test_evicts_least_recent_by_bytes() -> None:
+    store = RecentFrameStore(max_bytes=700)  # room for two frames
+    store.put_many(["a", "b"], [_frame(1), _frame(2)])
+    store.get_many(["a"])  # b is now the oldest
+
+    store.put_many(["c"], [_frame(3)])
+
+    assert store.get_many(["b"])[1] == ["b"]
+    assert store.get_many(["a", "c"])[1] == []
+    assert store.stats()["bytes"] == 600
+
+
+def test_disabled_store_keeps_nothing() -> None:
+    store = RecentFrameStore(max_bytes=0)
+    store.put_many(["a"], [_frame(1)])
+
+    assert not store.enabled
+    assert store.get_many(["a"]) == (None, ["a"])
+
+
+def test_digests_are_recomputed_not_trusted() -> None:
+    a, b = _frame(1), _frame(2)
+    assert verified_digests([frame_sha256(a), frame_sha256(b)], [a, b]) == [
+        frame_sha256(a),
+        frame_sha256(b),
+    ]
+    # Pixels registered under another frame's digest
+    with pytest.raises(ValueError):
+        verified_digests([frame_sha256(a)], [b])
+    with pytest.raises(ValueError):
+        verified_digests([frame_sha256(a)], [a, b])
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, List
+
+from server.batching import BoundedExecutor
+from server.metrics import MetricsRegistry
+
+
+def _samples(text: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+def test_request_and_stage_histograms() -> None:
+    reg = MetricsRegistry(prefix="t")
+    with reg.track_request("/yolo") as outcome:
+        with reg.stage("hash"):
+            time.sleep(0.002)
+        with reg.stage("hash"):  # repeated stages add up within a request
+            pass
+        outcome["status"] = 200
+
+    s = _samples(reg.render())
+
+    assert s['t_requests_total{endpoint="/yolo",status="200"}'] == 1
+    assert s['t_request_seconds_count{endpoint="/yolo"}'] == 1
+    assert s['t_stage_seconds_count{endpoint="/yolo",stage="hash"}'] == 1
+    assert s['t_stage_seconds_sum{endpoint="/yolo",stage="hash"}'] >= 0.002
+    assert s['t_stage_seconds_bucket{endpoint="/yolo",stage="hash",le="+Inf"}'] == 1
+    assert s['t_stage_seconds_bucket{endpoint="/yolo",stage="hash",le="0.0005"}'] == 0
+
+
+def test_failed_request_counts_as_500_and_stage_outside_request_is_noop() -> None:
+    reg = MetricsRegistry(prefix="t")
+    with reg.stage("parse"):
+        pass
+    try:
+        with reg.track_request("/ocr"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    s = _samples(reg.render())
+
+    assert s['t_requests_total{endpoint="/ocr",status="500"}'] == 1
+    assert not any("parse" in k for k in s)
+
+
+def test_stage_timing_follows_bounded_executor() -> None:
+    reg = MetricsRegistry(prefix="t")
+    pool = BoundedExecutor("t", workers=1)
+    try:
+        with reg.track_request("/template-match"):
+
+            def work() -> None:
+                with reg.stage("inference"):
+                    pass
+
+            pool.submit(work).result(timeout=2)
+    finally:
+        pool.close()
+
+    assert 't_stage_seconds_count{endpoint="/template-match",stage="inference"}' in reg.render()
+
+
+def test_collectors_are_read_at_scrape_time() -> None:
+    reg = MetricsRegistry(prefix="t")
+    depth: List[float] = [0.0]
+    reg.add_collector(
+        lambda: [("queue_depth", "gauge", "Queued", [({"pool": "ocr"}, depth[0])])]
+    )
+    depth[0] = 3
+
+    text = reg.render()
+
+    assert "# TYPE t_queue_depth gauge" in text
+    assert _samples(text)['t_queue_depth{pool="ocr"}'] == 3
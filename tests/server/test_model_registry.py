@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List
+
+from server.model_registry import ModelRegistry
+
+
+class _Model:
+    def __init__(self, key: str, nbytes: int) -> None:
+        self.key = key
+        self.nbytes = nbytes
+
+
+def _registry(sizes: Dict[str, int], **kwargs):
+    loads: List[str] = []
+    evicted: List[str] = []
+
+    def load(key: str) -> _Model:
+        loads.append(key)
+        return _Model(key, sizes[key])
+
+    reg = ModelRegistry(
+        "t",
+        load,
+        size_of=lambda m: m.nbytes,
+        on_evict=lambda key, _m: evicted.append(key),
+        **kwargs,
+    )
+    return reg, loads, evicted
+
+
+def test_loads_lazily_and_once() -> None:
+    reg, loads, _ = _registry({"a": 1})
+    assert loads == []
+
+    first = reg.get("a")
+
+    assert reg.get("a") is first
+    assert loads == ["a"]
+    assert reg.stats()["hits"] == 1
+
+
+def test_concurrent_first_use_loads_once() -> None:
+    loads: List[str] = []
+
+    def slow_load(key: str) -> _Model:
+        loads.append(key)
+        time.sleep(0.05)
+        return _Model(key, 1)
+
+    reg: ModelRegistry[_Model] = ModelRegistry("t", slow_load)
+    got: List[_Model] = []
+    threads = [threading.Thread(target=lambda: got.append(reg.get("a"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=2)
+
+    assert loads == ["a"]
+    assert len({id(m) for m in got}) == 1
+
+
+def test_evicts_least_recently_used_over_budget() -> None:
+    reg, _, evicted = _registry({"a": 40, "b": 40, "c": 40}, budget_bytes=100)
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")  # b is now the LRU
+
+    reg.get("c")
+
+    assert evicted == ["b"]
+    assert [r["key"] for r in reg.resident()] == ["a", "c"]
+
+
+def test_pinned_models_survive_and_max_models_applies() -> None:
+    reg, loads, evicted = _registry({"ura": 1, "nav": 1, "cup": 1}, max_models=1)
+    assert reg.preload(["ura"], pin=True) == ["ura"]
+
+    reg.get("nav")  # over the count, but the only candidate is the one just loaded
+    reg.get("cup")
+
+    assert evicted == ["nav"]
+    assert {r["key"] for r in reg.resident()} == {"ura", "cup"}
+    assert reg.evict("cup") is True
+    assert reg.evict("cup") is False
+    assert loads == ["ura", "nav", "cup"]
+
+
+def test_evicted_model_reloads_on_next_use() -> None:
+    reg, loads, _ = _registry({"a": 1})
+    first = reg.get("a")
+    reg.evict("a")
+
+    second = reg.get("a")
+
+    assert second is not first
+    assert loads == ["a", "a"]
+
+
+def test_unpin_makes_model_evictable() -> None:
+    reg, _, evicted = _registry({"a": 60, "b": 60}, budget_bytes=100)
+    reg.preload(["a"], pin=True)
+    reg.unpin("a")
+    assert [(r["key"], r["pinned"]) for r in reg.resident()] == [("a", False)]
+
+    reg.get("b")
+
+    assert evicted == ["a"]
+
+
+def test_peek_neither_loads_nor_touches_lru_order() -> None:
+    reg, loads, evicted = _registry({"a": 1, "b": 1, "c": 1}, max_models=2)
+    assert reg.peek("a") is None and loads == []
+
+    a = reg.get("a")
+    reg.get("b")
+    assert reg.peek("a") is a
+    reg.get("c")  # "a" stays least recently used despite the peek
+
+    assert evicted == ["a"] and reg.peek("a") is None
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+import time
+
+import numpy as np
+
+from server.result_cache import ResultCache, frame_digest
+
+
+def test_lru_evicts_oldest_and_counts() -> None:
+    cache = ResultCache(max_entries=2, ttl_s=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # refresh a
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = ResultCache(max_entries=4, ttl_s=0.01)
+    cache.put("k", {"dets": []})
+    time.sleep(0.03)
+
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_values_are_isolated_from_caller_mutation() -> None:
+    cache = ResultCache(max_entries=4, ttl_s=60)
+    meta = {"imgsz": 832}
+    cache.put("k", (meta, [{"name": "x"}]))
+    meta["shape"] = (1, 2, 3)
+
+    got_meta, _ = cache.get("k")
+    got_meta["checksum"] = "abc"
+    assert cache.get("k")[0] == {"imgsz": 832}
+
+
+def test_zero_size_disables_cache() -> None:
+    cache = ResultCache(max_entries=0)
+    cache.put("k", 1)
+    assert cache.get("k") is None
+
+
+def test_frame_digest_matches_legacy_checksum() -> None:
+    img = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    assert frame_digest(img)[:12] == hashlib.sha256(img.tobytes()).hexdigest()[:12]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from core.perception.analyzers.matching.base import TemplateEntry, TemplateMatcherBase
+from server.template_store import TemplateFeatureStore
+
+
+def _write_template(path: Path, seed: int = 3) -> None:
+    rng = np.random.default_rng(seed)
+    rgba = rng.integers(0, 255, size=(40, 30, 4), dtype=np.uint8)
+    rgba[:5, :, 3] = 0  # transparent strip -> non-trivial mask
+    Image.fromarray(rgba, "RGBA").save(path)
+
+
+def test_roundtrip_matches_fresh_preparation(tmp_path: Path) -> None:
+    src = tmp_path / "tmpl.png"
+    _write_template(src)
+    matcher = TemplateMatcherBase()
+    prepared = matcher._prepare_entry(TemplateEntry(name="a", path=str(src)))
+    assert prepared is not None
+
+    store = TemplateFeatureStore(tmp_path / "store")
+    key = store.content_key(path=str(src))
+    assert key is not None
+    store.save(key, prepared)
+
+    # A fresh store (server restart) reads it back
+    loaded = TemplateFeatureStore(tmp_path / "store").load(
+        key, name="b", path=str(src), metadata={"hash_hex": "ff" * 8, "x": 1}
+    )
+
+    assert loaded is not None
+    for field in ("bgr", "gray", "edges", "hist", "mask"):
+        assert np.array_equal(getattr(loaded, field), getattr(prepared, field))
+    assert loaded.hash == prepared.hash
+    assert loaded.name == "b"
+    assert loaded.metadata == {"x": 1}
+
+
+def test_key_follows_file_content(tmp_path: Path) -> None:
+    src = tmp_path / "tmpl.png"
+    _write_template(src, seed=1)
+    store = TemplateFeatureStore(tmp_path / "store")
+    k1 = store.content_key(path=str(src))
+
+    _write_template(src, seed=2)
+    os.utime(src, ns=(1, 1))  # force a new (mtime, size) stamp
+    k2 = store.content_key(path=str(src))
+
+    assert k1 != k2
+    assert store.content_key(path=str(src), hash_hex="00" * 8) != k2
+    assert store.content_key(path=str(tmp_path / "missing.png")) is None
+
+
+def test_missing_and_disabled(tmp_path: Path) -> None:
+    store = TemplateFeatureStore(tmp_path / "store")
+    assert store.load("ab" * 32, name="a", path="", metadata={}) is None
+    assert store.stats()["misses"] == 1
+
+    disabled = TemplateFeatureStore(tmp_path / "off", enabled=False)
+    assert disabled.load("ab" * 32, name="a", path="", metadata={}) is None
+    assert not (tmp_path / "off").exists()
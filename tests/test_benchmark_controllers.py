@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmark_controllers import _test_frame, summarize, write_fake_adb
+from core.controllers.adb_screencap import decode_raw_screencap
+
+
+def test_summarize_percentiles() -> None:
+    stats = summarize([0.010] * 98 + [0.050, 0.100])
+    assert stats["n"] == 100
+    assert stats["p50_ms"] == pytest.approx(10.0)
+    assert stats["p99_ms"] > 50.0
+    assert stats["max_ms"] == pytest.approx(100.0)
+    assert stats["per_s"] == pytest.approx(100 / 1.13, rel=1e-3)
+    assert summarize([]) == {"n": 0}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake adb is a POSIX shell script")
+def test_fake_adb_serves_both_capture_formats(tmp_path: Path) -> None:
+    frame = _test_frame(120, 200)
+    adb = str(write_fake_adb(tmp_path, frame) / "adb")
+
+    raw = subprocess.run([adb, "-s", "bench", "exec-out", "screencap"], capture_output=True, check=True)
+    assert np.array_equal(decode_raw_screencap(raw.stdout), np.asarray(frame))
+
+    png = subprocess.run([adb, "-s", "bench", "exec-out", "screencap", "-p"], capture_output=True, check=True)
+    assert (tmp_path / "frame.png").read_bytes() == png.stdout
+    assert Image.open(tmp_path / "frame.png").size == (120, 200)
+
+    shell = subprocess.run(
+        [adb, "-s", "bench", "shell"], input=b"input tap 1 2; echo done $?\n", capture_output=True, check=True
+    )
+    assert shell.stdout.decode().strip() == "done 0"
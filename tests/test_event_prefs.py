@@ -46,3 +46,17 @@ def test_pick_for_general_event_with_step_suffix_alias():
 
     rec = _make_general_event("Solid Showing (G1)")
     assert prefs.pick_for(rec) == 2
+
+
+def test_remote_bank_records_bounds_large_pools():
+    """A small pool is banked whole; a large one banks only the CV candidates."""
+    from core.utils import event_processor as ep
+
+    small = [_make_general_event(f"ev{i}") for i in range(3)]
+    assert ep._remote_bank_records(small, small[:1]) is small
+
+    large = [
+        _make_general_event(f"ev{i}") for i in range(ep._REMOTE_POOL_BANK_MAX + 1)
+    ]
+    candidates = large[:2]
+    assert ep._remote_bank_records(large, candidates) is candidates
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from scripts.quantize_yolo_onnx import (
+    FrameCalibrationReader,
+    calibration_images,
+    drift_report,
+    head_nodes_to_exclude,
+    mean_average_precision,
+    read_yolo_labels,
+)
+
+
+def test_map_perfect_and_degraded() -> None:
+    truths = [[("btn", (10, 10, 50, 50)), ("icon", (100, 100, 140, 160))]]
+    perfect = [[("btn", 0.9, (10, 10, 50, 50)), ("icon", 0.8, (100, 100, 140, 160))]]
+    # 0.995 is the ceiling of Ultralytics' 101-point AP (recall-1.0 sentinel at precision 0)
+    assert mean_average_precision(perfect, truths) == pytest.approx({"map50": 0.995, "map50_95": 0.995})
+
+    # Icon box shifted: IoU 0.6 counts at 0.5/0.55/0.6 only; a confident false positive on btn
+    shifted = [[
+        ("btn", 0.95, (200, 200, 240, 240)),
+        ("btn", 0.9, (10, 10, 50, 50)),
+        ("icon", 0.8, (100, 115, 140, 175)),
+    ]]
+    r = mean_average_precision(shifted, truths)
+    assert 0.5 < r["map50"] < 1.0
+    assert r["map50_95"] < r["map50"]
+
+    assert mean_average_precision([[]], truths) == {"map50": 0.0, "map50_95": 0.0}
+
+
+def test_read_yolo_labels(tmp_path: Path) -> None:
+    label = tmp_path / "a.txt"
+    label.write_text("1 0.5 0.25 0.2 0.1\n\n0 0.1 0.1 0.2 0.2\n", encoding="utf-8")
+    got = read_yolo_labels(label, ["btn", "icon"], 200, 100)
+    assert got[0][0] == "icon"
+    assert got[0][1] == pytest.approx((80, 20, 120, 30))
+    assert got[1][0] == "btn"
+    assert read_yolo_labels(tmp_path / "missing.txt", ["btn"], 10, 10) == []
+
+
+def test_calibration_frames_from_debug_tree(tmp_path: Path) -> None:
+    raw = tmp_path / "ura" / "general" / "raw"
+    raw.mkdir(parents=True)
+    for i in range(5):
+        cv2.imwrite(str(raw / f"general_{i}.png"), np.full((60, 40, 3), i * 40, np.uint8))
+    (raw / "notes.txt").write_text("skip me", encoding="utf-8")
+
+    paths = calibration_images([tmp_path], limit=3, seed=1)
+    assert len(paths) == 3 and all(p.suffix == ".png" for p in paths)
+    assert paths == calibration_images([tmp_path], limit=3, seed=1)
+
+    reader = FrameCalibrationReader(paths, "images", 64)
+    batches = []
+    while (feed := reader.get_next()) is not None:
+        batches.append(feed["images"])
+    assert len(batches) == 3
+    assert batches[0].shape == (1, 3, 64, 64) and batches[0].dtype == np.float32
+    reader.rewind()
+    assert reader.get_next() is not None
+
+
+def test_head_nodes_to_exclude_keeps_convs() -> None:
+    nodes = [
+        SimpleNamespace(name="/model.0/conv/Conv", op_type="Conv"),
+        SimpleNamespace(name="/model.21/m.0/Add", op_type="Add"),
+        SimpleNamespace(name="/model.22/cv2.0/cv2.0.2/Conv", op_type="Conv"),
+        SimpleNamespace(name="/model.22/dfl/Softmax", op_type="Softmax"),
+        SimpleNamespace(name="/model.22/Concat_5", op_type="Concat"),
+    ]
+    model = SimpleNamespace(graph=SimpleNamespace(node=nodes))
+    assert head_nodes_to_exclude(model) == ["/model.22/dfl/Softmax", "/model.22/Concat_5"]
+
+
+def test_drift_report() -> None:
+    fp32 = {"map50": 0.9, "map50_95": 0.7, "latency_p50_ms": 40.0, "latency_mean_ms": 42.0}
+    int8 = {"map50": 0.88, "map50_95": 0.66, "latency_p50_ms": 20.0, "latency_mean_ms": 21.0}
+    r = drift_report(fp32, int8)
+    assert r["map50_drift"] == pytest.approx(-0.02)
+    assert r["map50_95_drift"] == pytest.approx(-0.04)
+    assert r["speedup"] == pytest.approx(2.0)